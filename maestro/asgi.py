@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'maestro.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Static files are answered here, outside Django's (fully async) middleware chain.
+from modules.core.staticfiles import StaticFilesASGI  # noqa: E402
+
+application = StaticFilesASGI(django_application)
@@ -14,6 +14,8 @@ from pathlib import Path
 import os
 import environ
 
+from maestro.sqlite import sqlite_options
+
 env = environ.Env(
     DEBUG=(bool, False)
 )
@@ -47,14 +49,22 @@ INSTALLED_APPS = [
     'modules.core',
     'modules.users',
     'modules.playbooks',
+    'modules.inventories',
+    'modules.runs',
+    'modules.secrets',
+    'modules.schedules',
+    'modules.audit',
+    'modules.api',
 ]
 
 MIDDLEWARE = [
+    'modules.core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'modules.audit.middleware.AuditUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,8 +75,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates are parsed once per process; compiled node trees are reused.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -88,10 +104,17 @@ WSGI_APPLICATION = 'maestro.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLITE_PROFILE=production enables WAL, a busy timeout, BEGIN IMMEDIATE and
+# larger caches (see `maestro/sqlite.py`), plus persistent connections.
+SQLITE_PROFILE = env('SQLITE_PROFILE', default='default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': env('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': sqlite_options(SQLITE_PROFILE, busy_timeout=env.float('SQLITE_BUSY_TIMEOUT', default=20.0)),
+        'CONN_MAX_AGE': env.int('CONN_MAX_AGE', default=600 if SQLITE_PROFILE == 'production' else 0),
+        'CONN_HEALTH_CHECKS': SQLITE_PROFILE == 'production',
     }
 }
 
@@ -133,6 +156,22 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'maestro' / 'static']
 
+# STATIC_MANIFEST=true serves what `manage.py build_static` collected into
+# STATIC_ROOT: content-hashed names with gzip/brotli variants, which WhiteNoise
+# sends with far-future immutable cache headers. Off, files are served as they
+# are from the app and project static directories. WhiteNoise wraps the ASGI and
+# WSGI applications (maestro/asgi.py, maestro/wsgi.py) rather than sitting in
+# MIDDLEWARE, where its sync-only middleware would push every async view
+# through a thread.
+STATIC_MANIFEST = env.bool('STATIC_MANIFEST', default=False)
+STATIC_ROOT = env.path('STATIC_ROOT', default=BASE_DIR / 'var' / 'static') if STATIC_MANIFEST else None
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage' if STATIC_MANIFEST
+                    else 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+WHITENOISE_USE_FINDERS = not STATIC_MANIFEST
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -144,6 +183,94 @@ LOGIN_URL = "/login/"
 
 LOGIN_REDIRECT_URL = "/demo"
 
+# Shared cache for ACL lookups and rendered fragments. Defaults to local memory;
+# use e.g. `filecache:///var/tmp/maestro-cache` to share it between processes
+# without running a cache server.
+CACHES = {'default': env.cache('CACHE_URL', default='locmemcache://')}
+
+_PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                         'django.core.cache.backends.dummy.DummyCache')
+
+# Rendered playbook list rows are keyed by id, `updated_at` and a tag/group
+# version, so they never go stale; this only bounds how long unused rows linger.
+# The version is bumped in the cache, which other processes only see when it is
+# shared: row caching is off unless CACHE_URL names a shared backend.
+FRAGMENT_CACHE_TIMEOUT = (0 if CACHES['default']['BACKEND'] in _PROCESS_LOCAL_CACHES
+                          else env.int('FRAGMENT_CACHE_TIMEOUT', default=3600))
+
+# How long (seconds) group-membership and playbook-sharing lookups stay in the
+# shared cache. Entries are invalidated by signals, so this is only a safety net.
+# Invalidation only reaches other processes through a shared cache: with the
+# per-process default, a revoked membership or unsharing would stay effective in
+# every other worker until expiry, so ACL caching is off unless CACHE_URL names
+# a shared backend (file, memcached, redis, database).
+ACL_CACHE_TIMEOUT = (0 if CACHES['default']['BACKEND'] in _PROCESS_LOCAL_CACHES
+                     else env.int('ACL_CACHE_TIMEOUT', default=300))
+
+# Dotted path of the playbook search backend. Defaults to FTS5 on SQLite and to
+# plain `icontains` matching on other databases.
+PLAYBOOK_SEARCH_BACKEND = env('PLAYBOOK_SEARCH_BACKEND', default=None)
+
+# Store playbook versions as line deltas against the previous version when that
+# is smaller than a full compressed copy.
+PLAYBOOK_VERSION_DELTAS = env.bool('PLAYBOOK_VERSION_DELTAS', default=True)
+
+# Deleted rows are kept as tombstones for this many days before
+# `manage.py purge_deleted` removes them for good.
+SOFT_DELETE_RETENTION_DAYS = env.int('SOFT_DELETE_RETENTION_DAYS', default=30)
+
+# Playbook runs are executed by `manage.py run_worker`, never by web workers.
+RUNS_WORKSPACE_ROOT = env.path('RUNS_WORKSPACE_ROOT', default=BASE_DIR / 'var' / 'runs')
+RUNS_CONCURRENCY = env.int('RUNS_CONCURRENCY', default=4)
+RUNS_DEFAULT_INVENTORY = env('RUNS_DEFAULT_INVENTORY', default='localhost,')
+ANSIBLE_PLAYBOOK_BIN = env('ANSIBLE_PLAYBOOK_BIN', default='ansible-playbook')
+
+# Per-host task results reported by the bundled `maestro_events` callback plugin
+# are written in batches of RUNS_EVENT_BATCH_SIZE, or after at most
+# RUNS_EVENT_FLUSH_INTERVAL seconds.
+RUNS_EVENT_BATCH_SIZE = env.int('RUNS_EVENT_BATCH_SIZE', default=500)
+RUNS_EVENT_FLUSH_INTERVAL = env.float('RUNS_EVENT_FLUSH_INTERVAL', default=1.0)
+
+# `manage.py run_scheduler` sleeps until the next deadline; schedule edits are
+# picked up at most this many seconds later.
+SCHEDULER_REFRESH_INTERVAL = env.float('SCHEDULER_REFRESH_INTERVAL', default=30)
+
+# Secrets are encrypted with per-scope data keys wrapped by this master key
+# (32 bytes, urlsafe base64). When unset it is derived from SECRET_KEY, and
+# rotating SECRET_KEY then makes every stored secret undecryptable: always set
+# it in production (`manage.py check --deploy` fails without it).
+SECRETS_MASTER_KEY = env('SECRETS_MASTER_KEY', default=None)
+SECRETS_KEY_CACHE_SIZE = env.int('SECRETS_KEY_CACHE_SIZE', default=256)
+SECRETS_KEY_CACHE_TTL = env.int('SECRETS_KEY_CACHE_TTL', default=300)
+
+# Rendered `{% icons %}` output is memoized per distinct icon (name, style,
+# classes, attributes); this bounds the number of entries kept per process.
+ICONS_RENDER_CACHE_SIZE = env.int('ICONS_RENDER_CACHE_SIZE', default=1024)
+
+# Audit events are buffered in memory and written in bulk once a response has
+# been sent, or earlier when the buffer holds AUDIT_BUFFER_SIZE events or its
+# oldest event is AUDIT_FLUSH_INTERVAL seconds old (checked on every loop of
+# run_worker; run_scheduler flushes after firing). Longer values are truncated.
+AUDIT_BUFFER_SIZE = env.int('AUDIT_BUFFER_SIZE', default=500)
+AUDIT_FLUSH_INTERVAL = env.float('AUDIT_FLUSH_INTERVAL', default=5.0)
+AUDIT_MAX_VALUE_LENGTH = env.int('AUDIT_MAX_VALUE_LENGTH', default=1000)
+
+# API requests with HTTP Basic credentials skip the PBKDF2 password check for
+# this many seconds after a successful one (0 checks every request). Cached
+# entries are re-validated against the user's current password hash, so a
+# password change or deactivation applies at once in every process.
+API_BASIC_AUTH_CACHE_TIMEOUT = env.int('API_BASIC_AUTH_CACHE_TIMEOUT', default=60)
+
+# Request metrics are served at /metrics. Scrapers send METRICS_TOKEN as a bearer
+# token; without one, only logged-in staff users can read them.
+METRICS_TOKEN = env('METRICS_TOKEN', default=None)
+
+# Fraction of requests run under cProfile (0 disables it). The dumps of the
+# PROFILE_KEEP slowest sampled requests are kept in PROFILE_DIR.
+PROFILE_SAMPLE_RATE = env.float('PROFILE_SAMPLE_RATE', default=0.0)
+PROFILE_DIR = env('PROFILE_DIR', default=str(BASE_DIR / 'var' / 'profiles'))
+PROFILE_KEEP = env.int('PROFILE_KEEP', default=20)
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "tailwind"
 CRISPY_TEMPLATE_PACK = "tailwind"
 
@@ -159,6 +286,11 @@ so that we don’t need to repeat it in every view or template.
 - `icon` refers to the icon name (heroicon using templatetag "icons").
 - `submenu` is a dict where the key is the label and the value
   is either a Django `url_name` or an absolute path.
+- `permissions` (optional) lists permissions a user needs to see the group.
+
+The registry is compiled once, when the first page renders the menu
+(`modules.core.menu`), so url names are reversed a single time; it must not
+be modified at runtime.
 
 Example:
 {
@@ -182,7 +314,7 @@ Example:
 MENU_REGISTRY = {
     "Workspace": {
         "icon": "briefcase",
-        "submenu": {"opaaa": "playbook_create"},
+        "submenu": {"opaaa": "playbook_create", "Runs": "run_list"},
     },
 }
 
@@ -17,8 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from modules.core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("users/", include("modules.users.urls")),
     path("playbooks/", include("modules.playbooks.urls")),
+    path("runs/", include("modules.runs.urls")),
+    path("api/", include("modules.api.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
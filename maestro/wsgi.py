@@ -13,4 +13,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'maestro.settings')
 
-application = get_wsgi_application()
+django_application = get_wsgi_application()
+
+from modules.core.staticfiles import StaticFilesWSGI  # noqa: E402
+
+application = StaticFilesWSGI(django_application)
@@ -0,0 +1,127 @@
+from typing import Callable, NamedTuple
+
+from django.db.models import Count, Max, Prefetch
+from django.forms import modelform_factory
+
+from modules.core.models import Group, Tag
+from modules.playbooks.forms import PlaybookForm
+from modules.playbooks.fragments import get_row_version, row_cache_timeout
+from modules.playbooks.models import Playbook
+
+
+class ApiField(NamedTuple):
+    columns: tuple        # Columns to load (`only()`) when the field is requested
+    get: Callable         # instance -> JSON value
+    prefetch: object = None
+
+
+def column(name: str) -> ApiField:
+    return ApiField((name,), lambda obj: getattr(obj, name))
+
+
+def related_ids(name: str, queryset) -> ApiField:
+    return ApiField((), lambda obj: [related.pk for related in getattr(obj, name).all()],
+                    Prefetch(name, queryset=queryset.only("id")))
+
+
+class Resource:
+    """
+        What the JSON API exposes of one model.
+
+        Subclasses declare the readable `fields` (a `?fields=` request loads only
+        the columns and relations of the fields it names), the `default_fields`
+        sent otherwise, the form validating writes and who may see or change rows.
+    """
+    name = None
+    model = None
+    fields = {}
+    default_fields = ()
+    form_class = None
+
+    def get_queryset(self, request):
+        return self.model.objects.all()
+
+    def can_create(self, request) -> bool:
+        return request.user.has_perm(f"{self.model._meta.app_label}.add_{self.model._meta.model_name}")
+
+    def can_change(self, request, obj) -> bool:
+        return request.user.has_perm(f"{self.model._meta.app_label}.change_{self.model._meta.model_name}")
+
+    def can_delete(self, request, obj) -> bool:
+        return request.user.has_perm(f"{self.model._meta.app_label}.delete_{self.model._meta.model_name}")
+
+    def delete(self, request, obj) -> None:
+        obj.delete()
+
+    def etag_version(self) -> str:
+        """Extra ETag component for changes that leave `updated_at` untouched."""
+        return ""
+
+    def serialize(self, obj, fields) -> dict:
+        return {name: self.fields[name].get(obj) for name in fields}
+
+
+class PlaybookResource(Resource):
+    name = "playbooks"
+    model = Playbook
+    fields = {
+        "id": column("id"),
+        "name": column("name"),
+        "description": column("description"),
+        "content": column("content"),
+        "is_public": column("is_public"),
+        "tags": related_ids("tags", Tag.objects.all()),
+        "visible_to": related_ids("visible_to", Group.objects.all()),
+        "created_at": column("created_at"),
+        "updated_at": column("updated_at"),
+    }
+    # The YAML body can be large; clients ask for it with `?fields=...,content`.
+    default_fields = ("id", "name", "description", "is_public", "tags", "visible_to", "created_at", "updated_at")
+    form_class = PlaybookForm
+
+    def get_queryset(self, request):
+        return Playbook.objects.visible_to(request.user)
+
+    def can_create(self, request) -> bool:
+        return True
+
+    def can_change(self, request, obj) -> bool:
+        # Like the HTML views: whoever can see a playbook may edit or delete it.
+        return True
+
+    def can_delete(self, request, obj) -> bool:
+        return True
+
+    def delete(self, request, obj) -> None:
+        obj.soft_delete(user=request.user)
+
+    def etag_version(self) -> str:
+        if row_cache_timeout():
+            # Bumped on tag / group (re)links and renames, see `modules.playbooks.fragments`.
+            return str(get_row_version())
+        # Without a shared cache another worker's bump is never seen here; read the
+        # link tables instead. Their ids only grow, so any (un)link changes the pair.
+        signature = []
+        for through in (Playbook.tags.through, Playbook.visible_to.through):
+            links = through.objects.aggregate(count=Count("pk"), last=Max("pk"))
+            signature.append(f"{links['count']}-{links['last']}")
+        return ":".join(signature)
+
+
+class TagResource(Resource):
+    name = "tags"
+    model = Tag
+    fields = {name: column(name) for name in ("id", "name", "description", "created_at", "updated_at")}
+    default_fields = tuple(fields)
+    form_class = modelform_factory(Tag, fields=["name", "description"])
+
+
+class GroupResource(Resource):
+    name = "groups"
+    model = Group
+    fields = {name: column(name) for name in ("id", "name", "description", "created_at", "updated_at")}
+    default_fields = tuple(fields)
+    form_class = modelform_factory(Group, fields=["name", "description"])
+
+
+RESOURCES = {resource.name: resource() for resource in (PlaybookResource, TagResource, GroupResource)}
@@ -0,0 +1,141 @@
+import base64
+import json
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from modules.core.models import Group, GroupMember, Tag
+from modules.playbooks.models import Playbook
+from modules.users.models import CustomUser
+
+
+class PlaybookApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="ci", email="ci@example.com", password="pw")
+        self.group = Group.objects.create(name="ops")
+        self.tag = Tag.objects.create(name="web")
+        self.public = Playbook.objects.create(name="public", content="- hosts: all")
+        self.hidden = Playbook.objects.create(name="hidden", is_public=False)
+        self.hidden.visible_to.add(self.group)
+        self.auth = {"HTTP_AUTHORIZATION": "Basic " + base64.b64encode(b"ci:pw").decode()}
+
+    def get(self, url, **headers):
+        return self.client.get(url, **self.auth, **headers)
+
+    def test_list_honours_visibility_and_sparse_fields(self):
+        response = self.get(reverse("api_playbooks"))
+        self.assertEqual([row["name"] for row in response.json()["results"]], ["public"])
+        self.assertNotIn("content", response.json()["results"][0])
+
+        GroupMember.objects.create(group=self.group, user=self.user)
+        response = self.get(reverse("api_playbooks") + "?fields=id,content")
+        self.assertEqual(response.json()["results"][0], {"id": self.public.pk, "content": "- hosts: all"})
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        self.assertEqual(self.get(reverse("api_playbooks") + "?fields=secret").status_code, 400)
+        self.assertEqual(self.client.get(reverse("api_playbooks")).status_code, 401)
+
+    def test_conditional_get_skips_serialization(self):
+        url = reverse("api_playbooks_detail", args=[self.public.pk])
+        etag = self.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any("content" in query["sql"] for query in ctx.captured_queries))
+
+        self.public.tags.add(self.tag)
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        list_etag = self.get(reverse("api_playbooks"))["ETag"]
+        self.assertEqual(self.get(reverse("api_playbooks"), HTTP_IF_NONE_MATCH=list_etag).status_code, 304)
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_etags_see_links_made_by_other_processes_without_a_shared_cache(self):
+        url = reverse("api_playbooks_detail", args=[self.public.pk])
+        etag = self.get(url)["ETag"]
+        self.assertEqual(self.get(url)["ETag"], etag)
+
+        # Bypasses the signals, like a write in a worker whose cache this one cannot see.
+        Playbook.tags.through.objects.create(playbook=self.public, tag=self.tag)
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.get(url)["ETag"]
+        Playbook.tags.through.objects.filter(playbook=self.public).delete()
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_basic_credentials_are_hashed_once_until_the_password_changes(self):
+        url = reverse("api_playbooks")
+        with mock.patch("modules.api.views.authenticate", wraps=authenticate) as checked:
+            self.assertEqual(self.get(url).status_code, 200)
+            self.assertEqual(self.get(url).status_code, 200)
+            self.assertEqual(checked.call_count, 1)
+
+            wrong = {"HTTP_AUTHORIZATION": "Basic " + base64.b64encode(b"ci:nope").decode()}
+            self.assertEqual(self.client.get(url, **wrong).status_code, 401)
+
+            self.user.set_password("new")
+            self.user.save()
+            self.assertEqual(self.get(url).status_code, 401)
+            self.assertEqual(checked.call_count, 3)
+
+    def test_cursor_pagination_returns_only_changes(self):
+        extra = [Playbook.objects.create(name=f"p{i}") for i in range(3)]
+        first = self.get(reverse("api_playbooks") + "?limit=3").json()
+        second = self.get(first["next"]).json()
+        self.assertEqual([row["name"] for row in first["results"] + second["results"]],
+                         ["public", "p0", "p1", "p2"])
+        self.assertIsNone(second["next"])
+
+        extra[0].description = "changed"
+        extra[0].save()
+        changes = self.get(reverse("api_playbooks") + f"?cursor={second['cursor']}").json()
+        self.assertEqual([row["name"] for row in changes["results"]], ["p0"])
+
+    def test_writes(self):
+        response = self.client.post(reverse("api_playbooks"), json.dumps({"name": "new", "tags": [self.tag.pk]}),
+                                    content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, 201)
+        created = Playbook.objects.get(pk=response.json()["id"])
+        self.assertEqual((created.created_by, list(created.tags.all())), (self.user, [self.tag]))
+
+        url = reverse("api_playbooks_detail", args=[created.pk])
+        etag = response["ETag"]
+        response = self.client.patch(url, json.dumps({"description": "edited"}), content_type="application/json",
+                                     HTTP_IF_MATCH=etag, **self.auth)
+        self.assertEqual(response.json()["description"], "edited")
+        self.assertEqual(response.json()["tags"], [self.tag.pk])
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH=etag, **self.auth).status_code, 412)
+
+        self.assertEqual(self.client.delete(url, **self.auth).status_code, 204)
+        self.assertFalse(Playbook.objects.filter(pk=created.pk).exists())
+
+        response = self.client.post(reverse("api_tags"), json.dumps({"name": "db"}),
+                                    content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, 403)
+
+    def test_session_writes_require_csrf(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse("api_playbooks"), json.dumps({"name": "new"}), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(client.get(reverse("api_groups")).json()["results"][0]["name"], "ops")
+
+    def test_bulk(self):
+        url = reverse("api_playbooks_bulk")
+        body = {"ids": [self.public.pk], "add_tags": [self.tag.pk]}
+        response = self.client.post(url, json.dumps(body), content_type="application/json", **self.auth)
+        self.assertEqual(response.json()["linked"], 1)
+        self.assertEqual(list(self.public.tags.all()), [self.tag])
+
+        body = {"ids": [self.public.pk, self.hidden.pk], "delete": True}
+        response = self.client.post(url, json.dumps(body), content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Playbook.objects.count(), 2)
+
+        response = self.client.post(url, json.dumps({"ids": "1"}), content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, 400)
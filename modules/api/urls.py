@@ -0,0 +1,12 @@
+from django.urls import path
+
+from modules.api.views import PlaybookBulkView, ResourceDetailView, ResourceListView
+
+urlpatterns = [
+    path("playbooks/bulk", PlaybookBulkView.as_view(), name="api_playbooks_bulk"),
+]
+for name in ("playbooks", "tags", "groups"):
+    urlpatterns += [
+        path(f"{name}/", ResourceListView.as_view(resource_name=name), name=f"api_{name}"),
+        path(f"{name}/<int:pk>", ResourceDetailView.as_view(resource_name=name), name=f"api_{name}_detail"),
+    ]
@@ -0,0 +1,326 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from modules.api.resources import RESOURCES
+from modules.audit.context import acting_as
+from modules.playbooks.bulk import bulk_update_playbooks
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+BASIC_AUTH_KEY = "api:basic-auth:{digest}"
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str, errors: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.errors = errors
+
+
+def make_etag(*parts) -> str:
+    # Strong validator: a different representation always gets a different tag.
+    return '"%s"' % hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def credential_mac(value: str) -> str:
+    return salted_hmac("api.basic-auth", value, algorithm="sha256").hexdigest()
+
+
+def basic_auth_user(request, header: str):
+    """
+        The user behind an HTTP Basic `Authorization` header.
+
+        Checking a password runs the full PBKDF2 hash, which would dominate a
+        304 poll. A successful check is therefore remembered for
+        API_BASIC_AUTH_CACHE_TIMEOUT seconds, keyed by an HMAC of the header.
+        The entry holds the user's id and an HMAC of their password hash, and a
+        hit is only accepted while the user is active and that hash is
+        unchanged. A password change or deactivation in any process therefore
+        takes effect at once.
+
+        Args:
+            request (HttpRequest): The API request.
+            header (str): The full `Authorization` header value.
+
+        Raises:
+            ApiError: 401 if the credentials are malformed or invalid.
+
+        Returns:
+            CustomUser: The authenticated user.
+    """
+    key = BASIC_AUTH_KEY.format(digest=credential_mac(header))
+    cached = cache.get(key)
+    if cached is not None:
+        pk, password_mac = cached
+        user = get_user_model()._default_manager.filter(pk=pk, is_active=True).first()
+        if user is not None and constant_time_compare(password_mac, credential_mac(user.password)):
+            return user
+
+    try:
+        username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ApiError(401, "Malformed credentials.")
+    user = authenticate(request, username=username, password=password)
+    if user is None:
+        raise ApiError(401, "Invalid credentials.")
+    timeout = getattr(settings, "API_BASIC_AUTH_CACHE_TIMEOUT", 60)
+    if timeout:
+        cache.set(key, (user.pk, credential_mac(user.password)), timeout)
+    return user
+
+
+def encode_cursor(updated_at: datetime, pk) -> str:
+    return base64.urlsafe_b64encode(json.dumps([updated_at.isoformat(), pk]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        updated_at, pk = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(updated_at), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise ApiError(400, "Invalid cursor.")
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ResourceView(View):
+    """
+        JSON endpoints of one `Resource`: list / create on the collection and
+        read / partial update / delete on single objects.
+
+        Clients authenticate with the session cookie (CSRF-checked on writes) or
+        HTTP Basic credentials (see `basic_auth_user`). Every read sends a strong ETag computed from
+        `updated_at` values (plus the resource's `etag_version`) with a cheap
+        query, so a matching `If-None-Match` is answered with 304 before any row
+        is loaded or serialized; `If-Match` on writes gives optimistic locking.
+
+        Lists are ordered by (`updated_at`, `id`) and paginated with an opaque
+        cursor: a poller keeps the last cursor and only receives what changed
+        since.
+    """
+    http_method_names = ["get", "head", "post", "patch", "delete", "options"]
+    resource_name = None
+
+    @property
+    def resource(self):
+        return RESOURCES[self.resource_name]
+
+    def authenticate(self, request) -> None:
+        header = request.headers.get("Authorization", "")
+        if header.startswith("Basic "):
+            request.user = basic_auth_user(request, header)
+        elif not request.user.is_authenticated:
+            raise ApiError(401, "Authentication required.")
+        elif request.method not in ("GET", "HEAD", "OPTIONS"):
+            # Session-authenticated writes stay protected against CSRF.
+            rejected = CsrfViewMiddleware(lambda req: None).process_view(request, None, (), {})
+            if rejected is not None:
+                raise ApiError(403, "CSRF check failed.")
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.authenticate(request)
+            with acting_as(request.user):
+                response = super().dispatch(request, *args, **kwargs)
+        except ApiError as exc:
+            body = {"detail": exc.message}
+            if exc.errors:
+                body["errors"] = exc.errors
+            response = JsonResponse(body, status=exc.status)
+        except Http404:
+            response = JsonResponse({"detail": "Not found."}, status=404)
+        patch_vary_headers(response, ["Cookie", "Authorization"])
+        return response
+
+    def requested_fields(self, request) -> tuple:
+        raw = request.GET.get("fields")
+        if not raw:
+            return self.resource.default_fields
+        fields = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        unknown = [name for name in fields if name not in self.resource.fields]
+        if unknown:
+            raise ApiError(400, f"Unknown fields: {', '.join(unknown)}.")
+        return fields
+
+    def load(self, queryset, fields):
+        """Restrict `queryset` to the columns and relations `fields` need."""
+        columns = {"id", "updated_at"}
+        prefetches = []
+        for name in fields:
+            field = self.resource.fields[name]
+            columns.update(field.columns)
+            if field.prefetch is not None:
+                prefetches.append(field.prefetch)
+        return queryset.only(*columns).prefetch_related(*prefetches)
+
+    def respond(self, data, etag: str, status: int = 200):
+        response = JsonResponse(data, status=status)
+        if etag:
+            response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def parse_body(self, request) -> dict:
+        try:
+            data = json.loads(request.body or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError(400, "Request body must be JSON.")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Request body must be a JSON object.")
+        return data
+
+    def get_object_etag(self, request, pk, fields):
+        updated_at = self.resource.get_queryset(request).filter(pk=pk).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            raise Http404
+        return make_etag(pk, updated_at.isoformat(), self.resource.etag_version(), ",".join(fields))
+
+    def form_data(self, request, instance) -> dict:
+        """The body over `instance`'s current values: omitted fields keep them (or the model defaults)."""
+        form_fields = self.resource.form_class.base_fields
+        current = {name: self.resource.fields[name].get(instance) for name in form_fields
+                   if name in self.resource.fields
+                   # An unsaved instance has no relations to read yet.
+                   and (instance.pk or self.resource.fields[name].prefetch is None)}
+        return {**current, **{key: value for key, value in self.parse_body(request).items() if key in form_fields}}
+
+    def save_form(self, request, data, instance=None, status=200):
+        form = self.resource.form_class(data=data, instance=instance)
+        if not form.is_valid():
+            raise ApiError(400, "Invalid data.", form.errors.get_json_data())
+        obj = form.save()
+        fields = self.resource.default_fields
+        obj = self.load(self.resource.get_queryset(request), fields).get(pk=obj.pk)
+        return self.respond(self.resource.serialize(obj, fields),
+                            self.get_object_etag(request, obj.pk, fields), status=status)
+
+
+class ResourceListView(ResourceView):
+    def get(self, request):
+        fields = self.requested_fields(request)
+        try:
+            limit = min(MAX_LIMIT, max(1, int(request.GET.get("limit", DEFAULT_LIMIT))))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer.")
+
+        queryset = self.resource.get_queryset(request).order_by("updated_at", "id")
+        cursor = request.GET.get("cursor")
+        if cursor:
+            updated_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+
+        # Keys of the page only: enough for the ETag and the next cursor.
+        page = list(queryset.values_list("id", "updated_at")[:limit])
+        etag = make_etag(self.resource.etag_version(), ",".join(fields), cursor,
+                         *(f"{pk}@{updated_at.isoformat()}" for pk, updated_at in page))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        objects = self.load(self.resource.model._base_manager.filter(pk__in=[pk for pk, _ in page]), fields)
+        by_pk = {obj.pk: obj for obj in objects}
+        next_cursor = encode_cursor(page[-1][1], page[-1][0]) if page else cursor
+        next_url = None
+        if len(page) == limit:
+            query = request.GET.copy()
+            query["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        return self.respond({
+            "results": [self.resource.serialize(by_pk[pk], fields) for pk, _ in page if pk in by_pk],
+            "next": next_url,
+            "cursor": next_cursor,
+        }, etag)
+
+    def post(self, request):
+        if not self.resource.can_create(request):
+            raise ApiError(403, "You may not create this resource.")
+        return self.save_form(request, self.form_data(request, self.resource.model()), status=201)
+
+
+class ResourceDetailView(ResourceView):
+    def get_object(self, request, pk, fields=None):
+        queryset = self.resource.get_queryset(request)
+        if fields is not None:
+            queryset = self.load(queryset, fields)
+        obj = queryset.filter(pk=pk).first()
+        if obj is None:
+            raise Http404
+        return obj
+
+    def get(self, request, pk):
+        fields = self.requested_fields(request)
+        etag = self.get_object_etag(request, pk, fields)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        return self.respond(self.resource.serialize(self.get_object(request, pk, fields), fields), etag)
+
+    def check_preconditions(self, request, pk):
+        precondition = get_conditional_response(
+            request, etag=self.get_object_etag(request, pk, self.resource.default_fields))
+        if precondition is not None:
+            raise ApiError(412, "The resource was modified; fetch it again.")
+
+    def patch(self, request, pk):
+        self.check_preconditions(request, pk)
+        obj = self.get_object(request, pk)
+        if not self.resource.can_change(request, obj):
+            raise ApiError(403, "You may not change this resource.")
+        return self.save_form(request, self.form_data(request, obj), instance=obj)
+
+    def delete(self, request, pk):
+        self.check_preconditions(request, pk)
+        obj = self.get_object(request, pk)
+        if not self.resource.can_delete(request, obj):
+            raise ApiError(403, "You may not delete this resource.")
+        self.resource.delete(request, obj)
+        return HttpResponse(status=204)
+
+
+class PlaybookBulkView(ResourceView):
+    """
+        `POST {"ids": [...], "add_tags": [...], "remove_tags": [...], "add_groups": [...],
+        "remove_groups": [...], "is_public": bool, "delete": bool}`: one transaction for
+        the whole selection, see `bulk_update_playbooks`.
+    """
+    http_method_names = ["post", "options"]
+    resource_name = "playbooks"
+    id_lists = ("ids", "add_tags", "remove_tags", "add_groups", "remove_groups")
+
+    def post(self, request):
+        data = self.parse_body(request)
+        unknown = set(data) - {*self.id_lists, "is_public", "delete"}
+        if unknown:
+            raise ApiError(400, f"Unknown keys: {', '.join(sorted(unknown))}.")
+        for key in self.id_lists:
+            value = data.get(key, [])
+            if not isinstance(value, list) or not all(isinstance(pk, int) for pk in value):
+                raise ApiError(400, f"{key} must be a list of ids.")
+        if data.get("is_public") not in (None, True, False) or data.get("delete", False) not in (True, False):
+            raise ApiError(400, "is_public and delete must be booleans.")
+        if not data.get("ids"):
+            raise ApiError(400, "ids must not be empty.")
+
+        try:
+            result = bulk_update_playbooks(request.user, data.pop("ids"), **data)
+        except PermissionDenied as exc:
+            raise ApiError(403, str(exc))
+        except ValidationError as exc:
+            raise ApiError(400, exc.messages[0])
+        return JsonResponse(result._asdict())
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import AuditEvent
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "action", "content_type", "object_repr", "user")
+    list_filter = ("action", "content_type")
+    list_select_related = ("content_type", "user")
+    search_fields = ("object_repr", "object_id")
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
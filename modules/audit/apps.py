@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class AuditConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    label = 'audit'
+    name = 'modules.audit'
+
+    def ready(self):
+        from modules.audit import signals
+
+        signals.connect_audit()
@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from modules.audit.models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+        In-memory write-behind buffer of audit events.
+
+        Signal handlers only append here; events reach the database with one
+        `bulk_create` when the buffer holds `max_size` events, when the oldest
+        one is `max_age` seconds old, after each response has been sent
+        (`request_finished`) and at process exit. Long-running commands have no
+        requests, so their loops call `flush_if_due` to honour `max_age`. A
+        failed flush is logged and never surfaces in the request that
+        triggered it.
+
+        Args:
+            max_size (int): Events held before a flush is forced.
+            max_age (float): Seconds the oldest event may wait before a flush is forced.
+    """
+
+    def __init__(self, max_size: int, max_age: float):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.events = []
+        self.oldest = None
+        self.lock = threading.Lock()
+
+    def add(self, event: AuditEvent) -> None:
+        with self.lock:
+            if not self.events:
+                self.oldest = time.monotonic()
+            self.events.append(event)
+            due = len(self.events) >= self.max_size or time.monotonic() - self.oldest >= self.max_age
+        if due:
+            self.flush()
+
+    def flush_if_due(self) -> int:
+        """Write pending events if the oldest one is `max_age` seconds old. Returns how many were written."""
+        with self.lock:
+            due = bool(self.events) and time.monotonic() - self.oldest >= self.max_age
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        """Write all pending events. Returns how many were written."""
+        with self.lock:
+            events, self.events = self.events, []
+        if not events:
+            return 0
+        try:
+            AuditEvent.objects.bulk_create(events, batch_size=500)
+        except DatabaseError:
+            logger.exception("Dropped %d audit events that could not be written.", len(events))
+            return 0
+        return len(events)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.events = []
+
+    def __len__(self):
+        return len(self.events)
+
+
+audit_buffer = AuditBuffer(
+    max_size=getattr(settings, "AUDIT_BUFFER_SIZE", 500),
+    max_age=getattr(settings, "AUDIT_FLUSH_INTERVAL", 5.0),
+)
+
+
+def flush_audit_events() -> int:
+    """Write buffered events now, e.g. before querying the log of something just changed."""
+    return audit_buffer.flush()
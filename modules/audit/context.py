@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_user = ContextVar("audit_current_user", default=None)
+
+
+def get_current_user():
+    """The authenticated user the current request (or `acting_as` block) acts for, if any."""
+    user = _current_user.get()
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+@contextmanager
+def acting_as(user):
+    """Attribute changes made inside the block to `user` (for commands and workers)."""
+    token = _current_user.set(user)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
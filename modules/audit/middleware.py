@@ -0,0 +1,24 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from modules.audit.context import acting_as
+
+
+class AuditUserMiddleware:
+    """Make `request.user` the actor of every change made while handling the request."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with acting_as(getattr(request, "user", None)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with acting_as(getattr(request, "user", None)):
+            return await self.get_response(request)
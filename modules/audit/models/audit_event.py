@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class AuditEventQuerySet(models.QuerySet):
+    def for_object(self, obj):
+        """Events of one object, newest first (served by `audit_object_idx`)."""
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(obj, for_concrete_model=False),
+            object_id=str(obj.pk),
+        ).order_by("-created_at", "-pk")
+
+    def by_user(self, user):
+        return self.filter(user=user).order_by("-created_at", "-pk")
+
+    def between(self, start=None, end=None):
+        """Events with `start <= created_at < end`; either bound may be omitted."""
+        events = self
+        if start is not None:
+            events = events.filter(created_at__gte=start)
+        if end is not None:
+            events = events.filter(created_at__lt=end)
+        return events
+
+
+class AuditEvent(models.Model):
+    """
+        One recorded change of an `AuditFieldsMixin` model.
+
+        `changes` maps field names to `[old, new]` for creates and updates
+        (`old` is null when the previous value was not loaded), and to
+        `{"add" | "remove" | "clear": [pks]}` for many-to-many changes.
+    """
+
+    class Action(models.TextChoices):
+        CREATE = "create", "Created"
+        UPDATE = "update", "Updated"
+        DELETE = "delete", "Deleted"
+        RESTORE = "restore", "Restored"
+        M2M = "m2m", "Relations changed"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=64)
+    object_repr = models.CharField(max_length=200, blank=True, default="")
+    action = models.CharField(max_length=10, choices=Action.choices)
+    changes = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                             related_name="audit_events")
+    created_at = models.DateTimeField(db_index=True)
+
+    objects = AuditEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at", "-pk"]
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "created_at"], name="audit_object_idx"),
+            models.Index(fields=["user", "created_at"], name="audit_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.object_repr}"
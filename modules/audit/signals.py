@@ -0,0 +1,160 @@
+import atexit
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils import timezone
+
+from modules.audit.buffer import audit_buffer
+from modules.audit.context import get_current_user
+from modules.audit.models import AuditEvent
+from modules.core.models import AuditFieldsMixin
+
+# Bookkeeping columns every save touches; diffs leave them out.
+IGNORED_FIELDS = {"created_at", "updated_at"}
+REDACTED = "********"
+
+
+def audited_models():
+    return [model for model in apps.get_models() if issubclass(model, AuditFieldsMixin)]
+
+
+def _jsonable(value):
+    if isinstance(value, (bytes, memoryview)):
+        return f"<{len(value)} bytes>"
+    limit = getattr(settings, "AUDIT_MAX_VALUE_LENGTH", 1000)
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + f"... <{len(value)} chars>"
+    return value
+
+
+def _audited_fields(model):
+    excluded = IGNORED_FIELDS.union(model.audit_exclude)
+    return [field for field in model._meta.concrete_fields if field.name not in excluded]
+
+
+def diff(instance, created: bool, update_fields=None) -> dict:
+    """
+        Field-level changes of a save, computed against the values the instance was loaded with.
+
+        Args:
+            instance (AuditFieldsMixin): The saved instance.
+            created (bool): Whether the save inserted the row.
+            update_fields (Iterable[str], optional): Restricts the compared fields, like `save()`.
+
+        Returns:
+            dict: Field name -> `[old, new]`.
+    """
+    loaded = instance.__dict__.get("_loaded_values", {})
+    changes = {}
+    for field in _audited_fields(type(instance)):
+        if update_fields is not None and field.name not in update_fields:
+            continue
+        if field.attname not in instance.__dict__:
+            continue  # Deferred and never loaded: it was not saved either.
+        new = getattr(instance, field.attname)
+        if created:
+            if new is None or new == "":
+                continue
+            old = None
+        elif field.attname in loaded:
+            old = loaded[field.attname]
+            if old == new:
+                continue
+        else:
+            old = None
+        if field.name in type(instance).audit_redact:
+            changes[field.name] = [REDACTED, REDACTED]
+        else:
+            changes[field.name] = [_jsonable(old), _jsonable(new)]
+    return changes
+
+
+def record(instance, action: str, changes: dict) -> None:
+    """Queue an event; it enters the buffer only once the surrounding transaction commits."""
+    event = AuditEvent(
+        content_type=ContentType.objects.get_for_model(instance, for_concrete_model=False),
+        object_id=str(instance.pk),
+        object_repr=str(instance)[:200],
+        action=action,
+        changes=changes,
+        user=get_current_user(),
+        created_at=timezone.now(),
+    )
+    transaction.on_commit(partial(audit_buffer.add, event), using=instance._state.db)
+
+
+def fill_audit_users(sender, instance, raw=False, update_fields=None, **kwargs):
+    user = get_current_user()
+    if raw or user is None:
+        return
+    if instance._state.adding:
+        if instance.created_by_id is None:
+            instance.created_by_id = user.pk
+    elif update_fields is None:
+        instance.updated_by_id = user.pk
+
+
+def record_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    changes = diff(instance, created, update_fields)
+    if created:
+        action = AuditEvent.Action.CREATE
+    elif not changes:
+        return
+    elif "deleted_at" in changes:
+        action = AuditEvent.Action.DELETE if instance.deleted_at else AuditEvent.Action.RESTORE
+    else:
+        action = AuditEvent.Action.UPDATE
+    record(instance, action, changes)
+
+    loaded = instance.__dict__.setdefault("_loaded_values", {})
+    for field in _audited_fields(sender):
+        if field.attname in instance.__dict__:
+            loaded[field.attname] = getattr(instance, field.attname)
+
+
+def record_delete(sender, instance, **kwargs):
+    record(instance, AuditEvent.Action.DELETE, {})
+
+
+def _m2m_receiver(field):
+    forward_name = field.name
+    reverse_name = field.remote_field.get_accessor_name()
+
+    def record_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+        name = reverse_name if reverse else forward_name
+        if not isinstance(instance, AuditFieldsMixin):
+            return
+        if action == "pre_clear":
+            # Remember who is about to be unlinked; `post_clear` gets no pk_set.
+            instance.__dict__.setdefault("_audit_cleared", {})[name] = sorted(
+                getattr(instance, name).values_list("pk", flat=True))
+        elif action == "post_clear":
+            cleared = instance.__dict__.get("_audit_cleared", {}).pop(name, [])
+            if cleared:
+                record(instance, AuditEvent.Action.M2M, {name: {"clear": cleared}})
+        elif action in {"post_add", "post_remove"} and pk_set:
+            record(instance, AuditEvent.Action.M2M, {name: {action[5:]: sorted(pk_set)}})
+
+    return record_m2m
+
+
+def connect_audit() -> None:
+    """Connect the audit receivers to every `AuditFieldsMixin` model and its many-to-many fields."""
+    for model in audited_models():
+        pre_save.connect(fill_audit_users, sender=model, dispatch_uid=f"audit-users-{model._meta.label}")
+        post_save.connect(record_save, sender=model, dispatch_uid=f"audit-save-{model._meta.label}")
+        post_delete.connect(record_delete, sender=model, dispatch_uid=f"audit-delete-{model._meta.label}")
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(_m2m_receiver(field), sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f"audit-m2m-{model._meta.label}.{field.name}")
+
+    # Write-behind: the buffer is emptied once the response is out, never before.
+    request_finished.connect(lambda **kwargs: audit_buffer.flush(), weak=False, dispatch_uid="audit-flush")
+    atexit.register(audit_buffer.flush)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from modules.audit.buffer import AuditBuffer, audit_buffer, flush_audit_events
+from modules.audit.context import acting_as
+from modules.audit.models import AuditEvent
+from modules.core.models import Tag
+from modules.playbooks.models import Playbook
+from modules.secrets.store import set_secret
+from modules.users.models import CustomUser
+
+
+class AuditEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        audit_buffer.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+
+    def test_changes_are_buffered_until_flushed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            playbook = Playbook.objects.create(name="deploy", content="- hosts: all")
+        self.assertFalse(AuditEvent.objects.exists())
+
+        self.assertEqual(flush_audit_events(), 2)  # The playbook and its first version.
+        event = AuditEvent.objects.for_object(playbook).get()
+        self.assertEqual(event.action, AuditEvent.Action.CREATE)
+        self.assertEqual(event.changes["name"], [None, "deploy"])
+
+    def test_updates_record_field_diffs_and_the_acting_user(self):
+        playbook = Playbook.objects.create(name="deploy", description="old")
+        playbook = Playbook.objects.get(pk=playbook.pk)
+        with self.captureOnCommitCallbacks(execute=True), acting_as(self.user):
+            playbook.description = "new"
+            playbook.save()
+            playbook.save()
+            playbook.soft_delete(user=self.user)
+            playbook.restore()
+        flush_audit_events()
+
+        update, delete, restore = reversed(AuditEvent.objects.for_object(playbook))
+        self.assertEqual(update.changes, {"description": ["old", "new"], "updated_by": [None, self.user.pk]})
+        self.assertEqual(update.user, self.user)
+        self.assertEqual(delete.action, AuditEvent.Action.DELETE)
+        self.assertEqual(restore.action, AuditEvent.Action.RESTORE)
+        self.assertEqual(Playbook.objects.get(pk=playbook.pk).updated_by, self.user)
+
+    def test_many_to_many_changes_and_redacted_fields(self):
+        playbook = Playbook.objects.create(name="deploy")
+        tag = Tag.objects.create(name="web")
+        with self.captureOnCommitCallbacks(execute=True):
+            playbook.tags.add(tag)
+            tag.playbook_tags.clear()
+            secret = set_secret("global", "token", "s3cr3t")
+        flush_audit_events()
+
+        self.assertEqual([event.changes for event in reversed(AuditEvent.objects.for_object(playbook))],
+                         [{"tags": {"add": [tag.pk]}}])
+        self.assertEqual(AuditEvent.objects.for_object(tag).get().changes, {"playbook_tags": {"clear": [playbook.pk]}})
+        self.assertNotIn("s3cr3t", str(AuditEvent.objects.for_object(secret).get().changes))
+
+    def test_requests_attribute_changes_and_flush_after_the_response(self):
+        playbook = Playbook.objects.create(name="deploy", content="- hosts: all")
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("playbook_delete", args=[playbook.pk]))
+        self.client.get(reverse("playbook_list"))
+
+        event = AuditEvent.objects.by_user(self.user).get()
+        self.assertEqual((event.action, event.object_id), (AuditEvent.Action.DELETE, str(playbook.pk)))
+        now = timezone.now()
+        self.assertEqual(AuditEvent.objects.between(now - timedelta(minutes=1), now).count(), 1)
+        self.assertFalse(AuditEvent.objects.between(start=now).exists())
+
+    def test_buffer_flushes_itself_when_full(self):
+        buffer = AuditBuffer(max_size=2, max_age=60)
+        playbook = Playbook.objects.create(name="deploy")
+        event = lambda: AuditEvent(content_type_id=1, object_id=str(playbook.pk), action="update",
+                                   created_at=timezone.now())
+        buffer.add(event())
+        self.assertEqual(AuditEvent.objects.count(), 0)
+        buffer.add(event())
+        self.assertEqual((AuditEvent.objects.count(), len(buffer)), (2, 0))
+
+    def test_flush_if_due_only_writes_aged_events(self):
+        buffer = AuditBuffer(max_size=100, max_age=60)
+        playbook = Playbook.objects.create(name="deploy")
+        buffer.add(AuditEvent(content_type_id=1, object_id=str(playbook.pk), action="update",
+                              created_at=timezone.now()))
+        self.assertEqual(buffer.flush_if_due(), 0)
+        buffer.oldest -= 60
+        self.assertEqual((buffer.flush_if_due(), len(buffer)), (1, 0))
+        self.assertEqual(buffer.flush_if_due(), 0)
@@ -0,0 +1,137 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+_MEMBERSHIP_VERSION_KEY = "acl:membership-version:{user_id}"
+_HIERARCHY_VERSION_KEY = "acl:group-hierarchy-version"
+_USER_GROUP_IDS_KEY = "acl:user-group-ids:{user_id}:{version}:{hierarchy}"
+_REQUEST_MEMO_ATTR = "_maestro_group_ids"
+
+
+def _timeout():
+    return getattr(settings, "ACL_CACHE_TIMEOUT", 300)
+
+
+def _bump(versions: dict) -> None:
+    """
+        Store new versions now and once more when the transaction commits.
+
+        The first write lets the changing transaction see its own changes. A
+        concurrent request may then cache the old, still committed, state under
+        the new version; the second write, with yet another version, makes
+        that entry unreachable as soon as the change is visible to everyone.
+    """
+    if not versions:
+        return
+    cache.set_many(versions, None)
+
+    def bump_again():
+        version = time.time_ns()
+        cache.set_many({key: version for key in versions}, None)
+
+    transaction.on_commit(bump_again)
+
+
+def get_membership_version(user_id: int) -> int:
+    """
+        Return the current membership version for a user.
+
+        The version is part of the cache key of the user's group ids, so bumping
+        it makes every process forget the old entry at once. A missing version
+        (first use or eviction) is seeded from the clock instead of a counter,
+        so it can never collide with a version that was used before.
+
+        Args:
+            user_id (int): Primary key of the user.
+
+        Returns:
+            int: An opaque version number.
+    """
+    return _get_version(_MEMBERSHIP_VERSION_KEY.format(user_id=user_id))
+
+
+def _get_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_membership_version(*user_ids: int) -> None:
+    """
+        Invalidate the cached group ids of the given users.
+
+        Args:
+            *user_ids (int): Primary keys of the users whose membership changed.
+    """
+    version = time.time_ns()
+    _bump({_MEMBERSHIP_VERSION_KEY.format(user_id=user_id): version for user_id in user_ids if user_id is not None})
+
+
+def get_hierarchy_version() -> int:
+    return _get_version(_HIERARCHY_VERSION_KEY)
+
+
+def bump_hierarchy_version() -> None:
+    """Invalidate every user's cached group ids after groups were nested or un-nested."""
+    _bump({_HIERARCHY_VERSION_KEY: time.time_ns()})
+
+
+def get_user_group_ids(user) -> frozenset:
+    """
+        Return the ids of the Maestro groups a user belongs to.
+
+        Membership is inherited upwards: a member of a nested group also belongs
+        to every group above it. The ancestors come from the group closure
+        table, so this is a single query whatever the nesting depth.
+
+        Results are memoized on the user instance (which lives for a single
+        request as `request.user`) and backed by the shared cache, keyed by
+        the user's membership version. With `ACL_CACHE_TIMEOUT = 0` (the
+        default unless `CACHE_URL` names a cache shared by every process) only
+        the per-request memo is used.
+
+        Args:
+            user (CustomUser): The user to look up (anonymous users have no groups).
+
+        Returns:
+            frozenset: The group ids.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    group_ids = getattr(user, _REQUEST_MEMO_ATTR, None)
+    if group_ids is not None:
+        return group_ids
+
+    key = None
+    group_ids = None
+    if _timeout():
+        key = _USER_GROUP_IDS_KEY.format(user_id=user.pk, version=get_membership_version(user.pk),
+                                         hierarchy=get_hierarchy_version())
+        group_ids = cache.get(key)
+    if group_ids is None:
+        from modules.core.models import Group
+
+        direct = user.maestro_groups.values("id")
+        group_ids = frozenset(Group.closure().ancestor_ids(direct).values_list("ancestor_id", flat=True))
+        if key is not None:
+            cache.set(key, group_ids, _timeout())
+
+    setattr(user, _REQUEST_MEMO_ATTR, group_ids)
+    return group_ids
+
+
+def forget_request_memo(user) -> None:
+    """
+        Drop the per-request memo so the next lookup goes back to the cache.
+
+        Args:
+            user (CustomUser): The user instance holding the memo.
+    """
+    if hasattr(user, _REQUEST_MEMO_ATTR):
+        delattr(user, _REQUEST_MEMO_ATTR)
@@ -45,5 +45,6 @@ class GroupAdmin(admin.ModelAdmin):
     list_display = ("name", "description")
     search_fields = ("name",)
     inlines = [GroupMemberInlineForGroup]
+    filter_horizontal = ("children",)
 
     exclude = ("created_by", "updated_by", "deleted_by", "deleted_at")
@@ -5,3 +5,6 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modules.core'
     label = 'core'
+
+    def ready(self):
+        from modules.core import signals  # noqa: F401
@@ -0,0 +1,279 @@
+from collections import defaultdict, deque
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+
+class ClosureTable:
+    """
+        Maintains the transitive closure of a parent -> child group graph.
+
+        For every pair of groups where one is reachable from the other, the
+        closure model stores a row `(ancestor, descendant, depth, paths)`;
+        every group also has a row pointing at itself with depth 0. `depth` is
+        the length of the shortest path and `paths` the number of distinct
+        paths, which is what lets an edge be removed incrementally: only pairs
+        whose last path went through it disappear.
+
+        With the table in place, "everything under X" and "everything above Y"
+        are single indexed lookups instead of recursive walks.
+
+        Args:
+            closure_model (Model): Model with `ancestor`, `descendant`, `depth` and `paths` fields.
+            edge_model (Model): The through model of the `children` many-to-many.
+            parent_field (str): Attribute name of the parent id on `edge_model`.
+            child_field (str): Attribute name of the child id on `edge_model`.
+    """
+
+    def __init__(self, closure_model, edge_model, parent_field: str, child_field: str):
+        self.closure_model = closure_model
+        self.edge_model = edge_model
+        self.parent_field = parent_field
+        self.child_field = child_field
+
+    @property
+    def rows(self):
+        return self.closure_model.objects
+
+    def descendant_ids(self, node_id, include_self: bool = True):
+        rows = self.rows.filter(ancestor_id=node_id)
+        if not include_self:
+            rows = rows.exclude(depth=0)
+        return rows.values("descendant_id")
+
+    def ancestor_ids(self, node_ids, include_self: bool = True):
+        rows = self.rows.filter(descendant_id__in=node_ids)
+        if not include_self:
+            rows = rows.exclude(depth=0)
+        return rows.values("ancestor_id")
+
+    def add_nodes(self, *node_ids) -> None:
+        self.rows.bulk_create(
+            [self.closure_model(ancestor_id=pk, descendant_id=pk, depth=0, paths=1) for pk in node_ids],
+            ignore_conflicts=True,
+        )
+
+    def check_edges(self, parent_id, child_ids) -> None:
+        """Raise `ValidationError` if linking `parent_id` to any of `child_ids` creates a cycle."""
+        if self.rows.filter(ancestor_id__in=child_ids, descendant_id=parent_id).exists():
+            raise ValidationError("A group cannot be nested inside itself or one of its descendants.")
+
+    def _apply(self, parent_id, child_id, sign: int) -> None:
+        ups = list(self.rows.filter(descendant_id=parent_id).values_list("ancestor_id", "depth", "paths"))
+        downs = list(self.rows.filter(ancestor_id=child_id).values_list("descendant_id", "depth", "paths"))
+        existing = {
+            (row.ancestor_id, row.descendant_id): row
+            for row in self.rows.filter(ancestor_id__in=[a for a, _, _ in ups],
+                                        descendant_id__in=[d for d, _, _ in downs])
+        }
+
+        created, changed, emptied = [], [], []
+        for ancestor, up_depth, up_paths in ups:
+            for descendant, down_depth, down_paths in downs:
+                paths = up_paths * down_paths * sign
+                depth = up_depth + down_depth + 1
+                row = existing.get((ancestor, descendant))
+                if row is None:
+                    if sign > 0:
+                        created.append(self.closure_model(ancestor_id=ancestor, descendant_id=descendant,
+                                                          depth=depth, paths=paths))
+                    continue
+                row.paths += paths
+                if row.paths <= 0:
+                    emptied.append(row.pk)
+                else:
+                    row.depth = min(row.depth, depth)
+                    changed.append(row)
+
+        self.rows.bulk_create(created, batch_size=1000)
+        self.rows.bulk_update(changed, ["depth", "paths"], batch_size=1000)
+        self.rows.filter(pk__in=emptied).delete()
+        if sign < 0:
+            self._refresh_depths([a for a, _, _ in ups], [d for d, _, _ in downs])
+
+    def _refresh_depths(self, ancestor_ids, descendant_ids) -> None:
+        """
+            Recompute shortest depths after an edge removal.
+
+            Only pairs with an ancestor above the removed edge and a descendant
+            below it can be affected. Descendants are visited in topological
+            order, so `depth(a, d) = 1 + min(depth(a, parent))` always reads
+            already corrected values.
+        """
+        descendant_ids = set(descendant_ids)
+        parents = defaultdict(set)
+        for parent, child in self.edge_model.objects.filter(
+            **{f"{self.child_field}__in": descendant_ids}
+        ).values_list(self.parent_field, self.child_field):
+            parents[child].add(parent)
+
+        rows = {
+            (row.ancestor_id, row.descendant_id): row
+            for row in self.rows.filter(ancestor_id__in=ancestor_ids,
+                                        descendant_id__in=descendant_ids | {p for ps in parents.values() for p in ps})
+        }
+
+        pending = {d: len(parents[d] & descendant_ids) for d in descendant_ids}
+        queue = deque(d for d, count in pending.items() if count == 0)
+        children = defaultdict(list)
+        for child, ps in parents.items():
+            for parent in ps & descendant_ids:
+                children[parent].append(child)
+
+        changed = []
+        while queue:
+            descendant = queue.popleft()
+            for ancestor in ancestor_ids:
+                row = rows.get((ancestor, descendant))
+                if row is None or ancestor == descendant:
+                    continue
+                depth = min((rows[(ancestor, p)].depth + 1 for p in parents[descendant] if (ancestor, p) in rows),
+                            default=row.depth)
+                if depth != row.depth:
+                    row.depth = depth
+                    changed.append(row)
+            for child in children[descendant]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    queue.append(child)
+        self.rows.bulk_update(changed, ["depth"], batch_size=1000)
+
+    def add_edges(self, parent_id, child_ids) -> None:
+        with transaction.atomic():
+            for child_id in child_ids:
+                self._apply(parent_id, child_id, 1)
+
+    def remove_edges(self, parent_id, child_ids) -> None:
+        """Update the closure after `parent_id -> child_ids` links were deleted."""
+        with transaction.atomic():
+            for child_id in child_ids:
+                self._apply(parent_id, child_id, -1)
+
+    def detach_node(self, node_id) -> None:
+        """Delete every link of a node (before the node itself is deleted)."""
+        edges = self.edge_model.objects.filter(
+            Q(**{self.parent_field: node_id}) | Q(**{self.child_field: node_id})
+        )
+        links = list(edges.values_list(self.parent_field, self.child_field))
+        if not links:
+            return
+        with transaction.atomic():
+            edges.delete()
+            for parent_id, child_id in links:
+                self._apply(parent_id, child_id, -1)
+
+    def rebuild(self, node_ids) -> int:
+        """
+            Recompute the closure of the subgraph made of `node_ids` from scratch.
+
+            Used after bulk loads that bypass the many-to-many signals. The
+            subgraph must be closed (no links to nodes outside of it).
+
+            Returns:
+                int: Number of closure rows written.
+        """
+        node_ids = set(node_ids)
+        children = defaultdict(list)
+        indegree = dict.fromkeys(node_ids, 0)
+        for parent, child in self.edge_model.objects.filter(
+            **{f"{self.parent_field}__in": node_ids}
+        ).values_list(self.parent_field, self.child_field).iterator():
+            children[parent].append(child)
+            indegree[child] += 1
+
+        order = []
+        queue = deque(pk for pk, degree in indegree.items() if degree == 0)
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for child in children[node]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        if len(order) != len(node_ids):
+            raise ValidationError("The group hierarchy contains a cycle.")
+
+        # Children before parents: each node's reach is its children's reach, one level deeper.
+        reach = {}
+        for node in reversed(order):
+            row = {node: [0, 1]}
+            for child in children[node]:
+                for descendant, (depth, paths) in reach[child].items():
+                    current = row.setdefault(descendant, [depth + 1, 0])
+                    current[0] = min(current[0], depth + 1)
+                    current[1] += paths
+            reach[node] = row
+
+        with transaction.atomic():
+            self.rows.filter(ancestor_id__in=node_ids).delete()
+            self.rows.bulk_create(
+                (self.closure_model(ancestor_id=ancestor, descendant_id=descendant, depth=depth, paths=paths)
+                 for ancestor, row in reach.items() for descendant, (depth, paths) in row.items()),
+                batch_size=1000,
+            )
+        return sum(len(row) for row in reach.values())
+
+
+def connect_closure(table: ClosureTable, node_model, on_change=None, container_model=None) -> None:
+    """
+        Keep `table` in sync with the `children` links of `node_model`.
+
+        Args:
+            table (ClosureTable): The closure to maintain.
+            node_model (Model): The group model.
+            on_change (callable, optional): Called without arguments after the hierarchy changed.
+            container_model (Model, optional): Model whose deletion cascades to a whole,
+                self-contained graph (e.g. an inventory); nodes deleted that way are not
+                detached one by one since all their closure rows go away with them.
+    """
+    from django.db.models.signals import m2m_changed, post_save, pre_delete
+
+    def notify():
+        if on_change:
+            on_change()
+
+    def node_saved(sender, instance, created, raw=False, **kwargs):
+        if created:
+            table.add_nodes(instance.pk)
+
+    def node_deleted(sender, instance, origin=None, **kwargs):
+        if container_model is not None and isinstance(origin, container_model):
+            return
+        table.detach_node(instance.pk)
+        notify()
+
+    def links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        def requested():
+            return [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set or ()]
+
+        def existing(filters):
+            return list(table.edge_model.objects.filter(**filters)
+                        .values_list(table.parent_field, table.child_field))
+
+        if action == "pre_add":
+            for parent_id, child_id in requested():
+                table.check_edges(parent_id, [child_id])
+            return
+        if action in {"pre_remove", "pre_clear"}:
+            # Only links that actually exist may be subtracted from the closure.
+            field = table.child_field if reverse else table.parent_field
+            filters = {field: instance.pk}
+            if action == "pre_remove":
+                filters[f"{table.parent_field if reverse else table.child_field}__in"] = pk_set
+            instance._closure_removed = existing(filters)
+            return
+
+        if action == "post_add":
+            for parent_id, child_id in requested():
+                table.add_edges(parent_id, [child_id])
+        elif action in {"post_remove", "post_clear"}:
+            for parent_id, child_id in instance.__dict__.pop("_closure_removed", []):
+                table.remove_edges(parent_id, [child_id])
+        else:
+            return
+        notify()
+
+    post_save.connect(node_saved, sender=node_model, weak=False)
+    pre_delete.connect(node_deleted, sender=node_model, weak=False)
+    m2m_changed.connect(links_changed, sender=table.edge_model, weak=False)
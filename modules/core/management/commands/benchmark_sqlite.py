@@ -0,0 +1,175 @@
+import json
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+from maestro.sqlite import PROFILES, sqlite_options
+
+SCHEMA = [
+    "CREATE TABLE bench_event (id INTEGER PRIMARY KEY, run_id INTEGER NOT NULL, line TEXT NOT NULL, "
+    "created REAL NOT NULL)",
+    "CREATE INDEX bench_event_run ON bench_event (run_id, id)",
+    "CREATE TABLE bench_run (id INTEGER PRIMARY KEY, lines INTEGER NOT NULL, updated REAL NOT NULL)",
+]
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Workload:
+    """
+        Concurrent writers and readers on one database file, each thread with
+        its own Django connection configured by `sqlite_options(profile)`.
+
+        Writers mimic run workers: read a run's counter, append log lines and
+        bump the counter in one transaction. Readers mimic the web UI polling a
+        run's latest lines. Lock wait is the time until a writer's transaction
+        holds the write lock: `BEGIN` under `BEGIN IMMEDIATE`, the first write
+        otherwise.
+    """
+
+    def __init__(self, path: Path, profile: str, runs: int):
+        self.profile = profile
+        self.runs = runs
+        self.handler = ConnectionHandler({
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": str(path),
+                        "OPTIONS": sqlite_options(profile)},
+        })
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.lock_waits, self.read_latencies = [], []
+        self.writes = self.reads = self.errors = 0
+
+    def setup(self) -> None:
+        connection = self.handler["default"]
+        with connection.cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany("INSERT INTO bench_run (id, lines, updated) VALUES (%s, 0, 0)",
+                               [(run_id,) for run_id in range(self.runs)])
+        connection.close()
+
+    def _begin(self, cursor, mode):
+        cursor.execute(f"BEGIN {mode}" if mode else "BEGIN")
+
+    def writer(self, number: int) -> None:
+        connection = self.handler["default"]
+        connection.ensure_connection()
+        mode = connection.transaction_mode
+        run_id = number % self.runs
+        lines = [f"TASK [writer {number}] ok: [host-{i}]" for i in range(20)]
+        cursor = connection.cursor()
+        while not self.stopping.is_set():
+            started = time.perf_counter()
+            try:
+                self._begin(cursor, mode)
+                if mode == "IMMEDIATE":
+                    waited = time.perf_counter() - started
+                cursor.execute("SELECT lines FROM bench_run WHERE id = %s", [run_id])
+                cursor.fetchone()
+                first_write = time.perf_counter()
+                cursor.executemany("INSERT INTO bench_event (run_id, line, created) VALUES (%s, %s, %s)",
+                                   [(run_id, line, time.time()) for line in lines])
+                if mode != "IMMEDIATE":
+                    waited = time.perf_counter() - first_write
+                cursor.execute("UPDATE bench_run SET lines = lines + %s, updated = %s WHERE id = %s",
+                               [len(lines), time.time(), run_id])
+                cursor.execute("COMMIT")
+            except OperationalError:
+                # "database is locked": SQLite gave up (timeout or read-to-write upgrade deadlock).
+                try:
+                    cursor.execute("ROLLBACK")
+                except OperationalError:
+                    pass
+                with self.lock:
+                    self.errors += 1
+                continue
+            with self.lock:
+                self.writes += 1
+                self.lock_waits.append(waited)
+        connection.close()
+
+    def reader(self, number: int) -> None:
+        connection = self.handler["default"]
+        cursor = connection.cursor()
+        while not self.stopping.is_set():
+            started = time.perf_counter()
+            try:
+                cursor.execute("SELECT line FROM bench_event WHERE run_id = %s ORDER BY id DESC LIMIT 50",
+                               [number % self.runs])
+                cursor.fetchall()
+            except OperationalError:
+                with self.lock:
+                    self.errors += 1
+                continue
+            with self.lock:
+                self.reads += 1
+                self.read_latencies.append(time.perf_counter() - started)
+        connection.close()
+
+    def run(self, writers: int, readers: int, duration: float) -> dict:
+        threads = ([threading.Thread(target=self.writer, args=(i,)) for i in range(writers)]
+                   + [threading.Thread(target=self.reader, args=(i,)) for i in range(readers)])
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        self.stopping.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "profile": self.profile,
+            "writes_per_second": round(self.writes / elapsed, 1),
+            "reads_per_second": round(self.reads / elapsed, 1),
+            "lock_errors": self.errors,
+            "lock_wait_p50_ms": round(statistics.median(self.lock_waits) * 1000, 2) if self.lock_waits else 0,
+            "lock_wait_p99_ms": round(percentile(self.lock_waits, 0.99) * 1000, 2),
+            "read_p99_ms": round(percentile(self.read_latencies, 0.99) * 1000, 2),
+        }
+
+
+class Command(BaseCommand):
+    help = ("Simulate concurrent writers and readers on a scratch SQLite file and report "
+            "throughput and lock waits for each connection profile.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Concurrent writer threads.")
+        parser.add_argument("--readers", type=int, default=8, help="Concurrent reader threads.")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds each profile runs.")
+        parser.add_argument("--runs", type=int, default=4,
+                            help="Distinct runs written to (fewer means more contention on the same rows).")
+        parser.add_argument("--profile", choices=(*PROFILES, "all"), default="all",
+                            help="Profile to benchmark (default: all).")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        profiles = PROFILES if options["profile"] == "all" else (options["profile"],)
+        results = []
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as tmp:
+                workload = Workload(Path(tmp) / "bench.sqlite3", profile, max(1, options["runs"]))
+                workload.setup()
+                results.append(workload.run(options["writers"], options["readers"], options["duration"]))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"{result['profile']:>10}: {result['writes_per_second']:>8} writes/s "
+                f"{result['reads_per_second']:>9} reads/s  lock wait p50 {result['lock_wait_p50_ms']} ms "
+                f"p99 {result['lock_wait_p99_ms']} ms  read p99 {result['read_p99_ms']} ms  "
+                f"{result['lock_errors']} lock errors"
+            )
@@ -0,0 +1,65 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from modules.core.perf import FULL_DATASET, DatasetSpec, load_dataset, measure_views, seed_dataset
+
+
+class Command(BaseCommand):
+    help = ("Seed a scratch database with a deterministic large dataset and measure query counts and "
+            "latency of the main views against their pinned budgets.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=FULL_DATASET.users)
+        parser.add_argument("--groups", type=int, default=FULL_DATASET.groups)
+        parser.add_argument("--tags", type=int, default=FULL_DATASET.tags)
+        parser.add_argument("--playbooks", type=int, default=FULL_DATASET.playbooks)
+        parser.add_argument("--seed", type=int, default=FULL_DATASET.seed, help="Random seed of the dataset.")
+        parser.add_argument("--repeat", type=int, default=20, help="Measured requests per view.")
+        parser.add_argument("--database", default=None,
+                            help="SQLite file to seed (default: a temporary file). With --keepdb, "
+                                 "an existing file is reused without reseeding.")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the seeded database afterwards.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+        parser.add_argument("--output", default=None, help="Also write the JSON results to this file.")
+        parser.add_argument("--check", action="store_true", help="Exit with status 1 when a budget is exceeded.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("benchmark_views seeds a scratch SQLite database; run it with the SQLite settings.")
+        spec = DatasetSpec(options["users"], options["groups"], options["tags"], options["playbooks"],
+                           options["seed"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            database = Path(options["database"] or Path(tmp) / "benchmark.sqlite3")
+            reuse = options["keepdb"] and database.exists()
+            connection.settings_dict.setdefault("TEST", {})["NAME"] = str(database)
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=reuse,
+                                                          serialize=False)
+            setup_test_environment()
+            try:
+                dataset = load_dataset(spec) if reuse else seed_dataset(spec)
+                results = measure_views(dataset, repeat=max(1, options["repeat"]))
+            finally:
+                teardown_test_environment()
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {"dataset": spec._asdict(), "vendor": connection.vendor, "views": results}
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for result in results:
+                style = self.style.SUCCESS if result["within_budget"] else self.style.ERROR
+                self.stdout.write(style(
+                    f"{result['view']:>16}: {result['queries']:>3}/{result['max_queries']} queries  "
+                    f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']}/{result['max_p95_ms']} ms"
+                ))
+        if options["check"] and not all(result["within_budget"] for result in results):
+            sys.exit(1)
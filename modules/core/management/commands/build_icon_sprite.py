@@ -0,0 +1,87 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.core.templatetags.icons import ICON_SPRITE_MANIFEST, clear_icon_caches
+
+_ROOT_RE = re.compile(r"<svg\b([^>]*)>(.*)</svg>", re.I | re.S)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+
+# Root attributes that only matter to a standalone file, not to a <symbol>.
+_DROPPED_ATTRS = {"class", "width", "height", "id", "x", "y", "version", "xmlns", "xml:space", "enable-background"}
+
+
+def find_icons() -> dict:
+    """Every `icons/*.svg` visible to the staticfiles finders, first match wins (like `finders.find`)."""
+    icons = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list([]):
+            parts = path.replace("\\", "/").split("/")
+            if len(parts) == 2 and parts[0] == "icons" and parts[1].endswith(".svg"):
+                icons.setdefault(parts[1][:-4], storage.path(path))
+    return dict(sorted(icons.items()))
+
+
+def to_symbol(name: str, svg_text: str) -> tuple[str, dict]:
+    """
+        Turn a standalone SVG into a `<symbol id="icon-{name}">`.
+
+        Presentation attributes of the root (`viewBox`, `fill`, `stroke`, ...) move
+        to the symbol; its `class` is returned so the referencing `<svg>` keeps it.
+
+        Returns:
+            tuple[str, dict]: The symbol markup and the icon's manifest entry.
+    """
+    match = _ROOT_RE.search(_COMMENT_RE.sub("", svg_text))
+    if not match:
+        raise CommandError(f"icons/{name}.svg has no <svg> root element.")
+    attrs = dict(_ATTR_RE.findall(match.group(1)))
+    kept = " ".join(f'{key}="{value}"' for key, value in attrs.items()
+                    if key not in _DROPPED_ATTRS and not key.startswith("xmlns:"))
+    symbol = f'<symbol id="icon-{name}" {kept}>{match.group(2).strip()}</symbol>'
+    entry = {"class": attrs["class"]} if attrs.get("class") else {}
+    return symbol, entry
+
+
+class Command(BaseCommand):
+    help = ("Merge static/icons/*.svg into one content-hashed <symbol> sprite, so custom "
+            "icons render as <use href> references instead of inline SVG bodies.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None,
+                            help="Directory to write the sprite to (default: icons/sprite/ in the "
+                                 "first STATICFILES_DIRS entry).")
+
+    def handle(self, *args, **options):
+        output = Path(options["output"] or Path(settings.STATICFILES_DIRS[0]) / Path(ICON_SPRITE_MANIFEST).parent)
+        icons = find_icons()
+        if not icons:
+            raise CommandError("No icons found under static/icons/.")
+
+        symbols, manifest_icons = [], {}
+        for name, path in icons.items():
+            symbol, entry = to_symbol(name, Path(path).read_text(encoding="utf-8"))
+            symbols.append(symbol)
+            manifest_icons[name] = entry
+
+        sprite = ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                  'style="display:none">' + "".join(symbols) + "</svg>\n")
+        digest = hashlib.sha256(sprite.encode("utf-8")).hexdigest()[:12]
+        filename = f"icons.{digest}.svg"
+
+        output.mkdir(parents=True, exist_ok=True)
+        for stale in output.glob("icons.*.svg"):
+            if stale.name != filename:
+                stale.unlink()
+        (output / filename).write_text(sprite, encoding="utf-8")
+        manifest = {"file": f"{Path(ICON_SPRITE_MANIFEST).parent.as_posix()}/{filename}", "icons": manifest_icons}
+        (output / Path(ICON_SPRITE_MANIFEST).name).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        clear_icon_caches()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(symbols)} icons to {output / filename}."))
@@ -0,0 +1,90 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.core.management.commands.build_icon_sprite import find_icons
+
+ASSETS_DIR = Path(settings.BASE_DIR) / "maestro"
+NODE_MODULES = ASSETS_DIR / "node_modules"
+VENDOR_DIR = ASSETS_DIR / "static" / "vendor"
+
+# Pre-minified browser builds copied from node_modules (paths relative to both
+# directories). CodeMirror is minified and bundled with its YAML mode by
+# `npm run build:editor` instead.
+VENDORED = {
+    "alpinejs/dist/cdn.min.js": "alpinejs/alpine.min.js",
+    "@alpinejs/persist/dist/cdn.min.js": "alpinejs/persist.min.js",
+    "htmx.org/dist/htmx.min.js": "htmx/htmx.min.js",
+    "@fortawesome/fontawesome-free/css/all.min.css": "fontawesome/css/all.min.css",
+    "@fortawesome/fontawesome-free/webfonts": "fontawesome/webfonts",
+    "@fortawesome/fontawesome-free/LICENSE.txt": "fontawesome/LICENSE.txt",
+    "codemirror/LICENSE": "codemirror/LICENSE",
+}
+
+
+def vendor_assets(node_modules: Path = NODE_MODULES, vendor_dir: Path = VENDOR_DIR) -> list:
+    """
+        Copy the `VENDORED` files and directories from `node_modules` into `static/vendor/`.
+
+        Returns:
+            list[Path]: The copied destinations.
+
+        Raises:
+            CommandError: A package is not installed (run `npm install` first).
+    """
+    copied = []
+    for source, target in VENDORED.items():
+        source, target = node_modules / source, vendor_dir / target
+        if not source.exists():
+            raise CommandError(f"{source} is missing; run `npm install` in {node_modules.parent}.")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if source.is_dir():
+            shutil.copytree(source, target, dirs_exist_ok=True)
+        else:
+            shutil.copyfile(source, target)
+        copied.append(target)
+    return copied
+
+
+class Command(BaseCommand):
+    help = ("Build the self-hosted static files: compile and minify the Tailwind CSS, vendor and "
+            "minify the editor and browser libraries from node_modules, build the icon sprite, then "
+            "collect everything into STATIC_ROOT with content-hashed names and gzip/brotli variants.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip-npm", action="store_true",
+                            help="Use the CSS and static/vendor/ files as they are, without node "
+                                 "(e.g. on an air-gapped host that received them with the source).")
+
+    def handle(self, *args, **options):
+        if not settings.STATIC_MANIFEST:
+            raise CommandError("Set STATIC_MANIFEST=true (and optionally STATIC_ROOT): build_static writes "
+                               "the hashed, precompressed files that setting serves.")
+
+        if not options["skip_npm"]:
+            npm = shutil.which("npm")
+            if npm is None:
+                raise CommandError("npm is not on PATH; install node, or pass --skip-npm.")
+            copied = vendor_assets()
+            self.stdout.write(f"Vendored {len(copied)} assets into {VENDOR_DIR}.")
+            (VENDOR_DIR / "codemirror").mkdir(parents=True, exist_ok=True)
+            try:
+                subprocess.run([npm, "run", "build"], cwd=ASSETS_DIR, check=True)
+            except subprocess.CalledProcessError as exc:
+                raise CommandError(f"`npm run build` failed with exit status {exc.returncode}.")
+        elif not VENDOR_DIR.is_dir():
+            raise CommandError(f"{VENDOR_DIR} does not exist; run build_static without --skip-npm once.")
+
+        if find_icons():
+            call_command("build_icon_sprite", stdout=self.stdout)
+
+        call_command("collectstatic", interactive=False, clear=True, verbosity=0)
+        root = Path(settings.STATIC_ROOT)
+        files = [path for path in root.rglob("*") if path.is_file()]
+        compressed = sum(path.suffix in (".gz", ".br") for path in files)
+        self.stdout.write(self.style.SUCCESS(
+            f"Collected {len(files) - compressed} files and {compressed} compressed variants into {root}."))
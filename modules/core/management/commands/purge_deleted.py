@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from modules.core.models import SoftDeleteManager
+from modules.playbooks.versioning import purge_orphaned_blobs
+
+
+def soft_delete_models():
+    return [model for model in apps.get_models() if isinstance(model._default_manager, SoftDeleteManager)]
+
+
+def cascading_relations(model):
+    return [rel for rel in model._meta.related_objects
+            if (rel.one_to_many or rel.one_to_one) and rel.on_delete is models.CASCADE]
+
+
+def purge_rows(model, ids: list, batch_size: int, sleep: float = 0) -> int:
+    """
+        Hard-delete `ids` of `model` after their cascading dependents.
+
+        Rows that would be removed by an `on_delete=CASCADE` (runs, their events,
+        versions, ...) are deleted first, depth-first and `batch_size` at a time,
+        each batch in its own transaction; the final delete of `ids` then only
+        cascades to what was added meanwhile.
+
+        Args:
+            model (Model): The model to delete from.
+            ids (list): Primary keys, at most `batch_size` of them.
+            batch_size (int): Rows deleted per transaction.
+            sleep (float, optional): Seconds to pause between dependent batches.
+
+        Returns:
+            int: The number of dependent rows purged.
+    """
+    purged = 0
+    for rel in cascading_relations(model):
+        related = rel.related_model
+        rows = related._base_manager.filter(**{f"{rel.field.name}__in": ids}).order_by("pk")
+        while batch := list(rows.values_list("pk", flat=True)[:batch_size]):
+            purged += purge_rows(related, batch, batch_size, sleep)
+            with transaction.atomic():
+                related._base_manager.filter(pk__in=batch).delete()
+            purged += len(batch)
+            time.sleep(sleep)
+    return purged
+
+
+class Command(BaseCommand):
+    help = ("Hard-delete soft-deleted rows older than the retention window, in small "
+            "transactions so writers are never blocked for long.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Retention in days (default: SOFT_DELETE_RETENTION_DAYS).")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Rows deleted per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.1,
+                            help="Seconds to pause between batches.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only count the rows that would be purged.")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = getattr(settings, "SOFT_DELETE_RETENTION_DAYS", 30)
+        if days < 0 or options["batch_size"] < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+        cutoff = timezone.now() - timedelta(days=days)
+
+        for model in soft_delete_models():
+            label = model._meta.label
+            expired = model._base_manager.filter(deleted_at__lt=cutoff)
+            if options["dry_run"]:
+                self.stdout.write(f"{label}: {expired.count()} rows would be purged.")
+                continue
+
+            purged = dependents = 0
+            while True:
+                ids = list(expired.order_by("pk").values_list("pk", flat=True)[:options["batch_size"]])
+                if not ids:
+                    break
+                # Dependents go first in batches of their own, so no transaction grows with the
+                # number of runs, events or versions behind a tombstone.
+                dependents += purge_rows(model, ids, options["batch_size"], options["sleep"])
+                with transaction.atomic():
+                    model._base_manager.filter(pk__in=ids).delete()
+                purged += len(ids)
+                if len(ids) < options["batch_size"]:
+                    break
+                time.sleep(options["sleep"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: purged {purged} rows deleted before {cutoff:%Y-%m-%d %H:%M} "
+                f"and {dependents} dependent rows."))
+
+        if not options["dry_run"]:
+            blobs = purge_orphaned_blobs(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Purged {blobs} content blobs no version refers to."))
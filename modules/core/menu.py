@@ -0,0 +1,87 @@
+import json
+from typing import NamedTuple
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import escape
+
+
+class MenuItem(NamedTuple):
+    label: str
+    icon: str
+    submenu: tuple          # ((label, url), ...) with every url already reversed
+    submenu_js: str         # `submenu` as an HTML-escaped JS object literal, for Alpine's x-data
+    permissions: frozenset  # Shown only to users having all of them (empty: everyone)
+
+
+_compiled = None
+
+# Rendered sidebar HTML per set of granted menu permissions (few distinct sets exist).
+rendered_menus = {}
+MAX_RENDERED_MENUS = 256
+
+
+def compile_menu(registry: dict) -> tuple:
+    """
+        Turn a declarative menu (see `MENU_REGISTRY` in settings) into immutable `MenuItem`s.
+
+        Url names are reversed here, once; entries starting with "/" are kept as is.
+        An item may list `permissions` (e.g. ["playbooks.add_playbook"]) to be hidden
+        from users lacking any of them. `registry` itself is never modified.
+
+        Args:
+            registry (dict): Menu groups keyed by label.
+
+        Returns:
+            tuple[MenuItem, ...]: The compiled menu, in registry order.
+    """
+    items = []
+    for label, item in registry.items():
+        submenu = tuple(
+            (sub_label, url if url.startswith("/") else reverse(url))
+            for sub_label, url in item.get("submenu", {}).items()
+        )
+        items.append(MenuItem(
+            label=label,
+            icon=item.get("icon", ""),
+            submenu=submenu,
+            submenu_js=escape(json.dumps(dict(submenu))),
+            permissions=frozenset(item.get("permissions", ())),
+        ))
+    return tuple(items)
+
+
+def compile_registry() -> tuple:
+    """
+        Compile `settings.MENU_REGISTRY` and drop the rendered menus.
+
+        Runs on the first `get_compiled_menu()`, not at startup: reversing in
+        `AppConfig.ready` imports the whole URLconf (and every view module)
+        in management commands that never render a page, and fails if a URL
+        module imports something that is not ready yet.
+    """
+    global _compiled
+    _compiled = compile_menu(getattr(settings, "MENU_REGISTRY", {}))
+    rendered_menus.clear()
+    return _compiled
+
+
+def get_compiled_menu() -> tuple:
+    return _compiled if _compiled is not None else compile_registry()
+
+
+def merge_menu(base: tuple, extra: dict = None) -> tuple:
+    """`base` with page-specific `extra` groups compiled and merged in (replacing same labels)."""
+    if not extra:
+        return base
+    extra_items = compile_menu(extra)
+    replaced = {item.label for item in extra_items}
+    return tuple(item for item in base if item.label not in replaced) + extra_items
+
+
+def menu_permissions(menu: tuple) -> frozenset:
+    return frozenset().union(*(item.permissions for item in menu))
+
+
+def visible_items(menu: tuple, granted: frozenset) -> tuple:
+    return tuple(item for item in menu if item.permissions <= granted)
@@ -0,0 +1,168 @@
+import cProfile
+import heapq
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """
+        A Prometheus histogram with a fixed label set.
+
+        `observe()` is on the request path: it takes one lock and bumps a
+        non-cumulative bucket list; cumulating is left to `render()`, which
+        only runs on scrapes.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): `# HELP` text.
+            labelnames (tuple[str, ...]): Label names, in the order `observe()` gets their values.
+            buckets (tuple[float, ...]): Upper bounds, ascending (+Inf is implied).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = {labels: list(series) for labels, series in self.series.items()}
+        for labels, series in sorted(snapshot.items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip((*map(_number, self.buckets), "+Inf"), series):
+                cumulative += count
+                bucket_labels = ",".join([*pairs, 'le="%s"' % bound])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label_text} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self.lock:
+            self.series.clear()
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple, buckets: tuple) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+request_duration = registry.histogram(
+    "maestro_http_request_duration_seconds", "Time spent handling requests, by URL name.",
+    ("view", "method", "status"), DURATION_BUCKETS)
+db_queries = registry.histogram(
+    "maestro_http_request_db_queries", "SQL queries run per request.", ("view",), QUERY_BUCKETS)
+db_duration = registry.histogram(
+    "maestro_http_request_db_duration_seconds", "Time spent in SQL queries per request.", ("view",),
+    DURATION_BUCKETS)
+template_duration = registry.histogram(
+    "maestro_http_request_template_duration_seconds", "Time spent rendering template responses.", ("view",),
+    DURATION_BUCKETS)
+response_size = registry.histogram(
+    "maestro_http_response_size_bytes", "Size of non-streaming response bodies.", ("view",), SIZE_BUCKETS)
+
+
+class QueryTimer:
+    """`connection.execute_wrapper` counting the queries of one request and the time they take."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+_FILENAME_RE = re.compile(r"[^\w.-]+")
+
+
+class SlowestProfiles:
+    """
+        Keeps the cProfile dumps of the `keep` slowest sampled requests in `directory`.
+
+        Files are named `<milliseconds>ms-<view>-<pid>-<n>.prof` and can be read
+        with `python -m pstats`. A faster dump is deleted as soon as a slower
+        request pushes it out of the top `keep`.
+
+        Args:
+            directory (Path): Where the dumps are written.
+            keep (int): Number of dumps kept.
+    """
+
+    def __init__(self, directory: Path, keep: int):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self.heap = []  # (seconds, path), fastest first
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def is_slow_enough(self, seconds: float) -> bool:
+        return len(self.heap) < self.keep or seconds > self.heap[0][0]
+
+    def add(self, profiler: cProfile.Profile, seconds: float, view: str) -> Path:
+        with self.lock:
+            if not self.is_slow_enough(seconds):
+                return None
+            self.written += 1
+            name = _FILENAME_RE.sub("_", f"{seconds * 1000:09.1f}ms-{view}-{os.getpid()}-{self.written}.prof")
+            path = self.directory / name
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            heapq.heappush(self.heap, (seconds, str(path)))
+            if len(self.heap) > self.keep:
+                _, evicted = heapq.heappop(self.heap)
+                Path(evicted).unlink(missing_ok=True)
+            return path
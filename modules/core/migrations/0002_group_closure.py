@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from modules.core.closure import ClosureTable
+
+
+def build_closure(apps, schema_editor):
+    node_model = apps.get_model("core", "Group")
+    table = ClosureTable(apps.get_model("core", "GroupClosure"), node_model.children.through,
+                         "from_group_id", "to_group_id")
+    table.rebuild(node_model.objects.values_list("pk", flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='children',
+            field=models.ManyToManyField(blank=True, related_name='parents', to='core.group'),
+        ),
+        migrations.CreateModel(
+            name='GroupClosure',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('depth', models.PositiveIntegerField()),
+                ('paths', models.PositiveBigIntegerField(default=1)),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='core.group')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='core.group')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='group_closure_up_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_group_closure')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from .audit_fields_mixin import AuditFieldsMixin
 from .audit_model import AuditModel
+from .soft_delete import SoftDeleteManager, SoftDeleteMixin, SoftDeleteQuerySet
 from .tag import Tag
-from .groups import Group, GroupMember
\ No newline at end of file
+from .groups import Group, GroupClosure, GroupMember
\ No newline at end of file
@@ -21,5 +21,17 @@ class AuditFieldsMixin(models.Model):
         on_delete=models.SET_NULL, related_name="%(class)s_deleted"
     )
 
+    # Fields left out of audit diffs entirely, and fields whose changes are
+    # recorded without their values (see `modules.audit`).
+    audit_exclude = ()
+    audit_redact = ()
+
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Values as loaded, so audit diffs need no extra query on save.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from modules.core.closure import ClosureTable
 from modules.core.models import AuditFieldsMixin
 
 class Group(AuditFieldsMixin):
@@ -15,6 +16,16 @@ class Group(AuditFieldsMixin):
         related_query_name='maestro_group',
         blank=True,
     )
+    children = models.ManyToManyField(
+        'self',
+        symmetrical=False,
+        related_name='parents',
+        blank=True,
+    )
+
+    @classmethod
+    def closure(cls) -> ClosureTable:
+        return ClosureTable(GroupClosure, cls.children.through, 'from_group_id', 'to_group_id')
 
     def __str__(self):
         return self.name
@@ -31,3 +42,19 @@ class GroupMember(AuditFieldsMixin):
 
     def __str__(self):
         return f"{self.user} in {self.group}"
+
+class GroupClosure(models.Model):
+    """Transitive closure of `Group.children`, maintained by `modules.core.closure`."""
+    id = models.BigAutoField(primary_key=True)
+    ancestor = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+    paths = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_group_closure')
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor'], name='group_closure_up_idx'),
+        ]
@@ -0,0 +1,63 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def dead(self):
+        return self.filter(deleted_at__isnull=False)
+
+    def soft_delete(self, user=None) -> int:
+        """
+            Mark every row of the queryset as deleted with a single UPDATE.
+
+            Nothing cascades: related rows stay in place until `purge_deleted`
+            removes the tombstones for good.
+
+            Args:
+                user (CustomUser, optional): Recorded as `deleted_by`.
+
+            Returns:
+                int: The number of rows marked.
+        """
+        now = timezone.now()
+        return self.alive().update(deleted_at=now, deleted_by=user, updated_at=now)
+
+    def restore(self) -> int:
+        return self.dead().update(deleted_at=None, deleted_by=None, updated_at=timezone.now())
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+        Default manager of soft-deletable models: hides rows with `deleted_at` set.
+
+        Models using it should keep a plain manager (e.g. `all_objects`) for the
+        rare places that need tombstones, and declare their hot indexes with
+        `condition=Q(deleted_at__isnull=True)` so live queries never scan them.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteMixin(models.Model):
+    """Instance-level `soft_delete()` / `restore()` for `AuditFieldsMixin` models."""
+
+    def soft_delete(self, user=None) -> None:
+        self.deleted_at = timezone.now()
+        self.deleted_by = user
+        self.save(update_fields=["deleted_at", "deleted_by", "updated_at"])
+
+    def restore(self) -> None:
+        self.deleted_at = None
+        self.deleted_by = None
+        self.save(update_fields=["deleted_at", "deleted_by", "updated_at"])
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.deleted_at is not None
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,209 @@
+import random
+import statistics
+import time
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from modules.core.models import Group, GroupMember, Tag
+from modules.playbooks.models import Playbook
+from modules.playbooks.search import get_search_backend
+from modules.users.models import CustomUser
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 2000
+
+
+class DatasetSpec(NamedTuple):
+    users: int
+    groups: int
+    tags: int
+    playbooks: int
+    seed: int = 42
+
+
+FULL_DATASET = DatasetSpec(users=50_000, groups=2_000, tags=500, playbooks=20_000)
+
+
+class Dataset(NamedTuple):
+    spec: DatasetSpec
+    user: CustomUser        # Member of several (nested) groups; the views are measured as this user
+    playbook_ids: list      # Playbooks visible to `user`, in name order
+
+
+def _skewed(rng: random.Random, population: int, low: int, high: int) -> list:
+    """`low`..`high` distinct indexes below `population`; a third of the picks go to a few popular ones."""
+    count = min(population, rng.randint(low, high))
+    picked = set()
+    while len(picked) < count:
+        index = int(rng.paretovariate(1.2)) - 1 if rng.random() < 0.3 else rng.randrange(population)
+        picked.add(min(population - 1, index))
+    return sorted(picked)
+
+
+def _playbook_yaml(rng: random.Random, number: int) -> str:
+    tasks = "".join(
+        f"    - name: Step {step} of playbook {number}\n"
+        f"      ansible.builtin.command: /usr/local/bin/task-{rng.randrange(1000)} --level {step}\n"
+        for step in range(rng.randint(3, 40))
+    )
+    return f"- hosts: group{number % 97}\n  become: true\n  tasks:\n{tasks}"
+
+
+def seed_dataset(spec: DatasetSpec = FULL_DATASET) -> Dataset:
+    """
+        Fill an empty database with a deterministic, realistically shaped dataset.
+
+        Everything is derived from `spec.seed`, so two runs (or two commits)
+        measure the same data. Groups form a shallow hierarchy, users belong to
+        one to five groups, and tag and group fan-out follows a long-tailed
+        distribution (a few tags and groups are on most playbooks). Rows are
+        bulk-inserted without signals; the group closure and the search index
+        are rebuilt once at the end.
+
+        Args:
+            spec (DatasetSpec): Row counts and random seed.
+
+        Returns:
+            Dataset: The spec, the user to measure as and the playbooks visible to them.
+    """
+    rng = random.Random(spec.seed)
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        Group.objects.bulk_create([Group(name=f"group-{i:05d}", description=f"Team {i}") for i in range(spec.groups)],
+                                  batch_size=BATCH_SIZE)
+        group_ids = list(Group.objects.order_by("id").values_list("id", flat=True))
+        children = Group.children.through
+        children.objects.bulk_create(
+            # Every tenth group nests under an earlier one, three levels deep at most.
+            [children(from_group_id=group_ids[i // 10], to_group_id=group_ids[i])
+             for i in range(10, spec.groups, 10)],
+            batch_size=BATCH_SIZE,
+        )
+        Group.closure().rebuild(group_ids)
+
+        Tag.objects.bulk_create([Tag(name=f"tag-{i:04d}") for i in range(spec.tags)], batch_size=BATCH_SIZE)
+        tag_ids = list(Tag.objects.order_by("id").values_list("id", flat=True))
+
+        for start in range(0, spec.users, BATCH_SIZE):
+            CustomUser.objects.bulk_create([
+                CustomUser(username=f"user{i:06d}", email=f"user{i:06d}@example.com", password=password,
+                           first_name="Bench", last_name=f"User {i}")
+                for i in range(start, min(spec.users, start + BATCH_SIZE))
+            ])
+        user_ids = list(CustomUser.objects.order_by("id").values_list("id", flat=True)[:spec.users])
+        GroupMember.objects.bulk_create(
+            [GroupMember(group_id=group_ids[index], user_id=user_id)
+             for user_id in user_ids for index in _skewed(rng, spec.groups, 1, 5)],
+            batch_size=BATCH_SIZE,
+        )
+
+        tags, shares = Playbook.tags.through, Playbook.visible_to.through
+        for start in range(0, spec.playbooks, BATCH_SIZE):
+            batch = Playbook.objects.bulk_create([
+                Playbook(name=f"playbook-{i:06d}", description=f"Deploys service {i % 400} to stage {i % 7}",
+                         content=_playbook_yaml(rng, i), is_public=rng.random() < 0.6)
+                for i in range(start, min(spec.playbooks, start + BATCH_SIZE))
+            ])
+            tags.objects.bulk_create([tags(playbook_id=playbook.pk, tag_id=tag_ids[index])
+                                      for playbook in batch for index in _skewed(rng, spec.tags, 0, 6)])
+            shares.objects.bulk_create([shares(playbook_id=playbook.pk, group_id=group_ids[index])
+                                        for playbook in batch for index in _skewed(rng, spec.groups, 1, 4)])
+        get_search_backend().rebuild()
+
+    user = CustomUser.objects.get(pk=user_ids[0])
+    playbook_ids = list(Playbook.objects.visible_to(user).order_by("name").values_list("id", flat=True))
+    return Dataset(spec, user, playbook_ids)
+
+
+def load_dataset(spec: DatasetSpec) -> Dataset:
+    """The `Dataset` of a database seeded earlier with `spec` (for `--keepdb` reruns)."""
+    user = CustomUser.objects.order_by("id").first()
+    playbook_ids = list(Playbook.objects.visible_to(user).order_by("name").values_list("id", flat=True))
+    return Dataset(spec, user, playbook_ids)
+
+
+class ViewCase(NamedTuple):
+    name: str
+    max_queries: int            # Pinned query budget; a new N+1 breaks it at any dataset size
+    max_p95_ms: float           # Latency threshold on the full dataset
+    request: Callable           # (client, dataset, iteration) -> response
+    login: bool = True
+
+
+def _list(client, dataset, iteration):
+    return client.get(reverse("playbook_list"), {"page": 1 + iteration % 3})
+
+
+def _update(client, dataset, iteration):
+    return client.get(reverse("playbook_update", args=[dataset.playbook_ids[iteration % len(dataset.playbook_ids)]]))
+
+
+def _delete(client, dataset, iteration):
+    # Each iteration soft-deletes another playbook, from the end of the list.
+    return client.post(reverse("playbook_delete", args=[dataset.playbook_ids[-1 - iteration]]))
+
+
+def _login(client, dataset, iteration):
+    # A fresh client each time: the session is new, like a browser's first login.
+    return Client().post(reverse("login"), {"username": dataset.user.username, "password": PASSWORD})
+
+
+VIEW_CASES = [
+    ViewCase("playbook_list", max_queries=8, max_p95_ms=250, request=_list),
+    ViewCase("playbook_update", max_queries=8, max_p95_ms=800, request=_update),
+    ViewCase("playbook_delete", max_queries=10, max_p95_ms=150, request=_delete),
+    # Dominated by the password hasher, by design.
+    ViewCase("login", max_queries=9, max_p95_ms=1500, request=_login, login=False),
+]
+
+
+def measure_views(dataset: Dataset, cases=VIEW_CASES, repeat: int = 20, warmup: int = 2) -> list:
+    """
+        Request each view `warmup + repeat` times and report its query count and latency.
+
+        The query count is the maximum over the measured requests; warm-up
+        requests fill the template, menu and ACL caches first, as in a running
+        server. Budgets assume the shared cache production uses, so the ACL
+        cache is on even with the process-local default: everything measured
+        runs in this one process.
+
+        Returns:
+            list[dict]: One result per case, with `within_budget` telling whether
+            both the query budget and the latency threshold hold.
+    """
+    with override_settings(ACL_CACHE_TIMEOUT=settings.ACL_CACHE_TIMEOUT or 300):
+        return [_measure(case, dataset, repeat, warmup) for case in cases]
+
+
+def _measure(case: ViewCase, dataset: Dataset, repeat: int, warmup: int) -> dict:
+    client = Client()
+    if case.login:
+        client.force_login(dataset.user)
+    timings, queries = [], 0
+    for iteration in range(warmup + repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = case.request(client, dataset, iteration)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise AssertionError(f"{case.name} answered {response.status_code}.")
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(ctx.captured_queries))
+    p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+    return {
+        "view": case.name,
+        "queries": queries,
+        "max_queries": case.max_queries,
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(p95, 2),
+        "max_p95_ms": case.max_p95_ms,
+        "within_budget": queries <= case.max_queries and p95 <= case.max_p95_ms,
+    }
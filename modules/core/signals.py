@@ -0,0 +1,35 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from modules.core.acl import bump_hierarchy_version, bump_membership_version, forget_request_memo
+from modules.core.closure import connect_closure
+from modules.core.models import Group, GroupMember
+
+
+@receiver(post_save, sender=GroupMember)
+@receiver(post_delete, sender=GroupMember)
+def invalidate_member_groups(sender, instance, **kwargs):
+    bump_membership_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_members(sender, instance, **kwargs):
+    bump_membership_version(*instance.groupmember_set.values_list("user_id", flat=True))
+
+
+@receiver(m2m_changed, sender=GroupMember)
+def invalidate_changed_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"pre_clear", "post_add", "post_remove"}:
+        return
+
+    if reverse:
+        # `user.maestro_groups.<action>(...)`: the instance is the user.
+        forget_request_memo(instance)
+        bump_membership_version(instance.pk)
+    elif action == "pre_clear":
+        bump_membership_version(*instance.groupmember_set.values_list("user_id", flat=True))
+    else:
+        bump_membership_version(*pk_set)
+
+
+connect_closure(Group.closure(), Group, on_change=bump_hierarchy_version)
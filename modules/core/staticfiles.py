@@ -0,0 +1,75 @@
+import asyncio
+
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StaticFilesASGI:
+    """
+        Serves static files in front of the ASGI application.
+
+        WhiteNoise only ships a WSGI wrapper and a sync-only Django middleware;
+        as middleware it makes Django adapt the whole chain, so every async
+        request (including the run log streams) would hop through a thread.
+        Files are looked up in the index WhiteNoise builds from the Django
+        settings (same headers, compressed variants and `immutable` rules) and
+        sent from a worker thread; everything else goes to `application`.
+
+        Args:
+            application: The Django ASGI application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.whitenoise = WhiteNoiseMiddleware()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope["path"].removeprefix(scope.get("root_path", ""))
+            if self.whitenoise.autorefresh:
+                static_file = await asyncio.to_thread(self.whitenoise.find_file, path)
+            else:
+                static_file = self.whitenoise.files.get(path)
+            if static_file is not None:
+                return await self.serve(static_file, scope, send)
+        return await self.application(scope, receive, send)
+
+    @staticmethod
+    async def serve(static_file, scope, send) -> None:
+        # WhiteNoise reads request headers from a WSGI environ.
+        environ = {"HTTP_" + name.decode("latin-1").upper().replace("-", "_"): value.decode("latin-1")
+                   for name, value in scope["headers"]}
+        response = await asyncio.to_thread(static_file.get_response, scope["method"], environ)
+        await send({
+            "type": "http.response.start",
+            "status": int(response.status),
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in response.headers],
+        })
+        if response.file is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        try:
+            while chunk := await asyncio.to_thread(response.file.read, CHUNK_SIZE):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            response.file.close()
+
+
+class StaticFilesWSGI(WhiteNoiseMiddleware):
+    """
+        WhiteNoise as a WSGI wrapper, configured from the Django settings like its middleware.
+
+        Args:
+            application: The Django WSGI application.
+    """
+
+    def __init__(self, application):
+        super().__init__()
+        self.application = application
+
+    __call__ = WhiteNoise.__call__
+    serve = staticmethod(WhiteNoise.serve)
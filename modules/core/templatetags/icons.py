@@ -1,7 +1,11 @@
+import json
 import re
+from functools import lru_cache
 
 from django import template
+from django.conf import settings
 from django.contrib.staticfiles import finders
+from django.templatetags.static import static
 from django.utils.html import conditional_escape
 from django.utils.safestring import mark_safe
 
@@ -9,6 +13,9 @@ register = template.Library()
 
 _icons_cache = {}
 
+# Written by `manage.py build_icon_sprite`; icons listed there are rendered as `<use>` references.
+ICON_SPRITE_MANIFEST = "icons/sprite/manifest.json"
+
 def normalize_svg(svg_text: str, classes: str = "", force_current_color: bool = True, strip_root_size: bool = True) -> str:
     """
         Normalize an SVG string for consistent rendering in templates.
@@ -72,11 +79,75 @@ def get_svg_icon(name: str):
     return _icons_cache[name]
 
 
+@lru_cache(maxsize=1)
+def get_icon_sprite():
+    """
+        Load the sprite manifest written by `build_icon_sprite`, once per process.
+
+        Returns:
+            dict or None: `{"url": ..., "icons": {name: {"class": ...}}}`, or None
+            when no sprite has been built.
+    """
+    path = finders.find(ICON_SPRITE_MANIFEST)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {"url": static(manifest["file"]), "icons": manifest["icons"]}
+
+
+def clear_icon_caches():
+    _icons_cache.clear()
+    get_icon_sprite.cache_clear()
+    render_icon.cache_clear()
+
+
+@lru_cache(maxsize=getattr(settings, "ICONS_RENDER_CACHE_SIZE", 1024))
+def render_icon(name: str, custom: bool, style: str, classes: str, attrs: tuple) -> str:
+    """
+        Render an icon to HTML. Pure in its (hashable) arguments, so the output is
+        memoized: each distinct icon is normalized once per process.
+
+        Args:
+            name (str): Icon name.
+            custom (bool): Render the SVG from `static/icons/` instead of Font Awesome.
+            style (str): Font Awesome style class.
+            classes (str): Extra CSS classes.
+            attrs (tuple): `(key, escaped value)` pairs of other HTML attributes.
+
+        Returns:
+            str: The HTML, marked safe.
+    """
+    if custom:
+        sprite = get_icon_sprite()
+        if sprite and name in sprite["icons"]:
+            class_bits = f'{sprite["icons"][name].get("class", "")} {classes}'.strip()
+            class_attr = f' class="{conditional_escape(class_bits)}"' if class_bits else ""
+            return mark_safe(
+                f'<svg{class_attr} fill="currentColor" stroke="currentColor" aria-hidden="true">'
+                f'<use href="{sprite["url"]}#icon-{conditional_escape(name)}"></use></svg>'
+            )
+
+        svg = get_svg_icon(name)
+        if svg:
+            return mark_safe(normalize_svg(svg_text=svg, classes=classes, force_current_color=True,
+                                           strip_root_size=True))
+        return mark_safe(f'<span title="{conditional_escape(name)}">⍰</span>')
+
+    final_class = " ".join(bit for bit in (f"{style} fa-{name}", classes) if bit).strip()
+    html = f'<i class="{conditional_escape(final_class)}"'
+    if attrs:
+        html += " " + " ".join(f'{key}="{value}"' for key, value in attrs)
+    html += "></i>"
+    return mark_safe(html)
+
+
 class IconNode(template.Node):
     """
         Template Node that renders either:
           - A Font Awesome <i> tag (default)
-          - A custom SVG icon loaded from static files (when `custom=True`)
+          - A custom SVG icon loaded from static files (when `custom=True`), referenced
+            from the icon sprite when one has been built
 
         Supported attributes:
             - name (str): Icon name (e.g. "user", "github").
@@ -84,6 +155,8 @@ class IconNode(template.Node):
             - style (str): Font Awesome style class (default: "fas"). Examples: "fab", "far".
             - class (str): Extra CSS classes to append to the icon.
             - Any other attributes are rendered as HTML attributes on the <i> tag.
+
+        Only the arguments are resolved per render; the HTML comes from `render_icon`.
     """
     def __init__(self, name_expr, attrs):
         self.name_expr = name_expr
@@ -100,22 +173,14 @@ class IconNode(template.Node):
             else:
                 custom = bool(val)
 
+        classes = ""
+        if "class" in self.attrs:
+            extra = self.attrs["class"].resolve(context)
+            if extra:
+                classes = str(extra).strip()
+
         if custom:
-            svg = get_svg_icon(name)
-            if svg:
-                base_class = ""
-                if "class" in self.attrs:
-                    base_class = str(self.attrs["class"].resolve(context)).strip()
-
-                svg = normalize_svg(
-                    svg_text=svg,
-                    classes=base_class,
-                    force_current_color=True,
-                    strip_root_size=True
-                )
-                return mark_safe(svg)
-
-            return mark_safe(f'<span title="{name}">⍰</span>')
+            return render_icon(name, True, "", classes, ())
 
         style = "fas"
         if "style" in self.attrs:
@@ -123,14 +188,6 @@ class IconNode(template.Node):
             if style_val:
                 style = str(style_val)
 
-        class_bits = [f"{style} fa-{name}"]
-        if "class" in self.attrs:
-            extra = self.attrs["class"].resolve(context)
-            if extra:
-                class_bits.append(str(extra).strip())
-
-        final_class = " ".join(class_bits).strip()
-
         other_attrs = []
         for key, expr in self.attrs.items():
             if key in {"class", "style", "custom"}:
@@ -138,14 +195,9 @@ class IconNode(template.Node):
             val = expr.resolve(context)
             if val is None or val == "":
                 continue
-            other_attrs.append(f'{key}="{conditional_escape(val)}"')
-
-        html = f'<i class="{conditional_escape(final_class)}"'
-        if other_attrs:
-            html += " " + " ".join(other_attrs)
-        html += "></i>"
+            other_attrs.append((key, conditional_escape(val)))
 
-        return mark_safe(html)
+        return render_icon(name, False, style, classes, tuple(other_attrs))
 
 
 @register.tag(name="icons")
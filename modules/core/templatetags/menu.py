@@ -1,25 +1,60 @@
 from django import template
-from django.urls import reverse
-from maestro.settings import MENU_REGISTRY
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from modules.core.menu import (MAX_RENDERED_MENUS, get_compiled_menu, menu_permissions, merge_menu,
+                               rendered_menus, visible_items)
 
 register = template.Library()
 
+
+def _granted_permissions(context, menu) -> frozenset:
+    needed = menu_permissions(menu)
+    user = context.get("user")
+    if not needed or user is None or not user.is_authenticated:
+        return frozenset()
+    return frozenset(permission for permission in needed if user.has_perm(permission))
+
+
 @register.simple_tag(takes_context=True)
 def get_menu(context):
     """
-        Returns the consolidated sidebar menu (base + optional extra items).
+        Returns the consolidated sidebar menu (base + optional extra items) visible to the user.
+
+        The base menu is compiled once, on first use (see `modules.core.menu`);
+        only page-specific `SIDEBAR_EXTRA` groups are compiled per call.
+
+        Args:
+            context (dict): Template context, may contain `SIDEBAR_EXTRA`.
+
+        Returns:
+            tuple[MenuItem, ...]: Menu items ready for rendering.
+    """
+    menu = merge_menu(get_compiled_menu(), context.get("SIDEBAR_EXTRA"))
+    return visible_items(menu, _granted_permissions(context, menu))
+
+
+@register.simple_tag(takes_context=True)
+def sidebar_menu(context):
+    """
+        Render the sidebar menu items, reusing the HTML rendered for the same permission set.
+
+        Pages passing `SIDEBAR_EXTRA` are rendered without caching.
 
         Args:
             context (dict): Template context, may contain `SIDEBAR_EXTRA`.
 
         Returns:
-            dict: Full menu structure ready for rendering.
+            str: The `<li>` elements of the menu, marked safe.
     """
-    extra = context.get("SIDEBAR_EXTRA") or {}
-    menu = {**MENU_REGISTRY, **extra}
-    for _, item in menu.items():
-        item["submenu"] = {
-            label: (url if url.startswith("/") else reverse(url))
-            for label, url in item.get("submenu", {}).items()
-        }
-    return menu
+    extra = context.get("SIDEBAR_EXTRA")
+    menu = merge_menu(get_compiled_menu(), extra)
+    granted = _granted_permissions(context, menu)
+    html = None if extra else rendered_menus.get(granted)
+    if html is None:
+        html = mark_safe(render_to_string("core/_sidebar_menu.html", {"MENU": visible_items(menu, granted)}))
+        if not extra:
+            if len(rendered_menus) >= MAX_RENDERED_MENUS:
+                rendered_menus.clear()
+            rendered_menus[granted] = html
+    return html
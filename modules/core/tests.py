@@ -1,3 +1,384 @@
-from django.test import TestCase
+import json
+import re
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from modules.core import acl, menu, metrics
+from modules.core.management.commands.build_static import VENDORED, vendor_assets
+from modules.core.models import Group, GroupClosure, GroupMember, Tag
+from modules.core.perf import DatasetSpec, measure_views, seed_dataset
+from modules.core.staticfiles import StaticFilesASGI
+from modules.core.templatetags.icons import clear_icon_caches, render_icon
+from modules.playbooks.models import Playbook
+from modules.users.models import CustomUser
+
+
+@override_settings(ACL_CACHE_TIMEOUT=300)
+class GroupIdsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.group = Group.objects.create(name="ops")
+
+    def fresh_user(self):
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_group_ids_are_memoized_per_instance_and_shared_across_instances(self):
+        GroupMember.objects.create(group=self.group, user=self.user)
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.get_user_group_ids(), {self.group.pk})
+            user.get_user_group_ids()
+        with self.assertNumQueries(0):
+            self.assertEqual(CustomUser(pk=self.user.pk).get_user_group_ids(), {self.group.pk})
+
+    def test_membership_changes_invalidate_cached_ids(self):
+        self.assertEqual(self.fresh_user().get_user_group_ids(), frozenset())
+
+        member = GroupMember.objects.create(group=self.group, user=self.user)
+        self.assertEqual(self.fresh_user().get_user_group_ids(), {self.group.pk})
+
+        member.delete()
+        self.assertEqual(self.fresh_user().get_user_group_ids(), frozenset())
+
+        self.group.members.add(self.user)
+        self.assertEqual(self.fresh_user().get_user_group_ids(), {self.group.pk})
+
+        self.group.delete()
+        self.assertEqual(self.fresh_user().get_user_group_ids(), frozenset())
+
+
+    def test_ids_cached_before_commit_are_dropped_at_commit(self):
+        member = GroupMember.objects.create(group=self.group, user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                member.delete()
+                # A concurrent request, still seeing the committed membership, caches it under the new version.
+                cache.set(acl._USER_GROUP_IDS_KEY.format(user_id=self.user.pk,
+                                                         version=acl.get_membership_version(self.user.pk),
+                                                         hierarchy=acl.get_hierarchy_version()),
+                          frozenset({self.group.pk}))
+                self.assertEqual(self.fresh_user().get_user_group_ids(), {self.group.pk})
+        self.assertEqual(self.fresh_user().get_user_group_ids(), frozenset())
+
+    @override_settings(ACL_CACHE_TIMEOUT=0)
+    def test_process_local_cache_only_memoizes_per_request(self):
+        GroupMember.objects.create(group=self.group, user=self.user)
+        for _ in range(2):
+            user = self.fresh_user()
+            with self.assertNumQueries(1):
+                self.assertEqual(user.get_user_group_ids(), {self.group.pk})
+
+
+class GroupClosureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.root, self.left, self.right, self.leaf = (
+            Group.objects.create(name=name) for name in ("root", "left", "right", "leaf")
+        )
+        self.root.children.add(self.left, self.right)
+        self.left.children.add(self.leaf)
+        self.right.children.add(self.leaf)
+
+    def closure(self):
+        return set(GroupClosure.objects.values_list("ancestor_id", "descendant_id", "depth", "paths"))
+
+    def assertConsistent(self):
+        incremental = self.closure()
+        Group.closure().rebuild(Group.objects.values_list("pk", flat=True))
+        self.assertEqual(incremental, self.closure())
+
+    def test_incremental_updates_match_a_rebuild(self):
+        self.assertIn((self.root.pk, self.leaf.pk, 2, 2), self.closure())
+        self.assertConsistent()
+
+        self.root.children.add(self.leaf)
+        self.assertIn((self.root.pk, self.leaf.pk, 1, 3), self.closure())
+        self.assertConsistent()
+
+        self.root.children.remove(self.leaf, self.left)
+        self.assertIn((self.root.pk, self.leaf.pk, 2, 1), self.closure())
+        self.assertConsistent()
+
+        self.right.delete()
+        self.assertFalse(GroupClosure.objects.filter(ancestor=self.root, descendant=self.leaf).exists())
+        self.assertConsistent()
+
+        self.leaf.parents.clear()
+        self.assertEqual(set(Group.closure().descendant_ids(self.left.pk).values_list("descendant_id", flat=True)),
+                         {self.left.pk})
+
+    def test_cycles_are_rejected(self):
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.leaf.children.add(self.root)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.root.children.add(self.root)
+        self.assertFalse(self.leaf.children.exists())
+
+    def test_members_of_nested_groups_inherit_parent_groups(self):
+        user = CustomUser.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        self.leaf.members.add(user)
+        expected = {self.root.pk, self.left.pk, self.right.pk, self.leaf.pk}
+        self.assertEqual(CustomUser.objects.get(pk=user.pk).get_user_group_ids(), expected)
+
+        self.root.children.clear()
+        self.assertEqual(CustomUser.objects.get(pk=user.pk).get_user_group_ids(), expected - {self.root.pk})
+
+
+class IconRenderingTests(TestCase):
+    template = Template('{% load icons %}{% icons "cog" custom=True class=extra %}{% icons "user" title=title %}')
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        icons = Path(self.tmp.name) / "icons"
+        icons.mkdir()
+        (icons / "cog.svg").write_text(
+            '<?xml version="1.0"?>\n<svg class="w-5" width="24" fill="none" viewBox="0 0 24 24"><path d="M1 1"/></svg>'
+        )
+        settings = override_settings(STATICFILES_DIRS=[self.tmp.name])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        clear_icon_caches()
+        self.addCleanup(clear_icon_caches)
+
+    def render(self, **context):
+        return self.template.render(Context({"extra": "h-4", "title": "<b>", **context}))
+
+    def test_rendered_icons_are_memoized_per_arguments(self):
+        html = self.render()
+        self.assertIn('<svg stroke="currentColor" class="w-5 h-4" fill="none" viewBox="0 0 24 24">', html)
+        self.assertIn('<i class="fas fa-user" title="&lt;b&gt;"></i>', html)
+        self.render()
+        self.assertEqual((render_icon.cache_info().misses, render_icon.cache_info().hits), (2, 2))
+        self.render(extra="h-6")
+        self.assertEqual(render_icon.cache_info().misses, 3)
+
+    def test_built_sprite_replaces_inline_svg_bodies(self):
+        call_command("build_icon_sprite", stdout=StringIO())
+        sprite_dir = Path(self.tmp.name) / "icons" / "sprite"
+        sprite = next(sprite_dir.glob("icons.*.svg")).read_text()
+        self.assertIn('<symbol id="icon-cog" fill="none" viewBox="0 0 24 24"><path d="M1 1"/></symbol>', sprite)
+
+        html = self.render()
+        self.assertIn(f'<svg class="w-5 h-4" fill="currentColor" stroke="currentColor" aria-hidden="true">'
+                      f'<use href="/static/icons/sprite/{sprite_dir.glob("icons.*.svg").__next__().name}#icon-cog">',
+                      html)
+        self.assertNotIn("M1 1", html)
+
+
+class SidebarMenuTests(TestCase):
+    registry = {
+        "Workspace": {"icon": "briefcase", "submenu": {"Runs": "run_list", "Help": "/help"}},
+        "Admin": {"icon": "gear", "submenu": {"New": "playbook_create"}, "permissions": ["playbooks.add_playbook"]},
+    }
+    template = Template("{% load menu %}{% sidebar_menu %}")
+
+    def setUp(self):
+        settings = override_settings(MENU_REGISTRY=self.registry)
+        settings.enable()
+        self.addCleanup(menu.compile_registry)
+        self.addCleanup(settings.disable)
+        menu.compile_registry()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+
+    def test_registry_is_compiled_without_mutation(self):
+        workspace = menu.get_compiled_menu()[0]
+        self.assertEqual(workspace.submenu, (("Runs", "/runs/"), ("Help", "/help")))
+        self.assertEqual(self.registry["Workspace"]["submenu"]["Runs"], "run_list")
+
+        merged = menu.merge_menu(menu.get_compiled_menu(), {"Workspace": {"icon": "home", "submenu": {}}})
+        self.assertEqual([(item.label, item.icon) for item in merged], [("Admin", "gear"), ("Workspace", "home")])
+        self.assertEqual(menu.get_compiled_menu()[0].icon, "briefcase")
+
+    def test_registry_is_compiled_on_first_use(self):
+        menu.rendered_menus[frozenset()] = "stale"
+        with mock.patch.object(menu, "_compiled", None), mock.patch.object(menu, "reverse") as reverse:
+            apps.get_app_config("core").ready()
+            reverse.assert_not_called()
+
+            reverse.return_value = "/runs/"
+            self.assertEqual(menu.get_compiled_menu()[0].submenu[0], ("Runs", "/runs/"))
+            self.assertEqual(menu.rendered_menus, {})
+
+    def test_rendered_menu_is_shared_per_permission_set(self):
+        html = self.template.render(Context({"user": self.user}))
+        self.assertIn("&quot;Runs&quot;: &quot;/runs/&quot;", html)
+        self.assertNotIn("Admin", html)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.template.render(Context({"user": AnonymousUser()})), html)
+
+        admin = CustomUser.objects.create_superuser(username="root", email="root@example.com", password="pw")
+        self.assertIn("Admin", self.template.render(Context({"user": admin})))
+        self.assertEqual(set(menu.rendered_menus), {frozenset(), frozenset({"playbooks.add_playbook"})})
+
+
+class SQLiteProfileTests(TestCase):
+    def test_production_profile_avoids_lock_errors_under_concurrent_writes(self):
+        out = StringIO()
+        call_command("benchmark_sqlite", writers=4, readers=2, duration=0.3, json=True, stdout=out)
+        results = {result["profile"]: result for result in json.loads(out.getvalue())}
+
+        self.assertEqual(results["production"]["lock_errors"], 0)
+        self.assertGreater(results["production"]["writes_per_second"], 0)
+
+
+class ViewBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_views_stay_within_their_query_budgets(self):
+        dataset = seed_dataset(DatasetSpec(users=60, groups=30, tags=20, playbooks=120))
+        self.assertEqual(dataset.user.username, "user000000")
+        self.assertGreater(GroupClosure.objects.filter(depth__gt=0).count(), 0)
+
+        for result in measure_views(dataset, repeat=3, warmup=1):
+            self.assertLessEqual(result["queries"], result["max_queries"], result["view"])
+
+    def test_dataset_is_deterministic(self):
+        first = seed_dataset(DatasetSpec(users=30, groups=10, tags=10, playbooks=40, seed=7))
+        shares = sorted(Playbook.visible_to.through.objects.values_list("playbook__name", "group__name"))
+        for model in (Playbook, CustomUser, Group, Tag):
+            model._base_manager.all().delete()
+        second = seed_dataset(DatasetSpec(users=30, groups=10, tags=10, playbooks=40, seed=7))
+        self.assertEqual(sorted(Playbook.visible_to.through.objects.values_list("playbook__name", "group__name")),
+                         shares)
+        self.assertEqual(len(first.playbook_ids), len(second.playbook_ids))
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+
+    def scrape(self, **headers):
+        return self.client.get(reverse("metrics"), **headers)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_views_are_measured_by_url_name(self):
+        self.client.get(reverse("playbook_list"))
+        self.client.get("/no-such-page/")
+        self.assertEqual(self.scrape().status_code, 403)
+
+        body = self.scrape(HTTP_AUTHORIZATION="Bearer s3cret").content.decode()
+        self.assertIn('maestro_http_request_duration_seconds_count{view="playbook_list",method="GET",status="200"} 1',
+                      body)
+        self.assertIn('maestro_http_request_duration_seconds_count{view="unresolved",method="GET",status="404"} 1',
+                      body)
+        self.assertIn('maestro_http_request_duration_seconds_bucket{view="playbook_list",method="GET",status="200",'
+                      'le="+Inf"} 1', body)
+        for name in ("db_queries", "db_duration_seconds", "template_duration_seconds"):
+            self.assertIn(f'maestro_http_request_{name}_count{{view="playbook_list"}} 1', body)
+        self.assertIn('maestro_http_response_size_bytes_count{view="playbook_list"} 1', body)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_without_a_token_only_staff_can_scrape(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR="127.0.0.1").status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.scrape(REMOTE_ADDR="127.0.0.1").status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.scrape().status_code, 200)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", ("view",), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(("a",), value)
+        self.assertEqual(histogram.render()[2:], [
+            'test_seconds_bucket{view="a",le="0.1"} 2',
+            'test_seconds_bucket{view="a",le="1"} 3',
+            'test_seconds_bucket{view="a",le="+Inf"} 4',
+            'test_seconds_sum{view="a"} 3.65',
+            'test_seconds_count{view="a"} 4',
+        ])
+
+    def test_sampled_profiles_keep_the_slowest_requests(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with override_settings(PROFILE_SAMPLE_RATE=1.0, PROFILE_DIR=tmp, PROFILE_KEEP=2):
+                client = self.client_class()
+                client.force_login(self.user)
+                for _ in range(4):
+                    client.get(reverse("playbook_list"))
+            self.assertEqual(len(list(Path(tmp).glob("*-playbook_list-*.prof"))), 2)
+
+
+class StaticPipelineTests(SimpleTestCase):
+    def test_templates_load_nothing_from_cdns(self):
+        external = re.compile(r'<(?:script|link)\b[^>]*(?:src|href)="(?:https?:)?//', re.I)
+        for template in Path(__file__).resolve().parent.parent.glob("*/templates/**/*.html"):
+            with self.subTest(template=template.name):
+                self.assertIsNone(external.search(template.read_text(encoding="utf-8")))
+
+    def test_vendor_assets_copies_files_and_directories(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            node_modules, vendor = Path(tmp) / "node_modules", Path(tmp) / "vendor"
+            for source in VENDORED:
+                path = node_modules / source
+                if source.endswith("webfonts"):
+                    path.mkdir(parents=True)
+                    (path / "fa-solid-900.woff2").write_bytes(b"font")
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_text(source)
+            vendor_assets(node_modules, vendor)
+            self.assertEqual((vendor / "htmx/htmx.min.js").read_text(), "htmx.org/dist/htmx.min.js")
+            self.assertTrue((vendor / "fontawesome/webfonts/fa-solid-900.woff2").exists())
+
+            (node_modules / "alpinejs/dist/cdn.min.js").unlink()
+            with self.assertRaisesMessage(CommandError, "npm install"):
+                vendor_assets(node_modules, vendor)
+
+    def test_build_static_needs_the_manifest_setting(self):
+        with self.assertRaisesMessage(CommandError, "STATIC_MANIFEST=true"):
+            call_command("build_static", skip_npm=True)
+
+    def test_collected_files_are_hashed_precompressed_and_immutable(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            STATIC_MANIFEST=True, STATIC_ROOT=tmp, WHITENOISE_USE_FINDERS=False,
+            STORAGES={"staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"}},
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            url = staticfiles_storage.url("css/app.css")
+            self.assertRegex(url, r"^/static/css/app\.[0-9a-f]{12}\.css$")
+
+            passed_on = []
+
+            async def django_application(scope, receive, send):
+                passed_on.append(scope["path"])
+
+            application = StaticFilesASGI(django_application)
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            async_to_sync(application)({"type": "http", "method": "GET", "path": url,
+                                        "headers": [(b"accept-encoding", b"gzip")]}, None, send)
+            async_to_sync(application)({"type": "http", "method": "GET", "path": "/runs/1/stream",
+                                        "headers": []}, None, send)
+            start, *body = messages
+            headers = dict(start["headers"])
+            self.assertEqual(start["status"], 200)
+            self.assertEqual(headers[b"content-encoding"], b"gzip")
+            self.assertIn(b"immutable", headers[b"cache-control"])
+            self.assertEqual(len(b"".join(message["body"] for message in body)), int(headers[b"content-length"]))
+            self.assertEqual(passed_on, ["/runs/1/stream"])
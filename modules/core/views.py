@@ -1,11 +1,37 @@
 from django.shortcuts import render
 
 # modules/core/views.py
+import hmac
+
+from django.conf import settings
 from django.contrib import messages
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+
+from modules.core.metrics import registry
 
 def demo(request):
     messages.success(request, "Login realizado com sucesso!")
     messages.info(request, "Você está no ambiente de testes do Maestro.")
     return render(request, "core/demo.html")
 
+
+@never_cache
+def metrics_view(request):
+    """
+        Request metrics in the Prometheus text format.
+
+        Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`; without
+        a token configured only staff users may read them. Client addresses are
+        not trusted: behind a reverse proxy on the same host every request
+        comes from 127.0.0.1.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        allowed = hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from .models import Host, Inventory, InventoryGroup
+
+
+@admin.register(Inventory)
+class InventoryAdmin(admin.ModelAdmin):
+    list_display = ("name", "description")
+    search_fields = ("name",)
+
+    exclude = ("created_by", "updated_by", "deleted_by", "deleted_at")
+
+
+@admin.register(InventoryGroup)
+class InventoryGroupAdmin(admin.ModelAdmin):
+    list_display = ("name", "inventory")
+    list_filter = ("inventory",)
+    search_fields = ("name",)
+    raw_id_fields = ("hosts", "children")
+
+
+@admin.register(Host)
+class HostAdmin(admin.ModelAdmin):
+    list_display = ("name", "inventory")
+    list_filter = ("inventory",)
+    search_fields = ("name",)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class InventoriesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    label = 'inventories'
+    name = 'modules.inventories'
+
+    def ready(self):
+        from modules.inventories import signals  # noqa: F401
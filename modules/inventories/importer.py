@@ -0,0 +1,186 @@
+from collections import Counter
+
+from django.db import transaction
+
+from modules.inventories.models import Host, Inventory, InventoryGroup
+from modules.inventories.parsers import ChildRecord, GroupRecord, HostRecord, MembershipRecord
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class InventoryImporter:
+    """
+        Loads parser records into an inventory in fixed-size batches.
+
+        Records are buffered until `batch_size` of them are pending, then written
+        with a handful of `bulk_create` / `bulk_update` statements in a single
+        transaction. Only the group name -> id map is kept between batches
+        (groups are few compared to hosts); host ids are resolved per batch, so
+        memory stays flat however many hosts the source contains.
+
+        Importing is idempotent: existing hosts and groups are matched by name,
+        their variables are merged, and memberships already present are skipped.
+        Links are bulk-inserted without signals, so the group closure of the
+        inventory is rebuilt once at the end of `run()`.
+
+        `run()` wraps the batches in one outer transaction (each batch is a
+        savepoint): a parse error or a cycle in the group hierarchy, which only
+        the closure rebuild can see, leaves the inventory as it was instead of
+        half imported.
+
+        Args:
+            inventory (Inventory): The inventory to import into.
+            batch_size (int, optional): Records written per batch.
+            progress (callable, optional): Called as `progress(stats)` after each batch.
+    """
+
+    def __init__(self, inventory: Inventory, batch_size: int = DEFAULT_BATCH_SIZE, progress=None):
+        self.inventory = inventory
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.stats = Counter()
+        self.group_ids = dict(InventoryGroup.objects
+                              .filter(inventory=inventory)
+                              .values_list("name", "pk"))
+        self._reset()
+
+    def _reset(self):
+        self.pending_groups = {}
+        self.pending_hosts = {}
+        self.pending_memberships = set()
+        self.pending_children = set()
+        self.pending = 0
+
+    def feed(self, record) -> None:
+        if isinstance(record, HostRecord):
+            self.pending_hosts.setdefault(record.name, {}).update(record.variables)
+        elif isinstance(record, MembershipRecord):
+            self.pending_memberships.add(record)
+        elif isinstance(record, GroupRecord):
+            self.pending_groups.setdefault(record.name, {}).update(record.variables)
+        elif isinstance(record, ChildRecord):
+            self.pending_children.add(record)
+        else:
+            raise TypeError(f"Unknown inventory record {record!r}.")
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def run(self, records) -> Counter:
+        """Import every record of `records`, or nothing if one of them fails, and return the statistics."""
+        with transaction.atomic():
+            for record in records:
+                self.feed(record)
+            self.flush()
+            self.stats["closure_rows"] = InventoryGroup.closure().rebuild(self.group_ids.values())
+        return self.stats
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with transaction.atomic():
+            self._flush_groups()
+            self._flush_hosts()
+            self._flush_memberships()
+            self._flush_children()
+        self.stats["records"] += self.pending
+        self._reset()
+        if self.progress:
+            self.progress(self.stats)
+
+    def _flush_groups(self) -> None:
+        # Groups referenced only as parents/members are created implicitly.
+        for name in {m.group for m in self.pending_memberships} | {
+            name for child in self.pending_children for name in child
+        }:
+            self.pending_groups.setdefault(name, {})
+
+        existing = [name for name in self.pending_groups if name in self.group_ids]
+        changed = []
+        for group in InventoryGroup.objects.filter(pk__in=[self.group_ids[name] for name in existing]):
+            variables = {**group.variables, **self.pending_groups[group.name]}
+            if variables != group.variables:
+                group.variables = variables
+                changed.append(group)
+        InventoryGroup.objects.bulk_update(changed, ["variables"], batch_size=self.batch_size)
+
+        new = [InventoryGroup(inventory=self.inventory, name=name, variables=variables)
+               for name, variables in self.pending_groups.items() if name not in self.group_ids]
+        InventoryGroup.objects.bulk_create(new, batch_size=self.batch_size, ignore_conflicts=True)
+        if new:
+            self.group_ids.update(InventoryGroup.objects
+                                  .filter(inventory=self.inventory, name__in=[group.name for group in new])
+                                  .values_list("name", "pk"))
+        self.stats["groups"] += len(new)
+
+    def _host_ids(self, names) -> dict:
+        return dict(Host.objects
+                    .filter(inventory=self.inventory, name__in=list(names))
+                    .values_list("name", "pk"))
+
+    def _flush_hosts(self) -> None:
+        if not self.pending_hosts:
+            return
+
+        changed = []
+        existing = Host.objects.filter(inventory=self.inventory, name__in=list(self.pending_hosts))
+        for host in existing.only("pk", "name", "variables"):
+            variables = {**host.variables, **self.pending_hosts.pop(host.name)}
+            if variables != host.variables:
+                host.variables = variables
+                changed.append(host)
+        Host.objects.bulk_update(changed, ["variables"], batch_size=self.batch_size)
+
+        Host.objects.bulk_create(
+            [Host(inventory=self.inventory, name=name, variables=variables)
+             for name, variables in self.pending_hosts.items()],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.stats["hosts"] += len(self.pending_hosts)
+        self.stats["hosts_updated"] += len(changed)
+
+    def _flush_memberships(self) -> None:
+        if not self.pending_memberships:
+            return
+        host_ids = self._host_ids({m.host for m in self.pending_memberships})
+        through = InventoryGroup.hosts.through
+        through.objects.bulk_create(
+            [through(inventorygroup_id=self.group_ids[m.group], host_id=host_ids[m.host])
+             for m in self.pending_memberships],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.stats["memberships"] += len(self.pending_memberships)
+
+    def _flush_children(self) -> None:
+        if not self.pending_children:
+            return
+        through = InventoryGroup.children.through
+        through.objects.bulk_create(
+            [through(from_inventorygroup_id=self.group_ids[c.parent], to_inventorygroup_id=self.group_ids[c.child])
+             for c in self.pending_children if c.parent != c.child],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.stats["children"] += len(self.pending_children)
+
+
+def import_inventory(inventory: Inventory, records, batch_size: int = DEFAULT_BATCH_SIZE, progress=None) -> Counter:
+    """
+        Import parser records into `inventory`.
+
+        Args:
+            inventory (Inventory): Target inventory.
+            records (Iterable): Records from one of the parsers in `modules.inventories.parsers`.
+            batch_size (int, optional): Records written per batch.
+            progress (callable, optional): Called with the running statistics after each batch.
+
+        Returns:
+            Counter: Number of records, new groups, new hosts, memberships and child links.
+
+        Raises:
+            ValidationError: The group hierarchy contains a cycle; nothing was imported.
+    """
+    return InventoryImporter(inventory, batch_size=batch_size, progress=progress).run(records)
@@ -0,0 +1,94 @@
+import io
+import json
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from modules.inventories.importer import DEFAULT_BATCH_SIZE, import_inventory
+from modules.inventories.models import Inventory
+from modules.inventories.parsers import parse_ini
+from modules.inventories.renderer import render_inventory
+
+
+def write_synthetic_inventory(path: Path, hosts: int, groups: int) -> None:
+    """Write an INI inventory with `hosts` hosts spread round-robin over `groups` groups."""
+    with open(path, "w", encoding="utf-8") as f:
+        for group in range(groups):
+            f.write(f"[group{group:05d}]\n")
+            for host in range(group, hosts, groups):
+                f.write(f"host{host:07d}.example.com ansible_host=10.{host >> 16 & 255}.{host >> 8 & 255}."
+                        f"{host & 255} rack={host % 40}\n")
+            f.write(f"\n[group{group:05d}:vars]\nntp_server=ntp{group % 4}.example.com\nsyslog_port={5000 + group}\n\n")
+        f.write("[all:children]\n")
+        f.writelines(f"group{group:05d}\n" for group in range(groups))
+
+
+class _CountingSink(io.TextIOBase):
+    def __init__(self):
+        self.size = 0
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        return len(chunk)
+
+
+class Command(BaseCommand):
+    help = "Measure inventory import and render throughput and peak memory on synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hosts", type=int, default=120_000)
+        parser.add_argument("--groups", type=int, default=3_000)
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark inventory afterwards.")
+
+    def measure(self, func):
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            func()
+            return time.perf_counter() - started, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def handle(self, *args, **options):
+        hosts, groups = options["hosts"], options["groups"]
+        name = f"benchmark-{hosts}-{groups}"
+        Inventory.objects.filter(name=name).delete()
+        inventory = Inventory.objects.create(name=name, description="Synthetic benchmark inventory")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "inventory.ini"
+            write_synthetic_inventory(path, hosts, groups)
+            with open(path, encoding="utf-8") as stream:
+                import_seconds, import_peak = self.measure(
+                    lambda: import_inventory(inventory, parse_ini(stream), batch_size=options["batch_size"])
+                )
+
+        sink = _CountingSink()
+        render_seconds, render_peak = self.measure(lambda: render_inventory(inventory, sink))
+
+        results = {
+            "hosts": hosts,
+            "groups": groups,
+            "import_seconds": round(import_seconds, 3),
+            "import_hosts_per_second": round(hosts / import_seconds),
+            "import_peak_python_bytes": import_peak,
+            "render_seconds": round(render_seconds, 3),
+            "render_hosts_per_second": round(hosts / render_seconds),
+            "render_peak_python_bytes": render_peak,
+            "render_output_bytes": sink.size,
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        if not options["keep"]:
+            inventory.delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for key, value in results.items():
+            self.stdout.write(f"{key:>28}: {value}")
@@ -0,0 +1,63 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from modules.inventories.importer import import_inventory
+from modules.inventories.management.commands.benchmark_inventory import write_synthetic_inventory
+from modules.inventories.models import Inventory, InventoryGroup
+from modules.inventories.parsers import parse_ini
+from modules.inventories.variables import VariableResolver
+
+
+class Command(BaseCommand):
+    help = "Measure host variable resolution on a synthetic inventory, cold, warm and after one group changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hosts", type=int, default=50_000)
+        parser.add_argument("--groups", type=int, default=500)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark inventory afterwards.")
+
+    def measure(self, resolver, inventory):
+        hits, misses = resolver.hits, resolver.misses
+        started = time.perf_counter()
+        resolved = sum(1 for _ in resolver.resolve_inventory(inventory, extra_vars={"benchmark": True}))
+        seconds = time.perf_counter() - started
+        return {
+            "seconds": round(seconds, 3),
+            "hosts_per_second": round(resolved / seconds),
+            "layers_reused": resolver.hits - hits,
+            "layers_computed": resolver.misses - misses,
+        }
+
+    def handle(self, *args, **options):
+        hosts, groups = options["hosts"], options["groups"]
+        name = f"benchmark-vars-{hosts}-{groups}"
+        Inventory.objects.filter(name=name).delete()
+        inventory = Inventory.objects.create(name=name, description="Synthetic benchmark inventory")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "inventory.ini"
+            write_synthetic_inventory(path, hosts, groups)
+            with open(path, encoding="utf-8") as stream:
+                import_inventory(inventory, parse_ini(stream))
+
+        resolver = VariableResolver()
+        results = {"hosts": hosts, "groups": groups, "cold": self.measure(resolver, inventory),
+                   "warm": self.measure(resolver, inventory)}
+
+        group = InventoryGroup.objects.filter(inventory=inventory, hosts__isnull=False).order_by("pk").first()
+        group.variables = {**group.variables, "ntp_server": "ntp.changed.example.com"}
+        group.save(update_fields=["variables"])
+        results["after_one_group_change"] = self.measure(resolver, inventory)
+
+        if not options["keep"]:
+            inventory.delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for key, value in results.items():
+            self.stdout.write(f"{key:>24}: {value}")
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from modules.inventories.importer import DEFAULT_BATCH_SIZE, import_inventory
+from modules.inventories.models import Inventory
+from modules.inventories.parsers import PARSERS, InventoryParseError, guess_format
+
+
+class Command(BaseCommand):
+    help = "Stream an Ansible inventory file (INI, YAML or CSV) into an inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Inventory file to import.")
+        parser.add_argument("--name", help="Inventory to import into (default: the file name). Created if missing.")
+        parser.add_argument("--format", choices=sorted(PARSERS), default=None,
+                            help="Input format (default: guessed from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Records written per batch.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+
+        parse = PARSERS[options["format"] or guess_format(path.name)]
+
+        def progress(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{stats['records']} records, {stats['hosts']} new hosts...")
+
+        try:
+            # A failed import must not leave an empty inventory behind either.
+            with transaction.atomic(), open(path, encoding="utf-8", newline="") as stream:
+                inventory, _ = Inventory.objects.get_or_create(name=options["name"] or path.stem)
+                stats = import_inventory(inventory, parse(stream), batch_size=options["batch_size"],
+                                         progress=progress)
+        except IntegrityError as exc:
+            raise CommandError(str(exc)) from exc
+        except (InventoryParseError, ValidationError) as exc:
+            raise CommandError(f"{path}: {exc}") from exc
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['records']} records into {inventory}: {stats['hosts']} new hosts, "
+            f"{stats['hosts_updated']} updated, {stats['groups']} new groups."
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from modules.core.closure import ClosureTable
+
+
+def build_closure(apps, schema_editor):
+    node_model = apps.get_model("inventories", "InventoryGroup")
+    table = ClosureTable(apps.get_model("inventories", "InventoryGroupClosure"), node_model.children.through,
+                         "from_inventorygroup_id", "to_inventorygroup_id")
+    table.rebuild(node_model.objects.values_list("pk", flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryGroupClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('paths', models.PositiveBigIntegerField(default=1)),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='inventories.inventorygroup')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='inventories.inventorygroup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='inventory_group_closure_up_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_inventory_group_closure')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,3 @@
+from .inventory import Inventory
+from .inventory_group import InventoryGroup, InventoryGroupClosure
+from .host import Host
@@ -0,0 +1,24 @@
+from django.db import models
+
+from .inventory import Inventory
+
+
+class Host(models.Model):
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name="hosts")
+    name = models.CharField(max_length=255)
+    variables = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["inventory", "name"], name="unique_inventory_host")
+        ]
+
+    def all_groups(self):
+        """Groups containing this host directly or through nesting, in one query."""
+        from .inventory_group import InventoryGroup
+
+        closure = InventoryGroup.closure()
+        return InventoryGroup.objects.filter(pk__in=closure.ancestor_ids(self.groups.values("pk")))
+
+    def __str__(self):
+        return self.name
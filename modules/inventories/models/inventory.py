@@ -0,0 +1,11 @@
+from django.db import models
+
+from modules.core.models import AuditFieldsMixin
+
+
+class Inventory(AuditFieldsMixin):
+    name = models.CharField(max_length=100, unique=True)
+    description = models.TextField(blank=True, null=True)
+
+    def __str__(self):
+        return self.name
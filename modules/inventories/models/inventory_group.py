@@ -0,0 +1,53 @@
+from django.db import models
+
+from modules.core.closure import ClosureTable
+
+from .host import Host
+from .inventory import Inventory
+
+
+class InventoryGroup(models.Model):
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name="groups")
+    name = models.CharField(max_length=255)
+    variables = models.JSONField(default=dict, blank=True)
+
+    hosts = models.ManyToManyField(Host, related_name="groups", blank=True)
+    children = models.ManyToManyField(
+        "self",
+        symmetrical=False,
+        related_name="parents",
+        blank=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["inventory", "name"], name="unique_inventory_group")
+        ]
+
+    @classmethod
+    def closure(cls) -> ClosureTable:
+        return ClosureTable(InventoryGroupClosure, cls.children.through,
+                            "from_inventorygroup_id", "to_inventorygroup_id")
+
+    def all_hosts(self):
+        """Hosts of this group and of every group nested under it, in one query."""
+        return Host.objects.filter(groups__in=self.closure().descendant_ids(self.pk)).distinct()
+
+    def __str__(self):
+        return self.name
+
+
+class InventoryGroupClosure(models.Model):
+    """Transitive closure of `InventoryGroup.children`, maintained by `modules.core.closure`."""
+    ancestor = models.ForeignKey(InventoryGroup, on_delete=models.CASCADE, related_name="descendant_links")
+    descendant = models.ForeignKey(InventoryGroup, on_delete=models.CASCADE, related_name="ancestor_links")
+    depth = models.PositiveIntegerField()
+    paths = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ancestor", "descendant"], name="unique_inventory_group_closure")
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "ancestor"], name="inventory_group_closure_up_idx"),
+        ]
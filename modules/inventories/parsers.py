@@ -0,0 +1,276 @@
+import ast
+import csv
+import re
+import shlex
+import string
+from typing import NamedTuple
+
+
+class GroupRecord(NamedTuple):
+    name: str
+    variables: dict
+
+
+class HostRecord(NamedTuple):
+    name: str
+    variables: dict
+
+
+class MembershipRecord(NamedTuple):
+    group: str
+    host: str
+
+
+class ChildRecord(NamedTuple):
+    parent: str
+    child: str
+
+
+UNGROUPED = "ungrouped"
+
+_RANGE_RE = re.compile(r"\[([^\]:]+):([^\]:]+)(?::(\d+))?\]")
+
+
+class InventoryParseError(ValueError):
+    pass
+
+
+def expand_host_pattern(pattern: str):
+    """
+        Expand Ansible host ranges such as `web[01:20].example.com` or `db-[a:c]`.
+
+        Args:
+            pattern (str): A host name, possibly containing `[start:end(:step)]` ranges.
+
+        Yields:
+            str: Every host name the pattern describes.
+    """
+    match = _RANGE_RE.search(pattern)
+    if not match:
+        yield pattern
+        return
+
+    start, end, step = match.group(1), match.group(2), int(match.group(3) or 1)
+    prefix, suffix = pattern[:match.start()], pattern[match.end():]
+    if start.isdigit() and end.isdigit():
+        width = len(start) if start.startswith("0") else 0
+        values = (str(value).zfill(width) for value in range(int(start), int(end) + 1, step))
+    elif len(start) == len(end) == 1 and start in string.ascii_letters and end in string.ascii_letters:
+        values = (chr(value) for value in range(ord(start), ord(end) + 1, step))
+    else:
+        raise InventoryParseError(f"Invalid host range in {pattern!r}.")
+
+    for value in values:
+        yield from expand_host_pattern(f"{prefix}{value}{suffix}")
+
+
+def _ini_value(value: str):
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _ini_assignments(tokens, lineno):
+    variables = {}
+    for token in tokens:
+        if "=" not in token:
+            raise InventoryParseError(f"Line {lineno}: expected key=value, got {token!r}.")
+        key, value = token.split("=", 1)
+        variables[key.strip()] = _ini_value(value)
+    return variables
+
+
+def parse_ini(lines):
+    """
+        Parse an Ansible INI inventory line by line.
+
+        Args:
+            lines (Iterable[str]): The inventory file (or any iterable of lines).
+
+        Yields:
+            GroupRecord | HostRecord | MembershipRecord | ChildRecord
+    """
+    group, kind = UNGROUPED, "hosts"
+    yield GroupRecord(UNGROUPED, {})
+
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            group, _, kind = line[1:-1].partition(":")
+            kind = kind or "hosts"
+            if kind not in {"hosts", "vars", "children"}:
+                raise InventoryParseError(f"Line {lineno}: unknown section type {kind!r}.")
+            yield GroupRecord(group, {})
+            continue
+
+        if "'" in line or '"' in line or "\\" in line:
+            try:
+                tokens = shlex.split(line, comments=True)
+            except ValueError as exc:
+                raise InventoryParseError(f"Line {lineno}: {exc}") from exc
+        else:
+            # shlex is by far the slowest part of parsing; most lines need no quoting rules.
+            tokens = line.partition("#")[0].split()
+        if not tokens:
+            continue
+
+        if kind == "vars":
+            key, _, value = line.partition("=")
+            yield GroupRecord(group, {key.strip(): value.strip().strip("'\"")})
+        elif kind == "children":
+            yield GroupRecord(tokens[0], {})
+            yield ChildRecord(group, tokens[0])
+        else:
+            variables = _ini_assignments(tokens[1:], lineno)
+            for host in expand_host_pattern(tokens[0]):
+                yield HostRecord(host, variables)
+                yield MembershipRecord(group, host)
+
+
+def parse_csv(lines, host_column="host", groups_column="groups"):
+    """
+        Parse a CSV inventory: one host per row, a `groups` column, and every
+        other non-empty column as a host variable.
+
+        Args:
+            lines (Iterable[str]): The CSV file (with a header row).
+            host_column (str, optional): Column holding the host name.
+            groups_column (str, optional): Column holding `;`/space separated group names.
+
+        Yields:
+            GroupRecord | HostRecord | MembershipRecord
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or host_column not in reader.fieldnames:
+        raise InventoryParseError(f"CSV inventories need a {host_column!r} column.")
+
+    yield GroupRecord(UNGROUPED, {})
+    known_groups = {UNGROUPED}
+    for row in reader:
+        name = (row.pop(host_column) or "").strip()
+        if not name:
+            continue
+        groups = re.split(r"[;\s]+", (row.pop(groups_column, "") or "").strip())
+        variables = {key: _ini_value(value) for key, value in row.items() if key and value not in (None, "")}
+
+        yield HostRecord(name, variables)
+        for group in filter(None, groups) or [UNGROUPED]:
+            if group not in known_groups:
+                known_groups.add(group)
+                yield GroupRecord(group, {})
+            yield MembershipRecord(group, name)
+
+
+class _YamlWalker:
+    """
+        Turns the PyYAML event stream of an inventory into records.
+
+        Only one host's (or group's) variables are ever materialized at a time,
+        so memory does not grow with the size of the inventory.
+    """
+
+    def __init__(self, stream):
+        import yaml
+
+        self.yaml = yaml
+        self.events = yaml.parse(stream, Loader=yaml.SafeLoader)
+        self.anchors = {}
+
+    def next(self, *expected):
+        event = next(self.events)
+        if expected and not isinstance(event, expected):
+            raise InventoryParseError(f"Unexpected YAML event {event!r}.")
+        return event
+
+    def construct(self, event=None):
+        """Build the Python value of the node starting at `event`."""
+        yaml = self.yaml
+        event = event or self.next()
+        if isinstance(event, yaml.AliasEvent):
+            return self.anchors[event.anchor]
+
+        if isinstance(event, yaml.ScalarEvent):
+            value = event.value
+            if event.style is None and event.implicit[0]:
+                value = yaml.safe_load(value) if value else None
+        elif isinstance(event, yaml.SequenceStartEvent):
+            value = []
+            while not isinstance(item := self.next(), yaml.SequenceEndEvent):
+                value.append(self.construct(item))
+        elif isinstance(event, yaml.MappingStartEvent):
+            value = {}
+            while not isinstance(key := self.next(), yaml.MappingEndEvent):
+                value[self.construct(key)] = self.construct()
+        else:
+            raise InventoryParseError(f"Unexpected YAML event {event!r}.")
+
+        if getattr(event, "anchor", None):
+            self.anchors[event.anchor] = value
+        return value
+
+    def mapping_keys(self):
+        """Yield the keys of the mapping that starts next (nothing for an empty value)."""
+        yaml = self.yaml
+        event = self.next()
+        if isinstance(event, yaml.ScalarEvent) and event.value in ("", "~", "null"):
+            return
+        if not isinstance(event, yaml.MappingStartEvent):
+            raise InventoryParseError(f"Expected a mapping, got {event!r}.")
+        while not isinstance(key := self.next(), yaml.MappingEndEvent):
+            yield str(self.construct(key))
+
+    def walk(self):
+        self.next(self.yaml.StreamStartEvent)
+        if isinstance(self.next(), self.yaml.StreamEndEvent):
+            return
+        for group in self.mapping_keys():
+            yield from self.group(group)
+
+    def group(self, name, parent=None):
+        yield GroupRecord(name, {})
+        if parent:
+            yield ChildRecord(parent, name)
+
+        for section in self.mapping_keys():
+            if section == "hosts":
+                for pattern in self.mapping_keys():
+                    variables = self.construct() or {}
+                    for host in expand_host_pattern(pattern):
+                        yield HostRecord(host, variables)
+                        yield MembershipRecord(name, host)
+            elif section == "vars":
+                yield GroupRecord(name, self.construct() or {})
+            elif section == "children":
+                for child in self.mapping_keys():
+                    yield from self.group(child, parent=name)
+            else:
+                raise InventoryParseError(f"Unknown key {section!r} in group {name!r}.")
+
+
+def parse_yaml(stream):
+    """
+        Parse an Ansible YAML inventory from its event stream.
+
+        Args:
+            stream (TextIO): The open inventory file.
+
+        Yields:
+            GroupRecord | HostRecord | MembershipRecord | ChildRecord
+    """
+    yield from _YamlWalker(stream).walk()
+
+
+PARSERS = {
+    "ini": parse_ini,
+    "yaml": parse_yaml,
+    "csv": parse_csv,
+}
+
+
+def guess_format(filename: str) -> str:
+    suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"yml": "yaml", "yaml": "yaml", "csv": "csv"}.get(suffix, "ini")
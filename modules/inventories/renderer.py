@@ -0,0 +1,132 @@
+import json
+from itertools import groupby
+
+from modules.inventories.models import Host, Inventory, InventoryGroup
+
+CHUNK_SIZE = 2000
+ALL_GROUP = "all"
+
+
+def _scalar(value) -> str:
+    # JSON is a subset of YAML flow style, and escapes everything YAML would choke on.
+    return json.dumps(value, ensure_ascii=False, separators=(", ", ": "))
+
+
+def iter_inventory_yaml(inventory: Inventory, group: InventoryGroup = None):
+    """
+        Render an inventory as an Ansible YAML inventory, piece by piece.
+
+        Hosts, groups and memberships are each read with a single ordered
+        `.iterator()` query and merge-joined on the group id, so the output is
+        produced in constant memory whatever the inventory size.
+
+        Args:
+            inventory (Inventory): The inventory to render.
+            group (InventoryGroup, optional): Only render this group and everything
+                nested under it (resolved through the group closure table).
+
+        Yields:
+            str: Consecutive chunks of the YAML document.
+    """
+    hosts = Host.objects.filter(inventory=inventory)
+    groups = InventoryGroup.objects.filter(inventory=inventory)
+    memberships = InventoryGroup.hosts.through.objects.filter(inventorygroup__inventory=inventory)
+    links = InventoryGroup.children.through.objects.filter(from_inventorygroup__inventory=inventory)
+    if group is not None:
+        subtree = InventoryGroup.closure().descendant_ids(group.pk)
+        hosts = group.all_hosts()
+        groups = groups.filter(pk__in=subtree)
+        memberships = memberships.filter(inventorygroup_id__in=subtree)
+        links = links.filter(from_inventorygroup_id__in=subtree)
+
+    hosts = (hosts
+             .order_by("pk")
+             .values_list("name", "variables")
+             .iterator(chunk_size=CHUNK_SIZE))
+    groups = (groups
+              .order_by("pk")
+              .values_list("pk", "name", "variables")
+              .iterator(chunk_size=CHUNK_SIZE))
+    memberships = groupby(
+        memberships
+        .order_by("inventorygroup_id", "host_id")
+        .values_list("inventorygroup_id", "host__name")
+        .iterator(chunk_size=CHUNK_SIZE),
+        key=lambda row: row[0],
+    )
+    children = groupby(
+        links
+        .order_by("from_inventorygroup_id", "to_inventorygroup_id")
+        .values_list("from_inventorygroup_id", "to_inventorygroup__name")
+        .iterator(chunk_size=CHUNK_SIZE),
+        key=lambda row: row[0],
+    )
+
+    yield "all:\n  hosts:\n"
+    buffer = []
+    for name, variables in hosts:
+        buffer.append(f"    {_scalar(name)}: {_scalar(variables) if variables else ''}\n")
+        if len(buffer) >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    yield "".join(buffer)
+
+    next_members = next(memberships, None)
+    next_children = next(children, None)
+    all_vars = {}
+    yield "  children:\n"
+    for group_id, name, variables in groups:
+        members = []
+        while next_members and next_members[0] < group_id:
+            next_members = next(memberships, None)
+        if next_members and next_members[0] == group_id:
+            members = next_members[1]
+
+        child_rows = []
+        while next_children and next_children[0] < group_id:
+            next_children = next(children, None)
+        if next_children and next_children[0] == group_id:
+            child_rows = next_children[1]
+
+        if name == ALL_GROUP:
+            # Every host already belongs to `all`; only its variables matter.
+            all_vars = variables
+            continue
+
+        yield f"    {_scalar(name)}:\n"
+        if variables:
+            yield f"      vars: {_scalar(variables)}\n"
+
+        first = True
+        for _, child in child_rows:
+            if first:
+                yield "      children:\n"
+                first = False
+            yield f"        {_scalar(child)}:\n"
+
+        buffer = []
+        for _, host in members:
+            if not buffer:
+                buffer.append("      hosts:\n")
+            buffer.append(f"        {_scalar(host)}:\n")
+            if len(buffer) >= CHUNK_SIZE:
+                yield "".join(buffer)
+                buffer = [""]
+        yield "".join(buffer)
+
+    if all_vars:
+        yield f"  vars: {_scalar(all_vars)}\n"
+
+
+def render_inventory(inventory: Inventory, out, group: InventoryGroup = None) -> int:
+    """
+        Write `inventory` (or only `group`'s subtree) as YAML to the text stream `out`.
+
+        Returns:
+            int: Number of characters written.
+    """
+    written = 0
+    for chunk in iter_inventory_yaml(inventory, group=group):
+        out.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,4 @@
+from modules.core.closure import connect_closure
+from modules.inventories.models import Inventory, InventoryGroup
+
+connect_closure(InventoryGroup.closure(), InventoryGroup, container_model=Inventory)
@@ -0,0 +1,207 @@
+import io
+import tempfile
+from pathlib import Path
+
+import yaml
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from modules.inventories.importer import import_inventory
+from modules.inventories.models import Host, Inventory, InventoryGroup, InventoryGroupClosure
+from modules.inventories.parsers import expand_host_pattern, parse_csv, parse_ini, parse_yaml
+from modules.inventories.renderer import render_inventory
+from modules.inventories.variables import VariableResolver
+
+INI_INVENTORY = """
+solo.example.com
+
+[web]
+web[01:03].example.com http_port=8080
+db.example.com
+
+[web:vars]
+ntp_server=ntp.example.com
+
+[prod:children]
+web
+"""
+
+YAML_INVENTORY = """
+all:
+  hosts:
+    solo.example.com:
+  children:
+    prod:
+      children:
+        web:
+          vars:
+            ntp_server: ntp.example.com
+          hosts:
+            web[01:03].example.com:
+              http_port: 8080
+            db.example.com:
+"""
+
+CSV_INVENTORY = """host,groups,http_port
+web01.example.com,web;prod,8080
+db.example.com,db,
+"""
+
+
+class InventoryImportTests(TestCase):
+    def setUp(self):
+        self.inventory = Inventory.objects.create(name="datacenter")
+
+    def assertImported(self):
+        web = InventoryGroup.objects.get(inventory=self.inventory, name="web")
+        self.assertEqual(web.variables, {"ntp_server": "ntp.example.com"})
+        self.assertEqual(
+            sorted(web.hosts.values_list("name", flat=True)),
+            ["db.example.com", "web01.example.com", "web02.example.com", "web03.example.com"],
+        )
+        self.assertEqual(Host.objects.get(inventory=self.inventory, name="web02.example.com").variables,
+                         {"http_port": 8080})
+        self.assertEqual(list(web.parents.values_list("name", flat=True)), ["prod"])
+
+    def test_expand_host_pattern(self):
+        self.assertEqual(list(expand_host_pattern("web[08:10]")), ["web08", "web09", "web10"])
+        self.assertEqual(list(expand_host_pattern("db-[a:c]")), ["db-a", "db-b", "db-c"])
+
+    def test_import_ini(self):
+        stats = import_inventory(self.inventory, parse_ini(io.StringIO(INI_INVENTORY)), batch_size=3)
+        self.assertImported()
+        self.assertEqual(stats["hosts"], 5)
+        self.assertTrue(InventoryGroup.objects.get(name="ungrouped").hosts.filter(name="solo.example.com").exists())
+
+    def test_import_yaml(self):
+        import_inventory(self.inventory, parse_yaml(io.StringIO(YAML_INVENTORY)), batch_size=3)
+        self.assertImported()
+
+    def test_import_csv(self):
+        import_inventory(self.inventory, parse_csv(io.StringIO(CSV_INVENTORY)))
+        self.assertEqual(Host.objects.get(name="web01.example.com").variables, {"http_port": 8080})
+        self.assertEqual(Host.objects.get(name="db.example.com").variables, {})
+        self.assertEqual(sorted(InventoryGroup.objects.get(name="prod")
+                                .hosts.values_list("name", flat=True)), ["web01.example.com"])
+
+    def test_nested_lookups_use_the_closure(self):
+        import_inventory(self.inventory, parse_ini(io.StringIO(INI_INVENTORY)))
+        prod = InventoryGroup.objects.get(inventory=self.inventory, name="prod")
+        with self.assertNumQueries(1):
+            self.assertEqual(len(prod.all_hosts()), 4)
+        host = Host.objects.get(inventory=self.inventory, name="db.example.com")
+        with self.assertNumQueries(1):
+            self.assertEqual({group.name for group in host.all_groups()}, {"web", "prod"})
+
+        web = InventoryGroup.objects.get(inventory=self.inventory, name="web")
+        prod.children.remove(web)
+        self.assertEqual(prod.all_hosts().count(), 0)
+        self.inventory.delete()
+        self.assertFalse(InventoryGroupClosure.objects.exists())
+
+    def test_reimport_is_idempotent(self):
+        import_inventory(self.inventory, parse_ini(io.StringIO(INI_INVENTORY)))
+        stats = import_inventory(self.inventory, parse_ini(io.StringIO(INI_INVENTORY)), batch_size=2)
+        self.assertEqual(stats["hosts"], 0)
+        self.assertEqual(Host.objects.filter(inventory=self.inventory).count(), 5)
+        self.assertEqual(InventoryGroup.hosts.through.objects.count(), 5)
+
+    def test_cycle_rolls_back_the_whole_import(self):
+        cyclic = INI_INVENTORY + "\n[web:children]\nprod\n"
+        with self.assertRaises(ValidationError):
+            import_inventory(self.inventory, parse_ini(io.StringIO(cyclic)), batch_size=2)
+        self.assertFalse(Host.objects.filter(inventory=self.inventory).exists())
+        self.assertFalse(InventoryGroup.objects.filter(inventory=self.inventory).exists())
+
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / "cyclic.ini"
+        path.write_text(cyclic)
+        with self.assertRaisesMessage(CommandError, "cycle"):
+            call_command("import_inventory", str(path), stdout=io.StringIO())
+        self.assertFalse(Inventory.objects.filter(name="cyclic").exists())
+
+    def test_render_round_trip(self):
+        import_inventory(self.inventory, parse_ini(io.StringIO(INI_INVENTORY)))
+        out = io.StringIO()
+        render_inventory(self.inventory, out)
+
+        rendered = yaml.safe_load(out.getvalue())
+        self.assertIn("solo.example.com", rendered["all"]["hosts"])
+        self.assertEqual(rendered["all"]["hosts"]["web01.example.com"], {"http_port": 8080})
+        self.assertEqual(rendered["all"]["children"]["prod"]["children"], {"web": None})
+
+        prod = InventoryGroup.objects.get(inventory=self.inventory, name="prod")
+        out = io.StringIO()
+        render_inventory(self.inventory, out, group=prod)
+        subtree = yaml.safe_load(out.getvalue())["all"]
+        self.assertEqual(set(subtree["hosts"]), {f"web0{i}.example.com" for i in (1, 2, 3)} | {"db.example.com"})
+        self.assertEqual(set(subtree["children"]), {"prod", "web"})
+
+        copy = Inventory.objects.create(name="copy")
+        out = io.StringIO()
+        render_inventory(self.inventory, out)
+        out.seek(0)
+        import_inventory(copy, parse_yaml(out))
+        self.assertEqual(Host.objects.filter(inventory=copy).count(), 5)
+        self.assertEqual(InventoryGroup.objects.get(inventory=copy, name="web").hosts.count(), 4)
+
+
+class VariableResolverTests(TestCase):
+    def setUp(self):
+        self.inventory = Inventory.objects.create(name="datacenter")
+        import_inventory(self.inventory, parse_ini(io.StringIO("""
+[web]
+web01 role=frontend
+web02
+
+[db]
+db01
+
+[all:vars]
+tier=all
+port=1
+
+[prod:vars]
+tier=prod
+port=2
+
+[web:vars]
+port=3
+
+[prod:children]
+web
+db
+""")))
+
+    def test_precedence(self):
+        resolved = dict(VariableResolver().resolve_inventory(self.inventory, extra_vars={"tier": "extra"}))
+        # Like Ansible, `:vars` sections of INI files hold strings.
+        self.assertEqual(resolved["web01"], {"tier": "extra", "port": "3", "role": "frontend"})
+        self.assertEqual(resolved["db01"], {"tier": "extra", "port": "2"})
+
+        web01 = Host.objects.get(name="web01")
+        self.assertEqual(VariableResolver().resolve_host(web01), {"tier": "prod", "port": "3", "role": "frontend"})
+
+    def test_group_priority_orders_siblings(self):
+        both = Host.objects.create(inventory=self.inventory, name="both")
+        web = InventoryGroup.objects.get(name="web")
+        db = InventoryGroup.objects.get(name="db")
+        both.groups.add(web, db)
+        # Same depth: sorted by name, so `web` wins unless `db` has a higher priority.
+        self.assertEqual(VariableResolver().resolve_host(both)["port"], "3")
+        db.variables = {"port": 4, "ansible_group_priority": 10}
+        db.save()
+        self.assertEqual(VariableResolver().resolve_host(both)["port"], 4)
+
+    def test_changing_a_group_only_recomputes_its_chains(self):
+        resolver = VariableResolver()
+        list(resolver.resolve_inventory(self.inventory))
+        computed = resolver.misses
+
+        db = InventoryGroup.objects.get(name="db")
+        db.variables = {"port": 5}
+        db.save()
+        resolved = dict(resolver.resolve_inventory(self.inventory))
+        self.assertEqual(resolved["db01"]["port"], 5)
+        self.assertEqual(resolved["web02"]["port"], "3")
+        self.assertEqual(resolver.misses - computed, 1)
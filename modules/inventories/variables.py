@@ -0,0 +1,242 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict, deque
+from itertools import groupby
+
+from modules.inventories.models import Host, Inventory, InventoryGroup, InventoryGroupClosure
+
+ALL_GROUP = "all"
+PRIORITY_VAR = "ansible_group_priority"
+DEFAULT_LAYER_CACHE_SIZE = 10_000
+CHUNK_SIZE = 2000
+
+
+def vars_digest(variables: dict) -> str:
+    return hashlib.blake2b(
+        json.dumps(variables, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+def combine(base: dict, override: dict, hash_behaviour: str = "replace") -> dict:
+    """
+        Merge two variable layers like Ansible does.
+
+        Args:
+            base (dict): Lower precedence variables.
+            override (dict): Higher precedence variables.
+            hash_behaviour (str, optional): "replace" (Ansible's default) overwrites
+                top-level keys, "merge" merges nested dictionaries recursively.
+
+        Returns:
+            dict: A new dict; neither input is modified.
+    """
+    if hash_behaviour != "merge":
+        return {**base, **override}
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = combine(merged[key], value, hash_behaviour)
+        else:
+            merged[key] = value
+    return merged
+
+
+class GroupLayer:
+    __slots__ = ("pk", "name", "variables", "digest", "depth", "priority", "ancestors")
+
+    def __init__(self, pk, name, variables):
+        self.pk = pk
+        self.name = name
+        self.variables = variables or {}
+        self.digest = vars_digest(self.variables)
+        self.depth = 0
+        self.ancestors = ()
+        try:
+            self.priority = int(self.variables.get(PRIORITY_VAR, 1))
+        except (TypeError, ValueError):
+            self.priority = 1
+
+    @property
+    def sort_key(self):
+        return self.depth, self.priority, self.name
+
+
+class InventoryGraph:
+    """
+        Groups of one inventory with everything precedence needs: variables,
+        their digest, depth below `all`, priority and ancestors.
+
+        Loaded with three queries (groups, links, closure rows); groups are few
+        compared to hosts, so this is the only per-inventory state kept.
+    """
+
+    def __init__(self, inventory: Inventory):
+        self.groups = {
+            pk: GroupLayer(pk, name, variables)
+            for pk, name, variables in InventoryGroup.objects
+            .filter(inventory=inventory)
+            .values_list("pk", "name", "variables")
+        }
+        self.all_group = next((group for group in self.groups.values() if group.name == ALL_GROUP), None)
+        self._compute_depths(inventory)
+
+        ancestors = defaultdict(list)
+        for ancestor_id, descendant_id in (InventoryGroupClosure.objects
+                                           .filter(descendant__inventory=inventory)
+                                           .values_list("ancestor_id", "descendant_id")):
+            ancestors[descendant_id].append(ancestor_id)
+        for pk, group in self.groups.items():
+            group.ancestors = tuple(ancestors[pk]) or (pk,)
+
+    def _compute_depths(self, inventory) -> None:
+        # Like Ansible: `all` is 0, every other group sits one below its deepest parent.
+        children = defaultdict(list)
+        indegree = dict.fromkeys(self.groups, 0)
+        for parent, child in (InventoryGroup.children.through.objects
+                              .filter(from_inventorygroup__inventory=inventory)
+                              .values_list("from_inventorygroup_id", "to_inventorygroup_id")):
+            children[parent].append(child)
+            indegree[child] += 1
+
+        queue = deque(pk for pk, degree in indegree.items() if degree == 0)
+        for pk in queue:
+            group = self.groups[pk]
+            group.depth = 0 if group.name == ALL_GROUP else 1
+        while queue:
+            pk = queue.popleft()
+            depth = self.groups[pk].depth
+            for child in children[pk]:
+                self.groups[child].depth = max(self.groups[child].depth, depth + 1)
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+
+    def chain(self, direct_group_ids) -> list:
+        """Every group applying to a host in the given groups, lowest precedence first."""
+        applying = {ancestor for pk in direct_group_ids for ancestor in self.groups[pk].ancestors}
+        if self.all_group:
+            applying.add(self.all_group.pk)
+        return sorted((self.groups[pk] for pk in applying), key=lambda group: group.sort_key)
+
+
+class VariableResolver:
+    """
+        Computes host variables by Ansible precedence: `all` < parent groups <
+        child groups < host vars < extra vars, groups of equal depth ordered by
+        `ansible_group_priority` then name.
+
+        Group variables are merged layer by layer and every intermediate layer
+        is memoized under a hash of the layers below it plus its own content.
+        Hosts sharing a group chain (or a prefix of one) reuse the same merged
+        dicts, and since keys are content hashes, editing one group's vars only
+        changes the keys of chains containing that group: only the hosts under
+        it are recomputed, with no explicit invalidation.
+
+        Returned dicts must be treated as read-only; nested values are shared
+        with the memoized layers.
+
+        Args:
+            max_layers (int, optional): Size of the LRU of memoized layers.
+            hash_behaviour (str, optional): "replace" or "merge" (see `combine`).
+    """
+
+    def __init__(self, max_layers: int = DEFAULT_LAYER_CACHE_SIZE, hash_behaviour: str = "replace"):
+        self.max_layers = max_layers
+        self.hash_behaviour = hash_behaviour
+        self.layers = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _layer(self, key: str, compute):
+        with self.lock:
+            value = self.layers.get(key)
+            if value is not None:
+                self.hits += 1
+                self.layers.move_to_end(key)
+                return value
+        value = compute()
+        with self.lock:
+            self.misses += 1
+            self.layers[key] = value
+            if len(self.layers) > self.max_layers:
+                self.layers.popitem(last=False)
+        return value
+
+    def group_vars(self, chain) -> tuple[str, dict]:
+        """Merge a sorted group chain; returns the layer key and the merged vars."""
+        key, merged = "", {}
+        for group in chain:
+            parent = merged
+            key = hashlib.blake2b(f"{key}:{group.digest}".encode(), digest_size=16).hexdigest()
+            merged = self._layer(key, lambda: combine(parent, group.variables, self.hash_behaviour))
+        return key, merged
+
+    def host_vars(self, group_vars: dict, variables: dict, extra_vars: dict = None) -> dict:
+        merged = combine(group_vars, variables or {}, self.hash_behaviour)
+        if extra_vars:
+            merged = combine(merged, extra_vars, self.hash_behaviour)
+        return merged
+
+    def resolve_host(self, host: Host, extra_vars: dict = None) -> dict:
+        """Resolved variables of a single host."""
+        graph = InventoryGraph(host.inventory_id)
+        _, group_vars = self.group_vars(graph.chain(host.groups.values_list("pk", flat=True)))
+        return self.host_vars(group_vars, host.variables, extra_vars)
+
+    def resolve_inventory(self, inventory: Inventory, extra_vars: dict = None):
+        """
+            Resolve the variables of every host of an inventory in one pass.
+
+            Hosts and their memberships are streamed with two ordered queries
+            and merge-joined on the host id, so memory stays bounded by the
+            number of distinct group chains, not the number of hosts.
+
+            Args:
+                inventory (Inventory): The inventory to resolve.
+                extra_vars (dict, optional): Highest precedence variables (`-e`).
+
+            Yields:
+                tuple[str, dict]: Host name and its resolved variables.
+        """
+        graph = InventoryGraph(inventory)
+        hosts = (Host.objects
+                 .filter(inventory=inventory)
+                 .order_by("pk")
+                 .values_list("pk", "name", "variables")
+                 .iterator(chunk_size=CHUNK_SIZE))
+        memberships = groupby(
+            InventoryGroup.hosts.through.objects
+            .filter(host__inventory=inventory)
+            .order_by("host_id", "inventorygroup_id")
+            .values_list("host_id", "inventorygroup_id")
+            .iterator(chunk_size=CHUNK_SIZE),
+            key=lambda row: row[0],
+        )
+
+        # Hosts with the same direct groups share a chain; resolve each chain once per pass.
+        chains = {}
+        next_members = next(memberships, None)
+        for pk, name, variables in hosts:
+            while next_members and next_members[0] < pk:
+                next_members = next(memberships, None)
+            group_ids = ()
+            if next_members and next_members[0] == pk:
+                group_ids = tuple(group_id for _, group_id in next_members[1])
+            if group_ids not in chains:
+                chains[group_ids] = self.group_vars(graph.chain(group_ids))[1]
+            yield name, self.host_vars(chains[group_ids], variables, extra_vars)
+
+
+default_resolver = VariableResolver()
+
+
+def resolve_inventory_vars(inventory: Inventory, extra_vars: dict = None):
+    """Resolve every host's variables with the process-wide resolver (see `VariableResolver`)."""
+    return default_resolver.resolve_inventory(inventory, extra_vars)
+
+
+def resolve_host_vars(host: Host, extra_vars: dict = None) -> dict:
+    return default_resolver.resolve_host(host, extra_vars)
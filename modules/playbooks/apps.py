@@ -5,3 +5,6 @@ class PlaybooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     label = 'playbooks'
     name = 'modules.playbooks'
+
+    def ready(self):
+        from modules.playbooks import signals  # noqa: F401
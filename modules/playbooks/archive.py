@@ -0,0 +1,369 @@
+import io
+import json
+import shutil
+import tarfile
+import tempfile
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.text import slugify
+
+from modules.audit.models import AuditEvent
+from modules.audit.signals import record
+from modules.core.models import Group, Tag
+from modules.playbooks.fragments import bump_row_version
+from modules.playbooks.models import Playbook
+from modules.playbooks.search import get_search_backend
+from modules.playbooks.versioning import content_digest, record_version
+
+FORMATS = ("ndjson", "tar")
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "tar": "application/gzip"}
+EXTENSIONS = {"ndjson": "ndjson", "tar": "tar.gz"}
+MANIFEST = "manifest.ndjson"
+CHUNK_SIZE = 500
+DEFAULT_BATCH_SIZE = 500
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _metadata(playbook: Playbook) -> dict:
+    return {
+        "name": playbook.name,
+        "description": playbook.description or "",
+        "is_public": playbook.is_public,
+        "tags": [tag.name for tag in playbook.tags.all()],
+        "groups": [group.name for group in playbook.visible_to.all()],
+    }
+
+
+def _with_relations(queryset):
+    return queryset.order_by("id").prefetch_related(
+        Prefetch("tags", queryset=Tag.objects.only("id", "name").order_by("name")),
+        Prefetch("visible_to", queryset=Group.objects.only("id", "name").order_by("name")),
+    )
+
+
+def _line(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def iter_ndjson(queryset, chunk_size: int = CHUNK_SIZE):
+    """Yield one JSON line per playbook of `queryset`, content included, reading `chunk_size` rows at a time."""
+    for playbook in _with_relations(queryset).iterator(chunk_size=chunk_size):
+        yield _line({**_metadata(playbook), "content": playbook.content or ""})
+
+
+class _Pipe:
+    """Write-only file object collecting what `tarfile` writes until the next `drain()`."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def iter_tar(queryset, chunk_size: int = CHUNK_SIZE):
+    """
+        Yield a gzipped tar of one YAML file per playbook, preceded by `manifest.ndjson`.
+
+        The manifest (one line of metadata per file, in file order) comes first so
+        an importer reading the stream front to back knows each file's metadata
+        before its content. It is built in a first pass that leaves `content`
+        deferred and is spooled to a temporary file; the second pass reads the
+        content in the same id order. A playbook edited in between is exported
+        with its newer content.
+    """
+    pipe = _Pipe()
+    tar = tarfile.open(fileobj=pipe, mode="w|gz")
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as manifest:
+        first = last = None
+        for playbook in _with_relations(queryset.defer("content")).iterator(chunk_size=chunk_size):
+            file = f"playbooks/{playbook.pk:06d}-{slugify(playbook.name)[:50] or 'playbook'}.yml"
+            manifest.write(_line({"file": file, "source_id": playbook.pk, **_metadata(playbook)}))
+            first, last = first or playbook.pk, playbook.pk
+
+        info = tarfile.TarInfo(MANIFEST)
+        info.size, info.mtime = manifest.tell(), int(time.time())
+        manifest.seek(0)
+        tar.addfile(info, manifest)
+        yield pipe.drain()
+
+        # Merge-join the manifest with the contents, both in id order.
+        manifest.seek(0)
+        rows = (Playbook.all_objects.filter(pk__gte=first or 0, pk__lte=last or 0).order_by("id")
+                .values_list("id", "content", "updated_at").iterator(chunk_size=chunk_size))
+        row = next(rows, None)
+        for line in manifest:
+            entry = json.loads(line)
+            while row is not None and row[0] < entry["source_id"]:
+                row = next(rows, None)
+            content, updated_at = (row[1] or "", row[2]) if row and row[0] == entry["source_id"] else ("", None)
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(entry["file"])
+            info.size = len(data)
+            info.mtime = int((updated_at or timezone.now()).timestamp())
+            tar.addfile(info, io.BytesIO(data))
+            chunk = pipe.drain()
+            if chunk:
+                yield chunk
+    tar.close()
+    yield pipe.drain()
+
+
+def iter_archive(queryset, format: str = "ndjson", chunk_size: int = CHUNK_SIZE):
+    """
+        Stream `queryset` as an archive `import_playbooks` can read back.
+
+        Args:
+            queryset (PlaybookQuerySet): The playbooks to export.
+            format (str): "ndjson" (one JSON object per line) or "tar" (tar.gz of YAML files).
+            chunk_size (int, optional): Rows fetched per query.
+
+        Yields:
+            bytes: Consecutive chunks of the archive.
+    """
+    if format not in FORMATS:
+        raise ArchiveError(f"Unknown archive format {format!r}.")
+    return iter_ndjson(queryset, chunk_size) if format == "ndjson" else iter_tar(queryset, chunk_size)
+
+
+def _record(data, lineno: int) -> dict:
+    if not isinstance(data, dict) or not isinstance(data.get("name"), str) or not data["name"].strip():
+        raise ArchiveError(f"Record {lineno}: a playbook needs a name.")
+    if len(data["name"]) > Playbook._meta.get_field("name").max_length:
+        raise ArchiveError(f"Record {lineno}: name {data['name'][:30]!r}... is too long.")
+    for key in ("tags", "groups"):
+        if not isinstance(data.get(key, []), list) or not all(isinstance(name, str) for name in data.get(key, [])):
+            raise ArchiveError(f"Record {lineno}: {key} must be a list of names.")
+    return {
+        "name": data["name"].strip(),
+        "description": str(data.get("description") or ""),
+        "content": str(data.get("content") or ""),
+        "is_public": bool(data.get("is_public", True)),
+        "tags": data.get("tags", []),
+        "groups": data.get("groups", []),
+    }
+
+
+def _json_lines(stream):
+    for lineno, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield lineno, json.loads(line)
+        except ValueError as exc:
+            raise ArchiveError(f"Line {lineno}: {exc}") from exc
+
+
+def read_ndjson(stream):
+    for lineno, data in _json_lines(stream):
+        yield _record(data, lineno)
+
+
+def read_tar(stream):
+    try:
+        with tarfile.open(fileobj=stream, mode="r|gz") as tar:
+            member = tar.next()
+            if member is None or member.name != MANIFEST:
+                raise ArchiveError(f"The archive must start with {MANIFEST}.")
+            with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as manifest:
+                shutil.copyfileobj(tar.extractfile(member), manifest)
+                manifest.seek(0)
+                for lineno, data in _json_lines(manifest):
+                    member = tar.next()
+                    if member is None or not member.isfile() or member.name != data.get("file"):
+                        raise ArchiveError(f"Manifest line {lineno}: expected {data.get('file')!r} next.")
+                    content = tar.extractfile(member).read().decode("utf-8")
+                    yield _record({**data, "content": content}, lineno)
+    except (tarfile.TarError, EOFError, OSError, UnicodeDecodeError) as exc:
+        raise ArchiveError(f"Unreadable archive: {exc}") from exc
+
+
+def read_archive(stream):
+    """
+        Playbook records of an archive written by `iter_archive`, in either format.
+
+        The format is told by the gzip magic number; `stream` must be a seekable
+        binary file. Records are parsed one at a time.
+    """
+    magic = stream.read(2)
+    stream.seek(0)
+    return read_tar(stream) if magic == b"\x1f\x8b" else read_ndjson(stream)
+
+
+class PlaybookImporter:
+    """
+        Loads archive records into playbooks in fixed-size batches.
+
+        Each batch is written in one transaction with `bulk_create` /
+        `bulk_update` for the playbooks and `ignore_conflicts` inserts for their
+        tag and group links; only the tag and group name -> id maps are kept
+        between batches, so memory stays flat whatever the archive size.
+
+        Importing is idempotent: a record matches the oldest playbook of
+        `queryset` with the same name, and its content is compared by SHA-256
+        digest. Unchanged playbooks are left alone (missing links are still
+        added), changed ones get a new version. Tags and groups are matched by
+        name; missing ones are created if their model is in `creatable`,
+        otherwise the links to them are skipped and counted as
+        `skipped_tags` / `skipped_groups`.
+
+        Batches commit one by one; callers that want all or nothing wrap `run()`
+        in a transaction. `stats` only counts committed playbooks in `created`,
+        `updated` and `unchanged`, so it tells how far a failed import got.
+
+        Args:
+            user (CustomUser, optional): Recorded as author of created and updated playbooks.
+            queryset (PlaybookQuerySet, optional): Playbooks records may update (default: all live ones).
+            batch_size (int, optional): Records written per transaction.
+            progress (callable, optional): Called as `progress(stats)` after each batch.
+            creatable (Iterable[Model], optional): Of `Tag` and `Group`, the models whose missing
+                rows may be created (default: both).
+    """
+
+    def __init__(self, user=None, queryset=None, batch_size: int = DEFAULT_BATCH_SIZE, progress=None,
+                 creatable=(Tag, Group)):
+        self.user = user
+        self.queryset = queryset if queryset is not None else Playbook.objects.all()
+        self.creatable = frozenset(creatable)
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.stats = Counter()
+        self.tag_ids = {}
+        self.group_ids = {}
+        self.pending = {}
+
+    def feed(self, record: dict) -> None:
+        # Within a batch the last record of a name wins, as it would across batches.
+        self.pending.pop(record["name"], None)
+        self.pending[record["name"]] = record
+        self.stats["records"] += 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def run(self, records) -> Counter:
+        """Import every record of `records` and return the statistics."""
+        for record in records:
+            self.feed(record)
+        self.flush()
+        return self.stats
+
+    def _ids(self, model, cache: dict, names) -> dict:
+        missing = set(names) - cache.keys()
+        if missing:
+            cache.update(model.objects.filter(name__in=missing).values_list("name", "pk"))
+            if model not in self.creatable:
+                return cache
+            new = [model(name=name, created_by=self.user) for name in missing - cache.keys()]
+            model.objects.bulk_create(new, ignore_conflicts=True)
+            cache.update(model.objects.filter(name__in=[obj.name for obj in new]).values_list("name", "pk"))
+            if model is Group:
+                # `bulk_create` skips the save signal that writes a group's closure self-row, and
+                # `get_user_group_ids` only finds groups through closure rows.
+                Group.closure().add_nodes(*(cache[obj.name] for obj in new))
+            self.stats[model._meta.verbose_name_plural] += len(new)
+        return cache
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with transaction.atomic():
+            self._flush()
+        self.pending = {}
+        if self.progress:
+            self.progress(self.stats)
+
+    def _flush(self) -> None:
+        existing = {}
+        for playbook in (self.queryset.filter(name__in=list(self.pending)).order_by("id")
+                         .only("id", "name", "description", "content", "is_public")):
+            existing.setdefault(playbook.name, playbook)
+
+        now = timezone.now()
+        created, changed = [], []
+        for name, data in self.pending.items():
+            playbook = existing.get(name)
+            if playbook is None:
+                created.append(Playbook(name=name, description=data["description"], content=data["content"],
+                                        is_public=data["is_public"], created_by=self.user))
+                continue
+            changes = {}
+            if content_digest(playbook.content or "") != content_digest(data["content"]):
+                changes["content"] = [content_digest(playbook.content or ""), content_digest(data["content"])]
+            for field in ("description", "is_public"):
+                old = getattr(playbook, field) or ("" if field == "description" else False)
+                if old != data[field]:
+                    changes[field] = [old, data[field]]
+            if changes:
+                playbook.description, playbook.content, playbook.is_public = (
+                    data["description"], data["content"], data["is_public"])
+                playbook.updated_at, playbook.updated_by = now, self.user
+                changed.append((playbook, changes))
+
+        Playbook.objects.bulk_create(created, batch_size=self.batch_size)
+        Playbook.objects.bulk_update([playbook for playbook, _ in changed],
+                                     ["description", "content", "is_public", "updated_at", "updated_by"],
+                                     batch_size=self.batch_size)
+        for playbook in created:
+            existing[playbook.name] = playbook
+            record(playbook, AuditEvent.Action.CREATE, {"name": [None, playbook.name]})
+        for playbook, changes in changed:
+            record(playbook, AuditEvent.Action.UPDATE, changes)
+        for playbook in [*created, *(playbook for playbook, changes in changed if "content" in changes)]:
+            record_version(playbook)
+
+        tag_ids = self._ids(Tag, self.tag_ids, {name for data in self.pending.values() for name in data["tags"]})
+        group_ids = self._ids(Group, self.group_ids,
+                              {name for data in self.pending.values() for name in data["groups"]})
+        for through, target, names, ids in (
+            (Playbook.tags.through, "tag_id", "tags", tag_ids),
+            (Playbook.visible_to.through, "group_id", "groups", group_ids),
+        ):
+            links = [(existing[name].pk, related) for name, data in self.pending.items() for related in data[names]]
+            through.objects.bulk_create(
+                [through(playbook_id=pk, **{target: ids[related]}) for pk, related in links if related in ids],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            self.stats[f"skipped_{names}"] += sum(related not in ids for _, related in links)
+
+        playbook_ids = [existing[name].pk for name in self.pending]
+        get_search_backend().index(playbook_ids)
+        Playbook.forget_group_ids(*playbook_ids)
+        bump_row_version()
+        self.stats["created"] += len(created)
+        self.stats["updated"] += len(changed)
+        self.stats["unchanged"] += len(self.pending) - len(created) - len(changed)
+
+
+def import_playbooks(records, user=None, queryset=None, batch_size: int = DEFAULT_BATCH_SIZE,
+                     progress=None, creatable=(Tag, Group)) -> Counter:
+    """
+        Import archive records (see `read_archive`) into playbooks.
+
+        Args:
+            records (Iterable[dict]): The records.
+            user (CustomUser, optional): Author of the created and updated playbooks.
+            queryset (PlaybookQuerySet, optional): Playbooks the records may update.
+            batch_size (int, optional): Records written per transaction.
+            progress (callable, optional): Called with the running statistics after each batch.
+            creatable (Iterable[Model], optional): Of `Tag` and `Group`, the models whose missing
+                rows may be created (default: both).
+
+        Returns:
+            Counter: Number of records, created, updated and unchanged playbooks, new tags and
+            groups, and links skipped because their tag or group could not be created.
+    """
+    return PlaybookImporter(user=user, queryset=queryset, batch_size=batch_size, progress=progress,
+                            creatable=creatable).run(records)
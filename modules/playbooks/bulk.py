@@ -0,0 +1,159 @@
+from typing import NamedTuple
+
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+from modules.audit.models import AuditEvent
+from modules.audit.signals import record
+from modules.core.models import Group, Tag
+from modules.playbooks.models import Playbook
+from modules.playbooks.search import get_search_backend
+
+
+class BulkResult(NamedTuple):
+    playbooks: int       # Playbooks the action applied to
+    linked: int = 0      # Through rows created
+    unlinked: int = 0    # Through rows deleted
+    updated: int = 0     # Playbooks whose `is_public` flipped
+    deleted: int = 0     # Playbooks soft-deleted
+
+
+def _related(model, ids) -> dict:
+    ids = set(ids)
+    found = {obj.pk: obj for obj in model.objects.filter(pk__in=ids).only("id", "name")}
+    missing = ids - found.keys()
+    if missing:
+        raise ValidationError(f"Unknown {model._meta.verbose_name} ids: {', '.join(map(str, sorted(missing)))}.")
+    return found
+
+
+def _send(field, action: str, related: dict, links: dict) -> None:
+    """
+        Fire `m2m_changed` once per related object, like `tag.playbook_tags.add(*ids)` would.
+
+        The receivers (ACL cache, search index, row cache, audit log) all handle
+        the reverse form, which carries every affected playbook id in one `pk_set`.
+    """
+    for related_id, playbook_ids in links.items():
+        m2m_changed.send(sender=field.remote_field.through, action=action, instance=related[related_id],
+                         reverse=True, model=Playbook, pk_set=playbook_ids,
+                         using=router.db_for_write(Playbook))
+
+
+def _link(field, related: dict, playbook_ids: set) -> dict:
+    through = field.remote_field.through
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    existing = set(through.objects.filter(**{f"{source}_id__in": playbook_ids, f"{target}_id__in": related})
+                   .values_list(f"{source}_id", f"{target}_id"))
+    links = {}
+    for related_id in related:
+        missing = {pk for pk in playbook_ids if (pk, related_id) not in existing}
+        if missing:
+            links[related_id] = missing
+    if links:
+        _send(field, "pre_add", related, links)
+        through.objects.bulk_create([through(**{f"{source}_id": pk, f"{target}_id": related_id})
+                                     for related_id, pks in links.items() for pk in pks], batch_size=500)
+        _send(field, "post_add", related, links)
+    return links
+
+
+def _unlink(field, related: dict, playbook_ids: set) -> dict:
+    through = field.remote_field.through
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    rows = through.objects.filter(**{f"{source}_id__in": playbook_ids, f"{target}_id__in": related})
+    links = {}
+    for pk, related_id in rows.values_list(f"{source}_id", f"{target}_id"):
+        links.setdefault(related_id, set()).add(pk)
+    if links:
+        _send(field, "pre_remove", related, links)
+        rows.delete()
+        _send(field, "post_remove", related, links)
+    return links
+
+
+def bulk_update_playbooks(user, playbook_ids, add_tags=(), remove_tags=(), add_groups=(), remove_groups=(),
+                          is_public: bool = None, delete: bool = False) -> BulkResult:
+    """
+        Apply one multi-select action to many playbooks in a single transaction.
+
+        Visibility is checked once for the whole selection; if any playbook is
+        not visible to `user` nothing is changed. Links are diffed against the
+        through tables and written with one `bulk_create` / filtered delete per
+        relation instead of resaving every playbook, and the touched playbooks
+        get a new `updated_at` so cached rows and API ETags move on. `m2m_changed`
+        is still sent, once per tag or group, so the usual receivers keep up.
+
+        Args:
+            user (CustomUser): The acting user.
+            playbook_ids (Iterable[int]): The selected playbooks.
+            add_tags, remove_tags (Iterable[int]): Tag ids to link / unlink.
+            add_groups, remove_groups (Iterable[int]): Group ids to share with / unshare from.
+            is_public (bool, optional): New visibility flag.
+            delete (bool): Soft-delete the selection (other changes are ignored).
+
+        Returns:
+            BulkResult: What was changed.
+
+        Raises:
+            PermissionDenied: A selected playbook is not visible to `user`.
+            ValidationError: Unknown tag or group ids, or a private playbook left without groups.
+    """
+    playbook_ids = set(map(int, playbook_ids))
+    with transaction.atomic():
+        playbooks = {playbook.pk: playbook for playbook in
+                     Playbook.objects.visible_to(user).filter(pk__in=playbook_ids).only("id", "name", "is_public")}
+        if len(playbooks) != len(playbook_ids):
+            raise PermissionDenied("Some of the selected playbooks do not exist or are not visible to you.")
+        if not playbooks:
+            return BulkResult(0)
+
+        now = timezone.now()
+        if delete:
+            deleted = Playbook.objects.filter(pk__in=playbook_ids).soft_delete(user=user)
+            for playbook in playbooks.values():
+                record(playbook, AuditEvent.Action.DELETE, {"deleted_at": [None, now]})
+            Playbook.forget_group_ids(*playbook_ids)
+            get_search_backend().remove(playbook_ids)
+            return BulkResult(len(playbooks), deleted=deleted)
+
+        tags_field, groups_field = Playbook._meta.get_field("tags"), Playbook._meta.get_field("visible_to")
+        changes = [
+            (_link, tags_field, Tag, add_tags), (_unlink, tags_field, Tag, remove_tags),
+            (_link, groups_field, Group, add_groups), (_unlink, groups_field, Group, remove_groups),
+        ]
+        linked = unlinked = 0
+        touched = set()
+        for apply, field, model, related_ids in changes:
+            if not related_ids:
+                continue
+            links = apply(field, _related(model, related_ids), playbook_ids)
+            count = sum(map(len, links.values()))
+            if apply is _link:
+                linked += count
+            else:
+                unlinked += count
+            touched.update(*links.values())
+
+        flipped = []
+        if is_public is not None:
+            flipped = [pk for pk, playbook in playbooks.items() if playbook.is_public != is_public]
+            Playbook.objects.filter(pk__in=flipped).update(is_public=is_public)
+            touched.update(flipped)
+            for pk in flipped:
+                record(playbooks[pk], AuditEvent.Action.UPDATE, {"is_public": [not is_public, is_public]})
+
+        # Same rule as `PlaybookForm`: a private playbook must be shared with some group.
+        unshared = (Playbook.objects.filter(pk__in=touched, is_public=False)
+                    .exclude(Exists(groups_field.remote_field.through.objects.filter(playbook_id=OuterRef("pk"))))
+                    .values_list("name", flat=True))
+        names = sorted(unshared)
+        if names:
+            raise ValidationError(f"Private playbooks need at least one group: {', '.join(names)}.")
+
+        if touched:
+            Playbook.objects.filter(pk__in=touched).update(updated_at=now, updated_by=user)
+        return BulkResult(len(playbooks), linked=linked, unlinked=unlinked, updated=len(flipped))
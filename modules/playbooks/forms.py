@@ -81,3 +81,57 @@ class PlaybookForm(forms.ModelForm):
             )
 
         return cleaned_data
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return sorted({int(pk) for pk in value or ()})
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Invalid playbook selection.")
+
+    def validate(self, value):
+        if self.required and not value:
+            raise forms.ValidationError("Select at least one playbook.")
+
+
+class PlaybookBulkForm(forms.Form):
+    ACTIONS = [
+        ("add_tags", "Add tags"),
+        ("remove_tags", "Remove tags"),
+        ("add_groups", "Share with groups"),
+        ("remove_groups", "Unshare from groups"),
+        ("make_public", "Make public"),
+        ("make_private", "Make private"),
+        ("delete", "Delete"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTIONS)
+    playbooks = IdListField()
+    tags = forms.ModelMultipleChoiceField(queryset=Tag.objects.only("id", "name").order_by("name"), required=False)
+    groups = forms.ModelMultipleChoiceField(queryset=Group.objects.only("id", "name").order_by("name"),
+                                            required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action", "")
+        for name in ("tags", "groups"):
+            if action.endswith(name) and not cleaned_data.get(name):
+                self.add_error(name, f"Select the {name} to {action.split('_')[0]}.")
+        return cleaned_data
+
+    def bulk_kwargs(self) -> dict:
+        """Keyword arguments of `bulk_update_playbooks` for the chosen action."""
+        action = self.cleaned_data["action"]
+        if action == "delete":
+            return {"delete": True}
+        if action in ("make_public", "make_private"):
+            return {"is_public": action == "make_public"}
+        related = "tags" if action.endswith("tags") else "groups"
+        return {action: [obj.pk for obj in self.cleaned_data[related]]}
+
+
+class PlaybookImportForm(forms.Form):
+    archive = forms.FileField(help_text="An NDJSON or tar.gz archive from the playbook export.")
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROW_VERSION_KEY = "playbooks:row-version"
+ROW_KEY = "playbooks:row:{pk}:{updated_at}:{version}"
+
+
+def get_row_version() -> int:
+    """
+        Version shared by all cached playbook rows.
+
+        Rows show tag and group names and counts, which change without touching
+        the playbook's `updated_at`; the signals in `modules.playbooks.signals`
+        bump this version whenever that happens.
+    """
+    version = cache.get(ROW_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(ROW_VERSION_KEY, version, None)
+        version = cache.get(ROW_VERSION_KEY, version)
+    return version
+
+
+def bump_row_version() -> None:
+    cache.set(ROW_VERSION_KEY, time.time_ns(), None)
+
+
+def row_cache_key(playbook, version: int) -> str:
+    updated_at = playbook.updated_at.timestamp() if playbook.updated_at else 0
+    return ROW_KEY.format(pk=playbook.pk, updated_at=updated_at, version=version)
+
+
+def row_cache_timeout() -> int:
+    """
+        Seconds a rendered row is kept; 0 when rows are not cached at all.
+
+        The row version lives in the cache, so without a cache shared by every
+        process (see `FRAGMENT_CACHE_TIMEOUT` in the settings) a bump would only
+        be seen by the process that made it.
+    """
+    return getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 3600)
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from modules.playbooks.archive import CHUNK_SIZE, FORMATS, iter_archive
+from modules.playbooks.models import Playbook
+
+
+class Command(BaseCommand):
+    help = ("Stream every playbook, with its tags and groups, to an NDJSON file or a tar.gz of "
+            "YAML files that import_playbooks can load.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="ndjson", help="Archive format.")
+        parser.add_argument("--output", "-o", default="-", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Playbooks read per query.")
+
+    def handle(self, *args, **options):
+        chunks = iter_archive(Playbook.objects.all(), options["format"], chunk_size=options["chunk_size"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(options["output"], "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}."))
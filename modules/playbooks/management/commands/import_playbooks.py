@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.playbooks.archive import DEFAULT_BATCH_SIZE, ArchiveError, PlaybookImporter, read_archive
+
+
+class Command(BaseCommand):
+    help = ("Load an archive written by export_playbooks (NDJSON or tar.gz). Playbooks are matched "
+            "by name and content hash, so importing the same archive twice changes nothing.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archive to import.")
+        parser.add_argument("--user", help="Username recorded as author of created and updated playbooks.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Playbooks written per transaction.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get_by_natural_key(options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown user {options['user']!r}.")
+
+        def progress(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{stats['records']} records, {stats['created']} new playbooks...")
+
+        importer = PlaybookImporter(user=user, batch_size=options["batch_size"], progress=progress)
+        try:
+            with open(path, "rb") as stream:
+                stats = importer.run(read_archive(stream))
+        except ArchiveError as exc:
+            # Earlier batches are committed; importing the fixed archive again skips them as unchanged.
+            stats = importer.stats
+            raise CommandError(
+                f"{path}: {exc} Batches before the error were committed: {stats['created']} new playbooks, "
+                f"{stats['updated']} updated, {stats['unchanged']} unchanged."
+            ) from exc
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['records']} records: {stats['created']} new playbooks, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['tags']} new tags, {stats['groups']} new groups."
+        ))
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+FTS_TABLE = "playbooks_playbook_fts"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(name, description, content, tags, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(f"""
+        INSERT INTO {FTS_TABLE} (rowid, name, description, content, tags)
+        SELECT p.id, p.name, COALESCE(p.description, ''), COALESCE(p.content, ''),
+               COALESCE((SELECT group_concat(t.name, ' ')
+                           FROM playbooks_playbook_tags pt
+                           JOIN core_tag t ON t.id = pt.tag_id
+                          WHERE pt.playbook_id = p.id), '')
+          FROM playbooks_playbook p
+    """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('playbooks', '0002_playbook_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.conf import settings
+import hashlib
+import zlib
+
+from django.db import migrations, models
+
+
+def snapshot_existing_playbooks(apps, schema_editor):
+    Playbook = apps.get_model("playbooks", "Playbook")
+    ContentBlob = apps.get_model("playbooks", "ContentBlob")
+    PlaybookVersion = apps.get_model("playbooks", "PlaybookVersion")
+
+    for playbook in Playbook.objects.only("id", "content", "created_by_id").iterator(chunk_size=500):
+        content = (playbook.content or "").encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        if not ContentBlob.objects.filter(pk=digest).exists():
+            ContentBlob.objects.create(digest=digest, size=len(content), data=zlib.compress(content))
+        PlaybookVersion.objects.create(
+            playbook_id=playbook.id, number=1, blob_id=digest, size=len(content),
+            created_by_id=playbook.created_by_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playbooks', '0003_playbook_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('chain_depth', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deltas', to='playbooks.contentblob')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlaybookVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('number', models.PositiveIntegerField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='versions', to='playbooks.contentblob')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('playbook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='playbooks.playbook')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-number'],
+                'constraints': [models.UniqueConstraint(fields=('playbook', 'number'), name='unique_playbook_version_number')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_playbooks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_group_closure'),
+        ('playbooks', '0004_playbook_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playbook',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name'], name='playbook_alive_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playbook',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['is_public', 'name'], name='playbook_alive_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playbook',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='playbook_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playbooks', '0006_playbook_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaybookSearchDocument',
+            fields=[
+                ('playbook', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='playbooks.playbook')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('content', models.TextField()),
+                ('tags', models.TextField()),
+            ],
+            options={
+                'db_table': 'playbooks_playbook_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1 +1,4 @@
-from .playbook import Playbook
\ No newline at end of file
+from .playbook import Playbook
+from .content_blob import ContentBlob
+from .playbook_version import PlaybookVersion
+from .playbook_search_document import PlaybookSearchDocument
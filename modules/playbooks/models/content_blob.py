@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class ContentBlob(models.Model):
+    """
+        Immutable, content-addressed storage for playbook YAML.
+
+        `digest` is the SHA-256 of the full text, so identical content is only
+        ever stored once. `data` holds either the zlib-compressed text or, when
+        `base` is set, a compressed line delta against the base blob.
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveIntegerField()
+    data = models.BinaryField()
+    base = models.ForeignKey("self", null=True, blank=True, on_delete=models.PROTECT, related_name="deltas")
+    chain_depth = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def is_delta(self):
+        return self.base_id is not None
+
+    def __str__(self):
+        return self.digest[:12]
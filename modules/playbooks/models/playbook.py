@@ -1,11 +1,66 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 
-from modules.core.models import AuditFieldsMixin, Tag
+from modules.core.models import AuditFieldsMixin, SoftDeleteManager, SoftDeleteMixin, SoftDeleteQuerySet, Tag
 from modules.core.models import Group
 from modules.users.models import CustomUser
 
 
-class Playbook(AuditFieldsMixin):
+class PlaybookQuerySet(SoftDeleteQuerySet):
+    def visible_to(self, user: CustomUser):
+        """
+            Restrict the queryset to the playbooks `user` is allowed to see.
+
+            Private playbooks are matched with a correlated EXISTS over the
+            `visible_to` through table, so the result never needs DISTINCT
+            no matter how many of the user's groups a playbook is shared with.
+
+            Args:
+                user (CustomUser): The requesting user (may be anonymous).
+
+            Returns:
+                PlaybookQuerySet: Public playbooks plus the ones shared with the user.
+        """
+        group_ids = user.get_user_group_ids() if user.is_authenticated else None
+        if not group_ids:
+            return self.filter(is_public=True)
+
+        shared_with_user = self.model.visible_to.through.objects.filter(
+            playbook_id=OuterRef("pk"),
+            group_id__in=group_ids,
+        )
+        return self.filter(Q(is_public=True) | Exists(shared_with_user))
+
+    def for_list(self):
+        """
+            Load everything a playbook listing needs in a fixed number of queries.
+
+            Defers the (potentially large) YAML `content`, prefetches groups and
+            tags ordered by name and annotates `group_count`, so templates can
+            render groups, tags and the "+N more" pill without extra queries.
+
+            Returns:
+                PlaybookQuerySet: The queryset ready to be paginated and rendered.
+        """
+        group_count = (self.model.visible_to.through.objects
+                       .filter(playbook_id=OuterRef("pk"))
+                       .order_by()
+                       .values("playbook_id")
+                       .annotate(total=Count("*"))
+                       .values("total"))
+        return (self
+                .defer("content")
+                .annotate(group_count=Coalesce(Subquery(group_count), 0))
+                .prefetch_related(
+                    Prefetch("visible_to", queryset=Group.objects.only("id", "name").order_by("name")),
+                    Prefetch("tags", queryset=Tag.objects.only("id", "name").order_by("name")),
+                ))
+
+
+class Playbook(SoftDeleteMixin, AuditFieldsMixin):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     content = models.TextField(blank=True, null=True)
@@ -22,12 +77,60 @@ class Playbook(AuditFieldsMixin):
         blank=True,
     )
 
+    # Deleted playbooks are tombstones until `manage.py purge_deleted` removes them.
+    objects = SoftDeleteManager.from_queryset(PlaybookQuerySet)()
+    all_objects = PlaybookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], condition=Q(deleted_at__isnull=True), name="playbook_alive_name_idx"),
+            models.Index(fields=["is_public", "name"], condition=Q(deleted_at__isnull=True),
+                         name="playbook_alive_public_idx"),
+            # Cursor pagination of the JSON API (`modules.api`).
+            models.Index(fields=["updated_at", "id"], condition=Q(deleted_at__isnull=True),
+                         name="playbook_alive_updated_idx"),
+            models.Index(fields=["deleted_at"], condition=Q(deleted_at__isnull=False),
+                         name="playbook_deleted_at_idx"),
+        ]
+
+    GROUP_IDS_CACHE_KEY = "acl:playbook-group-ids:{pk}"
+
+    def get_group_ids(self) -> frozenset:
+        """
+            Return the ids of the groups this playbook is shared with.
+
+            Uses prefetched `visible_to` rows when available, otherwise the shared
+            cache (invalidated by the signals in `modules.playbooks.signals`).
+
+            Returns:
+                frozenset: The group ids.
+        """
+        if "visible_to" in getattr(self, "_prefetched_objects_cache", {}):
+            return frozenset(group.pk for group in self.visible_to.all())
+
+        timeout = getattr(settings, "ACL_CACHE_TIMEOUT", 300)
+        if not timeout:
+            return frozenset(self.visible_to.values_list("id", flat=True))
+        key = self.GROUP_IDS_CACHE_KEY.format(pk=self.pk)
+        group_ids = cache.get(key)
+        if group_ids is None:
+            group_ids = frozenset(self.visible_to.values_list("id", flat=True))
+            cache.set(key, group_ids, timeout)
+        return group_ids
+
+    @classmethod
+    def forget_group_ids(cls, *pks):
+        keys = [cls.GROUP_IDS_CACHE_KEY.format(pk=pk) for pk in pks]
+        cache.delete_many(keys)
+        # Again after commit: a concurrent request may have re-cached the old sharing meanwhile.
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
     def is_visible_to(self, user: CustomUser):
         if self.is_public:
             return True
         if not user.is_authenticated:
             return False
-        return self.visible_to.filter(id__in=user.get_user_group_ids()).exists()
+        return not self.get_group_ids().isdisjoint(user.get_user_group_ids())
 
     def __str__(self):
         return self.name
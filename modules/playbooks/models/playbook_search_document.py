@@ -0,0 +1,23 @@
+from django.db import models
+
+from .playbook import Playbook
+
+
+class PlaybookSearchDocument(models.Model):
+    """
+        A row of the FTS5 table created by migration `0003_playbook_search_index`.
+
+        Only exists on SQLite and is written with raw SQL by
+        `modules.playbooks.search.SQLiteFTS5Backend`; the model lets searches join
+        the table by rowid through the ORM.
+    """
+    playbook = models.OneToOneField(Playbook, primary_key=True, db_column="rowid", on_delete=models.DO_NOTHING,
+                                    related_name="search_document")
+    name = models.TextField()
+    description = models.TextField()
+    content = models.TextField()
+    tags = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = "playbooks_playbook_fts"
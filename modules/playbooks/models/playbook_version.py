@@ -0,0 +1,21 @@
+from django.db import models
+
+from modules.core.models import AuditFieldsMixin
+from .content_blob import ContentBlob
+from .playbook import Playbook
+
+
+class PlaybookVersion(AuditFieldsMixin):
+    playbook = models.ForeignKey(Playbook, on_delete=models.CASCADE, related_name="versions")
+    number = models.PositiveIntegerField()
+    blob = models.ForeignKey(ContentBlob, on_delete=models.PROTECT, related_name="versions")
+    size = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-number"]
+        constraints = [
+            models.UniqueConstraint(fields=["playbook", "number"], name="unique_playbook_version_number")
+        ]
+
+    def __str__(self):
+        return f"{self.playbook_id} v{self.number}"
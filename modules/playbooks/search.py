@@ -0,0 +1,153 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchBackend:
+    """
+        Base class for playbook full-text search backends.
+
+        Backends keep their index in sync through `index()` / `remove()` (called
+        from the signals in `modules.playbooks.signals`) and answer queries by
+        filtering and annotating an existing queryset, so visibility rules are
+        applied by the caller exactly like on the unfiltered list.
+    """
+
+    def index(self, playbook_ids):
+        pass
+
+    def remove(self, playbook_ids):
+        pass
+
+    def rebuild(self, batch_size: int = 1000):
+        return 0
+
+    def search(self, queryset, query: str):
+        """
+            Restrict `queryset` to the playbooks matching `query`, best matches first.
+
+            The returned queryset is annotated with `search_rank` (lower is better)
+            and `search_snippet` (text with matches wrapped in `SNIPPET_START` /
+            `SNIPPET_END`).
+        """
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Fallback for databases without a full-text engine: unranked `icontains`."""
+
+    def search(self, queryset, query):
+        terms = _TERM_RE.findall(query)
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term)
+                | Q(description__icontains=term)
+                | Q(content__icontains=term)
+                | Q(tags__name__icontains=term)
+            ).distinct()
+        return queryset.annotate(search_rank=Value(0.0), search_snippet=F("description"))
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+        Full-text search on an FTS5 virtual table keyed by playbook id.
+
+        The table is created by migration `0003_playbook_search_index` and
+        mapped by the unmanaged `PlaybookSearchDocument`. Matches are ranked
+        with bm25, weighting name over tags over description over the YAML
+        content.
+    """
+    table = "playbooks_playbook_fts"
+    weights = (10.0, 4.0, 1.0, 6.0)
+
+    def _select_documents(self, where: str = "") -> str:
+        return f"""
+            SELECT p.id, p.name, COALESCE(p.description, ''), COALESCE(p.content, ''),
+                   COALESCE((SELECT group_concat(t.name, ' ')
+                               FROM playbooks_playbook_tags pt
+                               JOIN core_tag t ON t.id = pt.tag_id
+                              WHERE pt.playbook_id = p.id), '')
+              FROM playbooks_playbook p
+             {where}
+        """
+
+    def index(self, playbook_ids):
+        playbook_ids = list(playbook_ids)
+        if not playbook_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(playbook_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", playbook_ids)
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, name, description, content, tags) "
+                + self._select_documents(f"WHERE p.id IN ({placeholders}) AND p.deleted_at IS NULL"),
+                playbook_ids,
+            )
+
+    def remove(self, playbook_ids):
+        playbook_ids = list(playbook_ids)
+        if not playbook_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(playbook_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", playbook_ids)
+
+    def rebuild(self, batch_size: int = 1000):
+        indexed = 0
+        last_id = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            while True:
+                cursor.execute(
+                    "SELECT id FROM playbooks_playbook WHERE id > %s AND deleted_at IS NULL ORDER BY id LIMIT %s",
+                    [last_id, batch_size],
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                self.index(ids)
+                indexed += len(ids)
+                last_id = ids[-1]
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return indexed
+
+    @staticmethod
+    def to_match_expression(query: str) -> str:
+        """Turn free text into an FTS5 query: every term must match, as a prefix."""
+        return " ".join(f'"{term}"*' for term in _TERM_RE.findall(query))
+
+    def search(self, queryset, query):
+        match = self.to_match_expression(query)
+        if not match:
+            return queryset.none()
+
+        # One join with the FTS table: MATCH runs once and bm25()/snippet() read the
+        # matched row, instead of a correlated subquery per result for each of them.
+        return (queryset
+                .filter(search_document__isnull=False)
+                .filter(RawSQL(f"{self.table} MATCH %s", [match], output_field=BooleanField()))
+                .annotate(
+                    search_rank=RawSQL(f"bm25({self.table}, %s, %s, %s, %s)", self.weights,
+                                       output_field=FloatField()),
+                    search_snippet=RawSQL(f"snippet({self.table}, -1, %s, %s, '…', 12)",
+                                          [SNIPPET_START, SNIPPET_END], output_field=TextField()),
+                )
+                .order_by("search_rank", "name"))
+
+
+def get_search_backend() -> SearchBackend:
+    backend_path = getattr(settings, "PLAYBOOK_SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTS5Backend()
+    return SimpleSearchBackend()
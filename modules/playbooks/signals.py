@@ -0,0 +1,100 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from modules.core.models import Group, Tag
+from modules.playbooks.fragments import bump_row_version
+from modules.playbooks.models import Playbook
+from modules.playbooks.search import get_search_backend
+from modules.playbooks.versioning import record_version
+
+
+@receiver(post_save, sender=Playbook)
+@receiver(post_delete, sender=Playbook)
+def invalidate_playbook_groups(sender, instance, **kwargs):
+    Playbook.forget_group_ids(instance.pk)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_playbooks(sender, instance, **kwargs):
+    Playbook.forget_group_ids(*instance.playbooks.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Playbook.visible_to.through)
+def invalidate_shared_playbooks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"pre_clear", "post_add", "post_remove", "post_clear"}:
+        return
+
+    if not reverse:
+        Playbook.forget_group_ids(instance.pk)
+    elif action == "pre_clear":
+        # `group.playbooks.clear()`: the instance is the group.
+        Playbook.forget_group_ids(*instance.playbooks.values_list("id", flat=True))
+    elif pk_set:
+        Playbook.forget_group_ids(*pk_set)
+
+
+@receiver(post_save, sender=Playbook)
+def index_playbook(sender, instance, **kwargs):
+    get_search_backend().index([instance.pk])
+
+
+@receiver(post_delete, sender=Playbook)
+def unindex_playbook(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(m2m_changed, sender=Playbook.tags.through)
+def reindex_tagged_playbooks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "pre_clear", "post_clear"}:
+        return
+
+    if not reverse:
+        if action != "pre_clear":
+            get_search_backend().index([instance.pk])
+    elif action == "pre_clear":
+        # `tag.playbook_tags.clear()`: remember who loses the tag.
+        instance._search_reindex_ids = list(instance.playbook_tags.values_list("id", flat=True))
+    elif action == "post_clear":
+        get_search_backend().index(getattr(instance, "_search_reindex_ids", []))
+    else:
+        get_search_backend().index(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, **kwargs):
+    if not created:
+        get_search_backend().index(instance.playbook_tags.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_playbooks(sender, instance, **kwargs):
+    instance._search_reindex_ids = list(instance.playbook_tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_untagged_playbooks(sender, instance, **kwargs):
+    get_search_backend().index(getattr(instance, "_search_reindex_ids", []))
+
+
+@receiver(post_save, sender=Playbook)
+def record_playbook_version(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and "content" not in update_fields):
+        return
+    record_version(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_playbook_rows(sender, **kwargs):
+    # Cached list rows show tag and group names; `updated_at` of the playbooks does not move.
+    bump_row_version()
+
+
+@receiver(m2m_changed, sender=Playbook.tags.through)
+@receiver(m2m_changed, sender=Playbook.visible_to.through)
+def invalidate_relinked_playbook_rows(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        bump_row_version()
+
@@ -0,0 +1,63 @@
+from django import template
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from modules.playbooks.fragments import get_row_version, row_cache_key, row_cache_timeout
+
+register = template.Library()
+
+# Stands in for the per-session CSRF token while a row is rendered for the shared cache.
+CSRF_PLACEHOLDER = "\x00csrf-token\x00"
+
+
+class PlaybookRowNode(template.Node):
+    def __init__(self, nodelist, playbook_expr):
+        self.nodelist = nodelist
+        self.playbook_expr = playbook_expr
+
+    def render(self, context):
+        playbook = self.playbook_expr.resolve(context)
+        if getattr(playbook, "search_snippet", None) is not None or not row_cache_timeout():
+            # Search results carry a per-query snippet; they are not worth caching.
+            return self.nodelist.render(context)
+
+        version = context.render_context.get(self)
+        if version is None:
+            version = context.render_context[self] = get_row_version()
+        key = row_cache_key(playbook, version)
+        html = cache.get(key)
+        if html is None:
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                html = self.nodelist.render(context)
+            cache.set(key, html, row_cache_timeout())
+        if CSRF_PLACEHOLDER in html:
+            html = html.replace(CSRF_PLACEHOLDER, str(context.get("csrf_token", "")))
+        return mark_safe(html)
+
+
+@register.tag(name="playbook_row")
+def do_playbook_row(parser, token):
+    """
+        Cache the enclosed markup of one playbook row.
+
+        Usage:
+            {% playbook_row playbook %} ... {% endplaybook_row %}
+
+        The fragment is keyed by the playbook id, its `updated_at` and the shared
+        row version (bumped on tag / group changes), so stale rows are never
+        served and nothing has to be deleted. `{% csrf_token %}` inside the block
+        is filled in per request. Rows are rendered uncached when
+        FRAGMENT_CACHE_TIMEOUT is 0.
+
+        Raises:
+            TemplateSyntaxError: If the playbook argument is missing.
+
+        Returns:
+            PlaybookRowNode: A Django template Node ready to render.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f'"{bits[0]}" takes exactly one argument: the playbook.')
+    nodelist = parser.parse(("endplaybook_row",))
+    parser.delete_first_token()
+    return PlaybookRowNode(nodelist, parser.compile_filter(bits[1]))
@@ -0,0 +1,20 @@
+from django import template
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from modules.playbooks.search import SNIPPET_END, SNIPPET_START
+
+register = template.Library()
+
+
+@register.filter
+def highlight_snippet(snippet):
+    """
+        Render a search snippet, turning the backend's match markers into <mark> tags.
+
+        The snippet text itself is escaped, so only the markers become HTML.
+    """
+    if not snippet:
+        return ""
+    escaped = str(conditional_escape(snippet))
+    return mark_safe(escaped.replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>"))
@@ -1,3 +1,515 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import tarfile
+import tempfile
+from datetime import timedelta
+from functools import partial
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from modules.audit.models import AuditEvent
+from modules.audit.signals import audit_buffer
+from modules.core.models import Group, GroupMember, Tag
+from modules.playbooks.archive import import_playbooks, iter_archive, read_archive
+from modules.playbooks.bulk import bulk_update_playbooks
+from modules.playbooks.models import ContentBlob, Playbook
+from modules.playbooks.search import get_search_backend
+from modules.playbooks.versioning import diff_versions, get_version_content, list_versions
+from modules.runs.models import Run, RunEvent
+from modules.users.models import CustomUser
+
+
+class PlaybookVisibilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        cls.other = CustomUser.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        cls.group_a = Group.objects.create(name="ops")
+        cls.group_b = Group.objects.create(name="dev")
+        GroupMember.objects.create(group=cls.group_a, user=cls.user)
+        GroupMember.objects.create(group=cls.group_b, user=cls.user)
+
+        cls.public = Playbook.objects.create(name="public", is_public=True)
+        cls.shared = Playbook.objects.create(name="shared", is_public=False)
+        cls.shared.visible_to.set([cls.group_a, cls.group_b])
+        cls.hidden = Playbook.objects.create(name="hidden", is_public=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_visible_to_returns_each_playbook_once(self):
+        names = list(Playbook.objects.visible_to(self.user).order_by("name").values_list("name", flat=True))
+        self.assertEqual(names, ["public", "shared"])
+
+    def test_visible_to_hides_private_playbooks_from_non_members(self):
+        names = list(Playbook.objects.visible_to(self.other).values_list("name", flat=True))
+        self.assertEqual(names, ["public"])
+
+    def test_for_list_annotates_group_count(self):
+        playbook = Playbook.objects.visible_to(self.user).for_list().get(pk=self.shared.pk)
+        self.assertEqual(playbook.group_count, 2)
+
+    def test_is_visible_to_follows_sharing_changes(self):
+        self.assertTrue(self.shared.is_visible_to(self.user))
+
+        self.shared.visible_to.clear()
+        user = CustomUser.objects.get(pk=self.user.pk)
+        self.assertFalse(Playbook.objects.get(pk=self.shared.pk).is_visible_to(user))
+
+        self.group_a.playbooks.add(self.shared)
+        self.assertTrue(Playbook.objects.get(pk=self.shared.pk).is_visible_to(user))
+
+    def test_update_view_rejects_hidden_playbook(self):
+        self.client.force_login(self.other)
+        response = self.client.get(reverse("playbook_update", args=[self.shared.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PlaybookListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        cls.groups = [Group.objects.create(name=f"group-{i}") for i in range(5)]
+        cls.tags = [Tag.objects.create(name=f"tag-{i}") for i in range(5)]
+        GroupMember.objects.create(group=cls.groups[0], user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def _create_playbooks(self, count):
+        for i in range(count):
+            playbook = Playbook.objects.create(name=f"playbook-{i:03}", is_public=bool(i % 2), content="- hosts: all")
+            playbook.visible_to.set(self.groups)
+            playbook.tags.set(self.tags)
+
+    def _count_list_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("playbook_list"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("playbook_list"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self._create_playbooks(2)
+        few = self._count_list_queries()
+        self._create_playbooks(18)
+        many = self._count_list_queries()
+        self.assertEqual(few, many)
+
+
+@override_settings(FRAGMENT_CACHE_TIMEOUT=3600)
+class PlaybookRowCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.tag = Tag.objects.create(name="web")
+        self.playbook = Playbook.objects.create(name="deploy")
+        self.playbook.tags.add(self.tag)
+        self.client.force_login(self.user)
+
+    def list_page(self):
+        return self.client.get(reverse("playbook_list")).content.decode()
+
+    def test_rows_are_served_from_cache_until_they_change(self):
+        self.assertIn("web", self.list_page())
+
+        # Bypasses signals: the cached row must still be served.
+        Tag.objects.filter(pk=self.tag.pk).update(name="backend")
+        self.assertIn("web", self.list_page())
+
+        self.tag.name = "frontend"
+        self.tag.save()
+        self.assertIn("frontend", self.list_page())
+
+        Playbook.objects.filter(pk=self.playbook.pk).update(name="renamed", updated_at=timezone.now())
+        self.assertIn("renamed", self.list_page())
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_rows_are_not_cached_without_a_shared_cache(self):
+        self.assertIn("web", self.list_page())
+        # Another process relinking tags could not bump this process's row version.
+        Tag.objects.filter(pk=self.tag.pk).update(name="backend")
+        self.assertIn("backend", self.list_page())
+
+    def test_cached_rows_carry_the_current_csrf_token(self):
+        self.list_page()
+        other = CustomUser.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        self.client.logout()
+        self.client.force_login(other)
+        response = self.client.get(reverse("playbook_list"))
+        html = response.content.decode()
+
+        self.assertNotIn("\x00", html)
+        self.assertIn(f'value="{response.context["csrf_token"]}"', html)
+
+
+class PlaybookSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        cls.group = Group.objects.create(name="ops")
+        cls.nginx = Playbook.objects.create(name="Install nginx", content="- hosts: web\n  tasks: []")
+        cls.private = Playbook.objects.create(name="Secret nginx", is_public=False)
+        cls.private.visible_to.set([cls.group])
+        cls.db = Playbook.objects.create(name="Database backup", description="Nightly dump of postgres")
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("playbook_list"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [playbook.name for playbook in response.context["playbooks"]]
+
+    def test_search_ranks_and_respects_visibility(self):
+        self.assertEqual(self.search("nginx"), ["Install nginx"])
+        GroupMember.objects.create(group=self.group, user=self.user)
+        self.assertEqual(sorted(self.search("nginx")), ["Install nginx", "Secret nginx"])
+
+    def test_search_matches_content_prefixes_and_tags(self):
+        self.assertEqual(self.search("post"), ["Database backup"])
+        self.assertEqual(self.search("web"), ["Install nginx"])
+
+        tag = Tag.objects.create(name="nightly-ops")
+        self.nginx.tags.add(tag)
+        self.assertIn("Install nginx", self.search("nightly"))
+
+        tag.delete()
+        self.assertEqual(self.search("nightly"), ["Database backup"])
+
+    def test_fts_table_is_joined_once(self):
+        Playbook.objects.create(name="Backup", content="- hosts: nginx")
+        results = get_search_backend().search(Playbook.objects.all(), "nginx")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([playbook.name for playbook in results][-1], "Backup")
+        self.assertEqual(queries.captured_queries[0]["sql"].count("MATCH"), 1)
+        self.assertLess(results[1].search_rank, results[2].search_rank)
+        self.assertIn("\x02nginx\x03", results[0].search_snippet)
+
+    def test_deleted_playbooks_leave_the_index(self):
+        self.db.delete()
+        self.assertEqual(self.search("postgres"), [])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        Playbook.objects.create(name="<script> nginx")
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("playbook_list"), {"q": "script"})
+        self.assertContains(response, "&lt;<mark>script</mark>&gt;")
+
+
+class PlaybookVersioningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.base = "".join(f"- name: task {i}\n  debug: msg={i}\n" for i in range(200))
+        self.playbook = Playbook.objects.create(name="big", content=self.base, created_by=self.user)
+
+    def edit(self, content):
+        self.playbook.content = content
+        self.playbook.save()
+
+    def test_saves_record_deduplicated_versions(self):
+        self.edit(self.base)
+        self.edit(self.base + "- name: extra\n")
+        self.edit(self.base)
+
+        versions = list(list_versions(self.playbook))
+        self.assertEqual([version.number for version in versions], [3, 2, 1])
+        self.assertEqual(versions[0].blob_id, versions[2].blob_id)
+        self.assertEqual(ContentBlob.objects.count(), 2)
+
+    def test_small_edits_are_stored_as_deltas(self):
+        self.edit(self.base.replace("task 100", "task one hundred"))
+        latest = list_versions(self.playbook).first()
+        blob = ContentBlob.objects.get(pk=latest.blob_id)
+
+        self.assertTrue(blob.is_delta)
+        self.assertLess(len(blob.data), 200)
+        self.assertEqual(get_version_content(latest), self.playbook.content)
+
+    def test_listing_history_does_not_load_blob_bodies(self):
+        self.edit(self.base + "- name: extra\n")
+        with CaptureQueriesContext(connection) as ctx:
+            list(list_versions(self.playbook))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("contentblob", ctx.captured_queries[0]["sql"])
+
+    def test_diff_and_restore(self):
+        self.edit(self.base + "- name: extra\n")
+        v1, v2 = sorted(list_versions(self.playbook), key=lambda version: version.number)
+        self.assertIn("+- name: extra", diff_versions(v1, v2))
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("playbook_versions", args=[self.playbook.pk])), "v2")
+        self.assertContains(self.client.get(reverse("playbook_version_diff", args=[self.playbook.pk])), "+- name: extra")
+
+        response = self.client.post(reverse("playbook_version_restore", args=[self.playbook.pk, 1]))
+        self.assertRedirects(response, reverse("playbook_versions", args=[self.playbook.pk]))
+
+        self.playbook.refresh_from_db()
+        self.assertEqual(self.playbook.content, self.base)
+        latest = list_versions(self.playbook).first()
+        self.assertEqual((latest.number, latest.blob_id, latest.created_by_id), (3, v1.blob_id, self.user.pk))
+
+
+class PlaybookSoftDeleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.playbook = Playbook.objects.create(name="Rotate logs", content="- hosts: all")
+        self.client.force_login(self.user)
+
+    def test_delete_view_only_marks_the_playbook(self):
+        response = self.client.post(reverse("playbook_delete", args=[self.playbook.pk]))
+        self.assertRedirects(response, reverse("playbook_list"))
+
+        self.assertFalse(Playbook.objects.filter(pk=self.playbook.pk).exists())
+        tombstone = Playbook.all_objects.get(pk=self.playbook.pk)
+        self.assertEqual(tombstone.deleted_by, self.user)
+        self.assertTrue(tombstone.versions.exists())
+        self.assertNotContains(self.client.get(reverse("playbook_list"), {"q": "rotate"}), "Rotate logs")
+
+        tombstone.restore()
+        self.assertContains(self.client.get(reverse("playbook_list"), {"q": "rotate"}), "Rotate logs")
+
+    def test_purge_removes_only_expired_tombstones(self):
+        recent = Playbook.objects.create(name="recent")
+        Playbook.objects.filter(pk__in=[self.playbook.pk, recent.pk]).soft_delete(user=self.user)
+        Playbook.all_objects.filter(pk=self.playbook.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+
+        call_command("purge_deleted", days=30, batch_size=1, sleep=0, stdout=StringIO())
+
+        self.assertEqual(list(Playbook.all_objects.values_list("name", flat=True)), ["recent"])
+
+    def test_purge_deletes_dependents_in_bounded_batches(self):
+        self.playbook.content = "- hosts: all\n  tasks: []"
+        self.playbook.save()
+        runs = [Run.objects.create(playbook=self.playbook) for _ in range(3)]
+        RunEvent.objects.bulk_create(RunEvent(run=run, seq=seq, host="web", task_uuid="t", task="ping",
+                                              status="ok") for run in runs for seq in range(5))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        Playbook.objects.filter(pk=self.playbook.pk).soft_delete(user=self.user)
+        Playbook.all_objects.filter(pk=self.playbook.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+
+        with self.settings(RUNS_WORKSPACE_ROOT=Path(tmp.name)):
+            for run in runs:
+                run.log_dir.mkdir(parents=True)
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                call_command("purge_deleted", days=30, batch_size=2, sleep=0, stdout=StringIO())
+
+        self.assertFalse(Playbook.all_objects.exists())
+        self.assertFalse(Run.objects.exists() or RunEvent.objects.exists() or ContentBlob.objects.exists())
+        self.assertEqual(list(Path(tmp.name).iterdir()), [])
+        event_deletes = [query["sql"] for query in queries.captured_queries
+                         if query["sql"].startswith('DELETE FROM "runs_runevent"')]
+        self.assertGreaterEqual(len(event_deletes), 8)
+
+
+class PlaybookBulkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        audit_buffer.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.group, self.other_group = Group.objects.create(name="ops"), Group.objects.create(name="dev")
+        GroupMember.objects.create(group=self.group, user=self.user)
+        self.web, self.db = Tag.objects.create(name="web"), Tag.objects.create(name="db")
+        self.playbooks = [Playbook.objects.create(name=f"bulk-{i}", content="- hosts: all") for i in range(30)]
+        self.ids = [playbook.pk for playbook in self.playbooks]
+        self.playbooks[0].tags.add(self.web)
+
+    def test_query_count_does_not_grow_with_the_selection(self):
+        self.user.get_user_group_ids()
+        with CaptureQueriesContext(connection) as few:
+            bulk_update_playbooks(self.user, self.ids[:3], add_tags=[self.web.pk, self.db.pk])
+        with CaptureQueriesContext(connection) as many:
+            bulk_update_playbooks(self.user, self.ids, add_tags=[self.web.pk, self.db.pk])
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(self.web.playbook_tags.count(), 30)
+        self.assertEqual(self.db.playbook_tags.count(), 30)
+
+    def test_add_and_remove_only_write_the_difference(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_update_playbooks(self.user, self.ids[:2], add_tags=[self.web.pk])
+        self.assertEqual((result.playbooks, result.linked), (2, 1))
+
+        self.playbooks[1].refresh_from_db()
+        self.playbooks[2].refresh_from_db()
+        self.assertEqual(self.playbooks[1].updated_by, self.user)
+        self.assertIsNone(self.playbooks[2].updated_by)
+        self.assertEqual(AuditEvent.objects.count(), 0)
+        audit_buffer.flush()
+        self.assertEqual(AuditEvent.objects.get(action=AuditEvent.Action.M2M).changes,
+                         {"playbook_tags": {"add": [self.ids[1]]}})
+
+        result = bulk_update_playbooks(self.user, self.ids, remove_tags=[self.web.pk])
+        self.assertEqual(result.unlinked, 2)
+        self.assertFalse(self.web.playbook_tags.exists())
+
+    def test_sharing_and_visibility(self):
+        bulk_update_playbooks(self.user, self.ids[:5], add_groups=[self.group.pk], is_public=False)
+        self.assertEqual(Playbook.objects.filter(is_public=False).count(), 5)
+        self.assertTrue(Playbook.objects.get(pk=self.ids[0]).is_visible_to(self.user))
+
+        with self.assertRaises(ValidationError):
+            bulk_update_playbooks(self.user, self.ids[:5], remove_groups=[self.group.pk])
+        self.assertEqual(self.group.playbooks.count(), 5)
+
+        stranger = CustomUser.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        with self.assertRaises(PermissionDenied):
+            bulk_update_playbooks(stranger, self.ids[:6], add_tags=[self.db.pk])
+        self.assertFalse(self.db.playbook_tags.exists())
+
+    def test_bulk_view_deletes_the_selection(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("playbook_bulk"), {"action": "delete", "playbooks": self.ids[:10]})
+        self.assertRedirects(response, reverse("playbook_list"))
+        self.assertEqual(Playbook.objects.count(), 20)
+        self.assertEqual(Playbook.all_objects.filter(deleted_by=self.user).count(), 10)
+
+        response = self.client.post(reverse("playbook_bulk"), {"action": "add_tags", "playbooks": self.ids[10:]})
+        self.assertRedirects(response, reverse("playbook_list"))
+        self.assertEqual(self.db.playbook_tags.count(), 0)
+
+
+class PlaybookArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.group = Group.objects.create(name="ops")
+        GroupMember.objects.create(group=self.group, user=self.user)
+        self.tag = Tag.objects.create(name="web")
+        for i in range(5):
+            playbook = Playbook.objects.create(name=f"deploy-{i}", description=f"step {i}",
+                                               content=f"- hosts: web{i}\n", is_public=bool(i % 2))
+            playbook.tags.add(self.tag)
+            playbook.visible_to.add(self.group)
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def export(self, archive_format):
+        path = self.tmp / f"export.{archive_format}"
+        call_command("export_playbooks", format=archive_format, output=str(path), chunk_size=2, stderr=StringIO())
+        return path
+
+    def reimport(self, path):
+        out = StringIO()
+        call_command("import_playbooks", str(path), user="alice", batch_size=2, stdout=out)
+        return out.getvalue()
+
+    def test_round_trip_is_idempotent(self):
+        for archive_format in ("ndjson", "tar"):
+            path = self.export(archive_format)
+            self.assertIn("0 new playbooks, 0 updated, 5 unchanged", self.reimport(path))
+
+            Playbook.all_objects.all().delete()
+            Tag.objects.all().delete()
+            self.assertIn("5 new playbooks", self.reimport(path))
+            playbook = Playbook.objects.get(name="deploy-2")
+            self.assertEqual((playbook.content, playbook.is_public, playbook.created_by),
+                             ("- hosts: web2\n", False, self.user))
+            self.assertEqual([tag.name for tag in playbook.tags.all()], ["web"])
+            self.assertEqual(list(playbook.visible_to.all()), [self.group])
+            self.assertEqual(len(list_versions(playbook)), 1)
+            self.assertIn("deploy-2", [p.name for p in get_search_backend().search(Playbook.objects.all(), "web2")])
+
+    def test_imported_unknown_groups_grant_visibility(self):
+        path = self.export("ndjson")
+        Playbook.all_objects.all().delete()
+        Group.objects.all().delete()
+        self.reimport(path)
+
+        bob = CustomUser.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        GroupMember.objects.create(group=Group.objects.get(name="ops"), user=bob)
+        self.assertEqual(sorted(Playbook.objects.visible_to(bob).values_list("name", flat=True)),
+                         [f"deploy-{i}" for i in range(5)])
+
+    def test_changed_content_updates_and_versions(self):
+        path = self.export("ndjson")
+        playbook = Playbook.objects.get(name="deploy-0")
+        playbook.content = "- hosts: old\n"
+        playbook.save()
+        self.assertIn("1 updated, 4 unchanged", self.reimport(path))
+        playbook = Playbook.objects.get(name="deploy-0")
+        self.assertEqual(playbook.content, "- hosts: web0\n")
+        self.assertEqual(playbook.updated_by, self.user)
+        self.assertEqual([(v.number, v.created_by) for v in list_versions(playbook)][0], (3, self.user))
+
+    def test_tar_layout(self):
+        with tarfile.open(self.export("tar"), "r:gz") as tar:
+            names = tar.getnames()
+            manifest = [json.loads(line) for line in tar.extractfile("manifest.ndjson")]
+        self.assertEqual(names[0], "manifest.ndjson")
+        self.assertEqual(names[1:], [entry["file"] for entry in manifest])
+        self.assertTrue(all(name.endswith(".yml") for name in names[1:]))
+
+    def test_invalid_archives_are_rejected(self):
+        path = self.tmp / "broken.ndjson"
+        path.write_text('{"name": "ok"}\nnot json\n')
+        with self.assertRaises(CommandError):
+            self.reimport(path)
+        path.write_bytes(gzip.compress(b"not a tar"))
+        with self.assertRaises(CommandError):
+            self.reimport(path)
+
+    def test_failed_upload_imports_nothing_and_cli_reports_committed_batches(self):
+        upload = io.BytesIO(b'{"name": "new-1"}\n{"name": "new-2"}\n{"name": "new-3"}\nnot json\n')
+        upload.name = "broken.ndjson"
+        self.client.force_login(self.user)
+        with mock.patch("modules.playbooks.views.import_playbooks", partial(import_playbooks, batch_size=1)):
+            response = self.client.post(reverse("playbook_import"), {"archive": upload}, follow=True)
+        self.assertContains(response, "nothing was imported")
+        self.assertFalse(Playbook.objects.filter(name__startswith="new-").exists())
+
+        path = self.tmp / "broken.ndjson"
+        path.write_bytes(upload.getvalue())
+        with self.assertRaisesMessage(CommandError, "committed: 2 new playbooks, 0 updated, 0 unchanged"):
+            self.reimport(path)
+        self.assertEqual(Playbook.objects.filter(name__startswith="new-").count(), 2)
+
+    def test_upload_only_creates_tags_and_groups_the_user_may_create(self):
+        upload = io.BytesIO(b'{"name": "new", "tags": ["web", "fresh"], "groups": ["ops", "other"]}\n')
+        upload.name = "one.ndjson"
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("playbook_import"), {"archive": upload}, follow=True)
+        self.assertContains(response, "Skipped 1 tag and 1 group links")
+        playbook = Playbook.objects.get(name="new")
+        self.assertEqual([tag.name for tag in playbook.tags.all()], ["web"])
+        self.assertEqual([group.name for group in playbook.visible_to.all()], ["ops"])
+        self.assertFalse(Tag.objects.filter(name="fresh").exists() or Group.objects.filter(name="other").exists())
+
+        self.user.user_permissions.add(*Permission.objects.filter(codename__in=["add_tag", "add_group"]))
+        self.user = CustomUser.objects.get(pk=self.user.pk)
+        self.client.force_login(self.user)
+        upload.seek(0)
+        response = self.client.post(reverse("playbook_import"), {"archive": upload}, follow=True)
+        self.assertNotContains(response, "Skipped")
+        self.assertEqual(sorted(playbook.tags.values_list("name", flat=True)), ["fresh", "web"])
+        self.assertEqual(sorted(playbook.visible_to.values_list("name", flat=True)), ["ops", "other"])
+
+    def test_download_and_upload(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("playbook_export"), {"format": "tar"})
+        self.assertIn("attachment", response["Content-Disposition"])
+        body = b"".join(response.streaming_content)
+        self.assertEqual(len(list(read_archive(io.BytesIO(body)))), 5)
+
+        upload = io.BytesIO(b"".join(iter_archive(Playbook.objects.filter(name="deploy-1"))))
+        upload.name = "one.ndjson"
+        Playbook.objects.filter(name="deploy-1").update(description="edited")
+        response = self.client.post(reverse("playbook_import"), {"archive": upload})
+        self.assertRedirects(response, reverse("playbook_list"))
+        self.assertEqual(Playbook.objects.get(name="deploy-1").description, "step 1")
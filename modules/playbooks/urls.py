@@ -1,10 +1,19 @@
 from django.urls import path
 
-from modules.playbooks.views import playbook_list_view, playbook_update_view, playbook_create_view, playbook_delete_view
+from modules.playbooks.views import playbook_list_view, playbook_update_view, playbook_create_view, playbook_delete_view, \
+    playbook_bulk_view, playbook_export_view, playbook_import_view, playbook_version_list_view, \
+    playbook_version_diff_view, playbook_version_restore_view
 
 urlpatterns = [
     path("", playbook_list_view, name="playbook_list"),
     path("create/", playbook_create_view, name="playbook_create"),
     path("update/<int:playbook_id>", playbook_update_view, name="playbook_update"),
     path("delete/<int:playbook_id>", playbook_delete_view, name="playbook_delete"),
+    path("bulk/", playbook_bulk_view, name="playbook_bulk"),
+    path("export/", playbook_export_view, name="playbook_export"),
+    path("import/", playbook_import_view, name="playbook_import"),
+    path("versions/<int:playbook_id>", playbook_version_list_view, name="playbook_versions"),
+    path("versions/<int:playbook_id>/diff", playbook_version_diff_view, name="playbook_version_diff"),
+    path("versions/<int:playbook_id>/restore/<int:version_number>", playbook_version_restore_view,
+         name="playbook_version_restore"),
 ]
\ No newline at end of file
@@ -0,0 +1,217 @@
+import difflib
+import hashlib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from modules.playbooks.models import ContentBlob, Playbook, PlaybookVersion
+
+MAX_DELTA_CHAIN = 16
+
+
+def content_digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _encode_delta(base_lines: list, lines: list) -> bytes:
+    """
+        Encode `lines` as copy/insert operations against `base_lines`.
+
+        `["c", i1, i2]` copies `base_lines[i1:i2]`, `["i", [...]]` inserts new lines.
+    """
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", lines[j1:j2]])
+    return json.dumps(ops, separators=(",", ":")).encode("utf-8")
+
+
+def _apply_delta(base_lines: list, delta: bytes) -> list:
+    lines = []
+    for op in json.loads(delta):
+        if op[0] == "c":
+            lines.extend(base_lines[op[1]:op[2]])
+        else:
+            lines.extend(op[1])
+    return lines
+
+
+def read_blob(blob: ContentBlob) -> str:
+    """
+        Return the full text stored in a blob, resolving its delta chain.
+
+        Args:
+            blob (ContentBlob): The blob to read.
+
+        Returns:
+            str: The content.
+    """
+    chain = [blob]
+    while chain[-1].base_id:
+        chain.append(ContentBlob.objects.get(pk=chain[-1].base_id))
+
+    lines = zlib.decompress(chain.pop().data).decode("utf-8").splitlines(keepends=True)
+    while chain:
+        lines = _apply_delta(lines, zlib.decompress(chain.pop().data))
+    return "".join(lines)
+
+
+def store_blob(content: str, base: ContentBlob = None) -> ContentBlob:
+    """
+        Store `content` once, keyed by its SHA-256.
+
+        When delta storage is enabled and `base` is given, the content is stored
+        as a delta against it if that is smaller than a full compressed copy and
+        the chain stays shorter than `MAX_DELTA_CHAIN`.
+
+        Args:
+            content (str): The full text.
+            base (ContentBlob, optional): Blob of the previous version.
+
+        Returns:
+            ContentBlob: The new or already existing blob.
+    """
+    digest = content_digest(content)
+    existing = ContentBlob.objects.filter(pk=digest).defer("data").first()
+    if existing:
+        return existing
+
+    data = zlib.compress(content.encode("utf-8"))
+    chain_depth = 0
+    use_delta = (getattr(settings, "PLAYBOOK_VERSION_DELTAS", True)
+                 and base is not None
+                 and base.chain_depth + 1 < MAX_DELTA_CHAIN)
+    if use_delta:
+        delta = zlib.compress(_encode_delta(
+            read_blob(base).splitlines(keepends=True), content.splitlines(keepends=True)
+        ))
+        if len(delta) < len(data):
+            data, chain_depth = delta, base.chain_depth + 1
+        else:
+            base = None
+    else:
+        base = None
+
+    blob = ContentBlob(digest=digest, size=len(content.encode("utf-8")), data=data, base=base,
+                       chain_depth=chain_depth)
+    try:
+        with transaction.atomic():
+            blob.save(force_insert=True)
+    except IntegrityError:
+        # Another writer stored the same content meanwhile.
+        return ContentBlob.objects.defer("data").get(pk=digest)
+    return blob
+
+
+def purge_orphaned_blobs(batch_size: int = 500) -> int:
+    """
+        Delete the blobs no version and no delta refers to, `batch_size` per transaction.
+
+        Removing a delta can orphan its base, so this repeats until a pass finds
+        nothing. The reference check is repeated in the `DELETE` itself so a blob
+        that `store_blob` handed out meanwhile is kept.
+
+        Args:
+            batch_size (int, optional): Blobs deleted per transaction.
+
+        Returns:
+            int: The number of deleted blobs.
+    """
+    orphans = ContentBlob.objects.filter(versions__isnull=True, deltas__isnull=True)
+    purged = 0
+    while digests := list(orphans.order_by("pk").values_list("pk", flat=True)[:batch_size]):
+        with transaction.atomic():
+            deleted, _ = orphans.filter(pk__in=digests).delete()
+        if not deleted:
+            break
+        purged += deleted
+    return purged
+
+
+def record_version(playbook: Playbook):
+    """
+        Snapshot the playbook's current content as a new version.
+
+        Nothing is recorded when the content equals the latest version. The
+        author is the playbook's `updated_by` (or `created_by` for the first one).
+
+        Args:
+            playbook (Playbook): The saved playbook.
+
+        Returns:
+            PlaybookVersion or None: The new version, if one was created.
+    """
+    content = playbook.content or ""
+    digest = content_digest(content)
+    latest = (PlaybookVersion.objects
+              .filter(playbook_id=playbook.pk)
+              .select_related("blob")
+              .defer("blob__data")
+              .first())
+    if latest and latest.blob_id == digest:
+        return None
+
+    with transaction.atomic():
+        blob = store_blob(content, base=latest.blob if latest else None)
+        number = (PlaybookVersion.objects
+                  .filter(playbook_id=playbook.pk)
+                  .aggregate(last=Max("number"))["last"] or 0) + 1
+        return PlaybookVersion.objects.create(
+            playbook_id=playbook.pk, number=number, blob=blob, size=blob.size,
+            created_by_id=playbook.updated_by_id or playbook.created_by_id,
+        )
+
+
+def list_versions(playbook: Playbook):
+    """Return the playbook's versions, newest first, without loading any blob body."""
+    return (PlaybookVersion.objects
+            .filter(playbook_id=playbook.pk)
+            .select_related("created_by")
+            .only("id", "playbook_id", "number", "blob_id", "size", "created_at",
+                  "created_by__id", "created_by__username"))
+
+
+def get_version_content(version: PlaybookVersion) -> str:
+    return read_blob(ContentBlob.objects.get(pk=version.blob_id))
+
+
+def diff_versions(old: PlaybookVersion, new: PlaybookVersion, context: int = 3) -> str:
+    """
+        Return a unified diff between two versions.
+
+        Args:
+            old (PlaybookVersion): The version to diff from.
+            new (PlaybookVersion): The version to diff to.
+            context (int, optional): Lines of context around each change.
+
+        Returns:
+            str: The diff (empty when both versions have the same content).
+    """
+    if old.blob_id == new.blob_id:
+        return ""
+    return "".join(difflib.unified_diff(
+        get_version_content(old).splitlines(keepends=True),
+        get_version_content(new).splitlines(keepends=True),
+        fromfile=f"v{old.number}",
+        tofile=f"v{new.number}",
+        n=context,
+    ))
+
+
+def restore_version(playbook: Playbook, version: PlaybookVersion, user=None) -> Playbook:
+    """
+        Make `version` the playbook's current content.
+
+        Restoring is itself recorded as a new version, so history stays linear;
+        the blob is shared with the restored version.
+    """
+    playbook.content = get_version_content(version)
+    playbook.updated_by = user
+    playbook.save(update_fields=["content", "updated_by", "updated_at"])
+    return playbook
@@ -1,14 +1,23 @@
 from django.contrib import messages
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import PermissionDenied
-from django.db.models import Q
-from django.shortcuts import redirect
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.utils import timezone
+from django.views import View
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
 
-from modules.playbooks.forms import PlaybookForm
+from modules.core.models import Group, Tag
+from modules.playbooks.archive import CONTENT_TYPES, EXTENSIONS, FORMATS, ArchiveError, import_playbooks, \
+    iter_archive, read_archive
+from modules.playbooks.bulk import bulk_update_playbooks
+from modules.playbooks.forms import PlaybookBulkForm, PlaybookForm, PlaybookImportForm
 from modules.playbooks.models.playbook import Playbook
+from modules.playbooks.search import get_search_backend
+from modules.playbooks.versioning import diff_versions, list_versions, restore_version
 
 PAGINATE_BY = 20
 
@@ -21,13 +30,21 @@ class PlaybookListView(LoginRequiredMixin, ListView):
     login_url = "login"
     redirect_field_name = "next"
 
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
     def get_queryset(self):
-        user = self.request.user
-        user_groups_ids = user.get_user_group_ids()
-        return (Playbook.objects
-                .filter(Q(is_public=True) | Q(visible_to__in=user_groups_ids))
-                .distinct()
-                .order_by('name'))
+        queryset = Playbook.objects.visible_to(self.request.user).for_list()
+        query = self.get_search_query()
+        if query:
+            return get_search_backend().search(queryset, query)
+        return queryset.order_by('name')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["search_query"] = self.get_search_query()
+        context["bulk_form"] = PlaybookBulkForm()
+        return context
 
 playbook_list_view = PlaybookListView.as_view()
 
@@ -43,9 +60,7 @@ class PlaybookUpdateView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy("playbook_list")
 
     def get_queryset(self):
-        user = self.request.user
-        user_groups_ids = user.get_user_group_ids()
-        return Playbook.objects.filter(Q(is_public=True) | Q(visible_to__in=user_groups_ids)).distinct()
+        return Playbook.objects.visible_to(self.request.user)
 
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
@@ -53,6 +68,10 @@ class PlaybookUpdateView(LoginRequiredMixin, UpdateView):
             raise PermissionDenied("You do not have permission to view this playbook.")
         return obj
 
+    def form_valid(self, form):
+        form.instance.updated_by = self.request.user
+        return super().form_valid(form)
+
 playbook_update_view = PlaybookUpdateView.as_view()
 
 class PlaybookCreateView(LoginRequiredMixin, CreateView):
@@ -82,10 +101,13 @@ class PlaybookDeleteView(LoginRequiredMixin, DeleteView):
     redirect_field_name = "next"
     success_url = reverse_lazy("playbook_list")
 
+    def get_queryset(self):
+        return Playbook.objects.visible_to(self.request.user)
+
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
         name = self.object.name
-        self.object.delete()
+        self.object.soft_delete(user=request.user)
         messages.success(self.request, f'Playbook "{name}" was deleted successfully.')
         return redirect(self.get_success_url())
 
@@ -96,3 +118,144 @@ class PlaybookDeleteView(LoginRequiredMixin, DeleteView):
         return obj
 
 playbook_delete_view = PlaybookDeleteView.as_view()
+
+class PlaybookBulkView(LoginRequiredMixin, View):
+    http_method_names = ["post"]
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def post(self, request):
+        form = PlaybookBulkForm(request.POST)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                messages.error(request, errors[0])
+            return redirect("playbook_list")
+        try:
+            result = bulk_update_playbooks(request.user, form.cleaned_data["playbooks"], **form.bulk_kwargs())
+        except ValidationError as exc:
+            messages.error(request, exc.messages[0])
+            return redirect("playbook_list")
+        action = dict(PlaybookBulkForm.ACTIONS)[form.cleaned_data["action"]]
+        messages.success(request, f"{action}: applied to {result.playbooks} playbook(s).")
+        return redirect("playbook_list")
+
+playbook_bulk_view = PlaybookBulkView.as_view()
+
+class PlaybookExportView(LoginRequiredMixin, View):
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def get(self, request):
+        archive_format = request.GET.get("format", "ndjson")
+        if archive_format not in FORMATS:
+            raise Http404("Unknown archive format.")
+        response = StreamingHttpResponse(
+            iter_archive(Playbook.objects.visible_to(request.user), archive_format),
+            content_type=CONTENT_TYPES[archive_format],
+        )
+        filename = f"playbooks-{timezone.now():%Y%m%d-%H%M%S}.{EXTENSIONS[archive_format]}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+playbook_export_view = PlaybookExportView.as_view()
+
+class PlaybookImportView(LoginRequiredMixin, View):
+    http_method_names = ["post"]
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def post(self, request):
+        form = PlaybookImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            messages.error(request, "Choose an archive to import.")
+            return redirect("playbook_list")
+        # Tags and groups are only created for users who could create them in their own forms.
+        creatable = [model for model in (Tag, Group)
+                     if request.user.has_perm(f"{model._meta.app_label}.add_{model._meta.model_name}")]
+        try:
+            # All or nothing: a broken record late in the upload must not leave earlier batches behind.
+            with transaction.atomic():
+                # Only playbooks the user can see may be updated; other names are created anew.
+                stats = import_playbooks(read_archive(form.cleaned_data["archive"]), user=request.user,
+                                         queryset=Playbook.objects.visible_to(request.user), creatable=creatable)
+        except ArchiveError as exc:
+            messages.error(request, f"Import failed, nothing was imported: {exc}")
+            return redirect("playbook_list")
+        messages.success(request, f"Imported {stats['records']} playbooks: {stats['created']} new, "
+                                  f"{stats['updated']} updated, {stats['unchanged']} unchanged.")
+        if stats["skipped_tags"] or stats["skipped_groups"]:
+            messages.warning(request, f"Skipped {stats['skipped_tags']} tag and {stats['skipped_groups']} group "
+                                      "links to tags or groups that do not exist and that you may not create.")
+        return redirect("playbook_list")
+
+playbook_import_view = PlaybookImportView.as_view()
+
+class VisiblePlaybookMixin:
+    def get_playbook(self):
+        if not hasattr(self, "playbook"):
+            self.playbook = get_object_or_404(
+                Playbook.objects.visible_to(self.request.user).defer("content"),
+                pk=self.kwargs["playbook_id"],
+            )
+        return self.playbook
+
+class PlaybookVersionListView(LoginRequiredMixin, VisiblePlaybookMixin, ListView):
+    template_name = "playbooks/playbook_versions.html"
+    context_object_name = "versions"
+    paginate_by = PAGINATE_BY
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def get_queryset(self):
+        return list_versions(self.get_playbook())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["playbook"] = self.get_playbook()
+        return context
+
+playbook_version_list_view = PlaybookVersionListView.as_view()
+
+class PlaybookVersionDiffView(LoginRequiredMixin, VisiblePlaybookMixin, TemplateView):
+    template_name = "playbooks/playbook_version_diff.html"
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def get_version(self, versions, param, default=None):
+        try:
+            number = int(self.request.GET.get(param, default))
+        except (TypeError, ValueError):
+            raise Http404("Unknown version.")
+        return get_object_or_404(versions, number=number)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        versions = list_versions(self.get_playbook())
+        latest = versions.first()
+        if latest is None:
+            raise Http404("This playbook has no versions yet.")
+        new = self.get_version(versions, "b", latest.number)
+        old = self.get_version(versions, "a", max(1, new.number - 1))
+        context.update(playbook=self.playbook, old=old, new=new, diff=diff_versions(old, new))
+        return context
+
+playbook_version_diff_view = PlaybookVersionDiffView.as_view()
+
+class PlaybookVersionRestoreView(LoginRequiredMixin, VisiblePlaybookMixin, View):
+    http_method_names = ["post"]
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def post(self, request, playbook_id, version_number):
+        playbook = self.get_playbook()
+        version = get_object_or_404(list_versions(playbook), number=version_number)
+        restore_version(playbook, version, user=request.user)
+        messages.success(request, f'Playbook "{playbook.name}" was restored to version {version.number}.')
+        return redirect("playbook_versions", playbook_id=playbook.pk)
+
+playbook_version_restore_view = PlaybookVersionRestoreView.as_view()
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Run
+
+
+@admin.register(Run)
+class RunAdmin(admin.ModelAdmin):
+    list_display = ("id", "playbook", "status", "queued_at", "started_at", "finished_at", "return_code")
+    list_filter = ("status",)
+    list_select_related = ("playbook",)
+    readonly_fields = ("worker", "pid", "return_code", "claimed_at", "started_at", "finished_at",
+                       "host_count", "changed_host_count", "failed_host_count")
+
+    exclude = ("created_by", "updated_by", "deleted_by", "deleted_at")
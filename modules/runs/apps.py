@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class RunsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    label = 'runs'
+    name = 'modules.runs'
+
+    def ready(self):
+        from modules.runs import signals  # noqa: F401
@@ -0,0 +1,129 @@
+"""
+Ansible callback plugin shipped with Maestro.
+
+The run worker puts this directory on `ANSIBLE_CALLBACK_PLUGINS`, enables the
+plugin and passes the write end of a pipe in `MAESTRO_EVENTS_FD`. Every task
+start and every per-host task result is written to it as one JSON line, which
+`modules.runs.events.EventIngester` turns into rows and summary counters.
+
+This file runs inside `ansible-playbook`: it must not import Django or Maestro.
+"""
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+    name: maestro_events
+    type: notification
+    short_description: Streams structured task results to the Maestro run worker
+    description:
+      - Writes one JSON line per task start and per host result to the file
+        descriptor in MAESTRO_EVENTS_FD. Does nothing when it is not set.
+    requirements:
+      - Enabled by the Maestro run worker (ANSIBLE_CALLBACKS_ENABLED)
+"""
+
+EVENTS_FD_ENV = "MAESTRO_EVENTS_FD"
+FLUSH_INTERVAL = 0.5
+MAX_VALUE_CHARS = 2000
+MAX_RESULT_CHARS = 8000
+# What is left of a result that is still too large after values were truncated.
+SUMMARY_KEYS = ("msg", "rc", "stderr", "reason", "skip_reason", "failed_when_result")
+
+
+def _trim(value, limit: int = MAX_VALUE_CHARS):
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "... [truncated]"
+    if isinstance(value, dict):
+        return {str(key): _trim(item, limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_trim(item, limit) for item in value[:100]]
+        return items + ["... [truncated]"] if len(value) > 100 else items
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return _trim(str(value), limit)
+
+
+def trim_result(result: dict) -> dict:
+    """A JSON-safe, size-bounded copy of a module result, without Ansible's internal keys."""
+    kept = {key: value for key, value in result.items()
+            if not key.startswith("_ansible") and key not in ("invocation", "stdout_lines", "stderr_lines")}
+    trimmed = _trim(kept)
+    if len(json.dumps(trimmed, default=str)) > MAX_RESULT_CHARS:
+        trimmed = {key: _trim(kept[key], MAX_RESULT_CHARS // 4) for key in SUMMARY_KEYS if key in kept}
+        trimmed["truncated"] = True
+    return trimmed
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "notification"
+    CALLBACK_NAME = "maestro_events"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fd = os.environ.get(EVENTS_FD_ENV)
+        self.stream = os.fdopen(int(fd), "wb", buffering=64 * 1024) if fd else None
+        self.started = {}
+        self.last_flush = time.monotonic()
+
+    def _emit(self, event: dict, flush: bool = False) -> None:
+        if self.stream is None:
+            return
+        try:
+            self.stream.write(json.dumps(event, default=str, separators=(",", ":")).encode("utf-8") + b"\n")
+            # Batched writes, but never more than FLUSH_INTERVAL behind for live views.
+            if flush or time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+                self.stream.flush()
+                self.last_flush = time.monotonic()
+        except OSError:
+            # The worker went away; the run itself must not fail because of it.
+            self.stream = None
+
+    def _result(self, result, status: str) -> None:
+        host, task = result._host.get_name(), result._task
+        started = self.started.pop((host, task._uuid), None)
+        self._emit({
+            "event": "result",
+            "host": host,
+            "task_id": task._uuid,
+            "task": task.get_name(),
+            "module": task.action,
+            "status": status,
+            "changed": bool(result._result.get("changed")),
+            "duration": round(time.monotonic() - started, 6) if started is not None else None,
+            "result": trim_result(result._result),
+        })
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._emit({"event": "task", "task_id": task._uuid, "task": task.get_name(), "module": task.action},
+                   flush=True)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.v2_playbook_on_task_start(task, False)
+
+    def v2_runner_on_start(self, host, task):
+        self.started[(host.get_name(), task._uuid)] = time.monotonic()
+
+    def v2_runner_on_ok(self, result):
+        self._result(result, "changed" if result._result.get("changed") else "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._result(result, "ignored" if ignore_errors else "failed")
+
+    def v2_runner_on_unreachable(self, result):
+        self._result(result, "unreachable")
+
+    def v2_runner_on_skipped(self, result):
+        self._result(result, "skipped")
+
+    def v2_playbook_on_stats(self, stats):
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except OSError:
+                pass
+            self.stream = None
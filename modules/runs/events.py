@@ -0,0 +1,156 @@
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from modules.runs.models import ResultStatus, Run, RunEvent, RunHostSummary, RunTaskSummary
+
+logger = logging.getLogger(__name__)
+
+# Handed to `ansible-playbook`; the callback plugin writes one JSON event per line to this fd.
+EVENTS_FD_ENV = "MAESTRO_EVENTS_FD"
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def _text(value, length: int = 255) -> str:
+    return str(value or "")[:length]
+
+
+class EventIngester:
+    """
+        Turns the NDJSON event stream of one run into `RunEvent` rows and summary counters.
+
+        Bytes from the event pipe are fed as they arrive; complete lines are
+        parsed and buffered, and every `batch_size` events (or `flush_interval`
+        seconds) the buffer is written in one transaction: the events with
+        `bulk_create`, the touched host and task summaries with one
+        `bulk_create` and one `bulk_update` each, and the run's host counters
+        with a single `UPDATE ... SET x = x + n`. The ingester is the only
+        writer of its run's summaries, so it keeps them in memory and never
+        reads them back: the cost of a flush depends on the batch, not on
+        whether the run has ten hosts or ten thousand.
+
+        Args:
+            run_id (int): The run the events belong to.
+            batch_size (int, optional): Events per write (default: `RUNS_EVENT_BATCH_SIZE`).
+            flush_interval (float, optional): Max seconds an event waits (default: `RUNS_EVENT_FLUSH_INTERVAL`).
+    """
+
+    def __init__(self, run_id: int, batch_size: int = None, flush_interval: float = None):
+        self.run_id = run_id
+        self.batch_size = max(1, batch_size or settings.RUNS_EVENT_BATCH_SIZE)
+        self.flush_interval = settings.RUNS_EVENT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.partial = b""
+        self.pending = []
+        self.pending_since = None
+        self.seq = 0
+        self.hosts = {}     # host -> RunHostSummary
+        self.tasks = {}     # task uuid -> RunTaskSummary
+
+    def feed(self, data: bytes) -> None:
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        if len(self.partial) > MAX_LINE_BYTES:
+            logger.warning("Run %s: dropping an event line longer than %s bytes.", self.run_id, MAX_LINE_BYTES)
+            self.partial = b""
+        for line in lines:
+            self.add_line(line)
+
+    def add_line(self, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            logger.warning("Run %s: ignoring a malformed event line.", self.run_id)
+            return
+        if not isinstance(event, dict):
+            return
+        if event.get("event") == "task":
+            self._task(event)
+        elif event.get("event") == "result" and event.get("status") in ResultStatus.values and event.get("host"):
+            self.pending.append(event)
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush_if_due(self) -> None:
+        if self.pending_since is not None and time.monotonic() - self.pending_since >= self.flush_interval:
+            self.flush()
+
+    def close(self) -> None:
+        """Ingest a trailing line without newline and write whatever is buffered."""
+        if self.partial:
+            self.add_line(self.partial)
+            self.partial = b""
+        self.flush()
+
+    def _task(self, event: dict) -> RunTaskSummary:
+        task_uuid = _text(event.get("task_id"), 64)
+        summary = self.tasks.get(task_uuid)
+        if summary is None:
+            summary = self.tasks[task_uuid] = RunTaskSummary(
+                run_id=self.run_id, task_uuid=task_uuid, name=_text(event.get("task")),
+                module=_text(event.get("module")), position=len(self.tasks),
+            )
+        return summary
+
+    def flush(self) -> None:
+        events, self.pending, self.pending_since = self.pending, [], None
+        if not events and all(summary.pk is not None for summary in self.tasks.values()):
+            return
+
+        rows = []
+        host_counts, task_counts = defaultdict(Counter), defaultdict(Counter)
+        for event in events:
+            host, status, task = _text(event["host"]), event["status"], self._task(event)
+            duration = event.get("duration")
+            rows.append(RunEvent(
+                run_id=self.run_id, seq=self.seq, host=host, task_uuid=task.task_uuid, task=task.name,
+                module=task.module, status=status, changed=bool(event.get("changed")),
+                duration=duration if isinstance(duration, (int, float)) else None,
+                result=event.get("result") if isinstance(event.get("result"), dict) else {},
+            ))
+            self.seq += 1
+            host_counts[host][status] += 1
+            task_counts[task.task_uuid][status] += 1
+
+        new_hosts, touched_hosts = [], []
+        changed_hosts = failed_hosts = 0
+        for host, counts in host_counts.items():
+            summary = self.hosts.get(host)
+            if summary is None:
+                summary = self.hosts[host] = RunHostSummary(run_id=self.run_id, host=host)
+                new_hosts.append(summary)
+            else:
+                touched_hosts.append(summary)
+            was_changed, was_failed = summary.changed > 0, summary.has_failures
+            summary.add(counts)
+            changed_hosts += summary.changed > 0 and not was_changed
+            failed_hosts += summary.has_failures and not was_failed
+
+        new_tasks = [summary for summary in self.tasks.values() if summary.pk is None]
+        touched_tasks = [self.tasks[task_uuid] for task_uuid in task_counts if self.tasks[task_uuid].pk is not None]
+        for task_uuid, counts in task_counts.items():
+            self.tasks[task_uuid].add(counts)
+
+        with transaction.atomic():
+            RunEvent.objects.bulk_create(rows, batch_size=self.batch_size)
+            RunHostSummary.objects.bulk_create(new_hosts, batch_size=self.batch_size)
+            RunTaskSummary.objects.bulk_create(new_tasks)
+            if touched_hosts:
+                RunHostSummary.objects.bulk_update(touched_hosts, RunHostSummary.COUNT_FIELDS,
+                                                   batch_size=self.batch_size)
+            if touched_tasks:
+                RunTaskSummary.objects.bulk_update(touched_tasks, RunTaskSummary.COUNT_FIELDS)
+            if new_hosts or changed_hosts or failed_hosts:
+                Run.objects.filter(pk=self.run_id).update(
+                    host_count=F("host_count") + len(new_hosts),
+                    changed_host_count=F("changed_host_count") + changed_hosts,
+                    failed_host_count=F("failed_host_count") + failed_hosts,
+                )
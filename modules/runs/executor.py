@@ -0,0 +1,267 @@
+import json
+import logging
+import os
+import selectors
+import socket
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from modules.audit.buffer import audit_buffer
+from modules.audit.models import AuditEvent
+from modules.audit.signals import record
+from modules.inventories.models import Inventory
+from modules.inventories.renderer import render_inventory
+from modules.playbooks.models import Playbook
+from modules.runs.events import EVENTS_FD_ENV, EventIngester
+from modules.runs.logstore import LogWriter
+from modules.runs.models import Run
+from modules.secrets.store import decrypt_run_secrets
+
+logger = logging.getLogger(__name__)
+
+PLAYBOOK_FILENAME = "playbook.yml"
+INVENTORY_FILENAME = "inventory.yml"
+SECRETS_FILENAME = "secrets.json"
+PIPE_READ_BYTES = 64 * 1024
+CALLBACK_PLUGIN_DIR = Path(__file__).resolve().parent / "callback_plugins"
+CALLBACK_PLUGIN_NAME = "maestro_events"
+
+
+@dataclass
+class ActiveRun:
+    run: Run
+    process: subprocess.Popen
+    log: LogWriter
+    events: EventIngester
+    events_fd: int
+    eof: bool = False
+    events_eof: bool = False
+
+
+def record_status(run: Run, old: str, new: str) -> None:
+    # Status changes are conditional `update()`s, which send no signals: audit them here.
+    record(run, AuditEvent.Action.UPDATE, {"status": [old, new]})
+
+
+class RunExecutor:
+    """
+        Pulls queued runs and executes them as `ansible-playbook` subprocesses.
+
+        At most `concurrency` processes are alive at any time. The executor never
+        blocks on a child: each `tick()` copies whatever the children printed
+        into their log stores and feeds the structured events the
+        `maestro_events` callback plugin writes to a second pipe into an
+        `EventIngester`, reaps finished processes, then claims as many queued
+        runs as there are free slots. Claiming is a conditional UPDATE,
+        so several workers can safely share the same queue.
+
+        Args:
+            concurrency (int, optional): Max parallel runs (default: `RUNS_CONCURRENCY`).
+            poll_interval (float, optional): Seconds to sleep between ticks.
+            worker_name (str, optional): Identifier stored on claimed runs.
+    """
+
+    def __init__(self, concurrency: int = None, poll_interval: float = 1.0, worker_name: str = None):
+        self.concurrency = max(1, concurrency or settings.RUNS_CONCURRENCY)
+        self.poll_interval = poll_interval
+        self.worker_name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+        self.active: dict[int, ActiveRun] = {}
+        self.selector = selectors.DefaultSelector()
+        self.stopping = False
+
+    @property
+    def free_slots(self) -> int:
+        return self.concurrency - len(self.active)
+
+    def tick(self, timeout: float = 0) -> None:
+        self.pump(timeout)
+        self.reap()
+        if not self.stopping:
+            self.launch_queued()
+        # No request ever finishes in the worker: its status events reach the audit log from here.
+        audit_buffer.flush_if_due()
+
+    def run_forever(self) -> None:
+        while not (self.stopping and not self.active):
+            self.tick(timeout=self.poll_interval)
+        audit_buffer.flush()
+
+    def drain(self, timeout: float = None) -> None:
+        """Process runs until the queue is empty and every child has exited."""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            self.tick(timeout=min(self.poll_interval, 0.05))
+            if not self.active and not Run.objects.filter(status=Run.Status.QUEUED).exists():
+                return
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError("Runs did not finish before the timeout.")
+
+    def stop(self) -> None:
+        """Stop claiming new runs; `run_forever` returns once active runs finish."""
+        self.stopping = True
+
+    def claim(self, limit: int) -> list[int]:
+        candidates = (Run.objects
+                      .filter(status=Run.Status.QUEUED)
+                      .order_by("queued_at", "pk")
+                      .values_list("pk", flat=True)[:limit])
+        claimed = []
+        for run_id in candidates:
+            won = (Run.objects
+                   .filter(pk=run_id, status=Run.Status.QUEUED)
+                   .update(status=Run.Status.RUNNING, worker=self.worker_name, claimed_at=timezone.now()))
+            if won:
+                claimed.append(run_id)
+        return claimed
+
+    def launch_queued(self) -> None:
+        if self.free_slots <= 0:
+            return
+        for run_id in self.claim(self.free_slots):
+            # The playbook is only loaded for the audit log's object name.
+            run = Run.objects.select_related("playbook").defer("playbook__content").get(pk=run_id)
+            record_status(run, Run.Status.QUEUED, Run.Status.RUNNING)
+            self.launch(run)
+
+    def build_command(self, run: Run) -> list[str]:
+        inventory = INVENTORY_FILENAME if run.inventory_id else settings.RUNS_DEFAULT_INVENTORY
+        command = [settings.ANSIBLE_PLAYBOOK_BIN, "-i", inventory, PLAYBOOK_FILENAME]
+        if (run.workspace / SECRETS_FILENAME).exists():
+            command += ["-e", f"@{SECRETS_FILENAME}"]
+        return command
+
+    def build_env(self, events_fd: int) -> dict:
+        """The child's environment: Maestro's callback plugin enabled on top of the user's own."""
+        env = {**os.environ, "PYTHONUNBUFFERED": "1", EVENTS_FD_ENV: str(events_fd)}
+        for name, value in (("ANSIBLE_CALLBACK_PLUGINS", str(CALLBACK_PLUGIN_DIR)),
+                            ("ANSIBLE_CALLBACKS_ENABLED", CALLBACK_PLUGIN_NAME)):
+            existing = os.environ.get(name)
+            separator = os.pathsep if name == "ANSIBLE_CALLBACK_PLUGINS" else ","
+            env[name] = f"{existing}{separator}{value}" if existing else value
+        return env
+
+    def prepare_workspace(self, run: Run) -> None:
+        run.workspace.mkdir(parents=True, exist_ok=True)
+        content = Playbook.all_objects.filter(pk=run.playbook_id).values_list("content", flat=True).first()
+        (run.workspace / PLAYBOOK_FILENAME).write_text(content or "", encoding="utf-8")
+        if run.inventory_id:
+            # Streamed straight to disk, so large inventories never sit in memory.
+            with open(run.workspace / INVENTORY_FILENAME, "w", encoding="utf-8") as f:
+                render_inventory(Inventory(pk=run.inventory_id), f)
+
+        # All secrets are decrypted in one pass; data keys come from the in-process cache.
+        secrets = decrypt_run_secrets(run)
+        if secrets:
+            fd = os.open(run.workspace / SECRETS_FILENAME, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(secrets, f)
+
+    def launch(self, run: Run) -> None:
+        events_fd, events_write_fd = os.pipe()
+        try:
+            self.prepare_workspace(run)
+            process = subprocess.Popen(
+                self.build_command(run),
+                cwd=run.workspace,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=self.build_env(events_write_fd),
+                pass_fds=(events_write_fd,),
+                start_new_session=True,
+            )
+        except Exception as exc:
+            # Undecryptable secrets, inventory rendering errors or a missing executable fail
+            # this run only; the worker keeps going and tailers get their exit marker.
+            os.close(events_fd)
+            logger.error("Could not start run %s: %s", run.pk, exc, exc_info=not isinstance(exc, OSError))
+            Run.objects.filter(pk=run.pk).update(
+                status=Run.Status.FAILED, error=str(exc) or exc.__class__.__name__, finished_at=timezone.now()
+            )
+            record_status(run, Run.Status.RUNNING, Run.Status.FAILED)
+            self.mark_finished(run, None)
+            return
+        finally:
+            # Only the child writes; EOF then means every writer is gone.
+            os.close(events_write_fd)
+
+        Run.objects.filter(pk=run.pk).update(started_at=timezone.now(), pid=process.pid)
+        os.set_blocking(process.stdout.fileno(), False)
+        os.set_blocking(events_fd, False)
+        active = ActiveRun(run=run, process=process, log=LogWriter(run.log_dir),
+                           events=EventIngester(run.pk), events_fd=events_fd)
+        self.selector.register(process.stdout, selectors.EVENT_READ, (self.read_output, active))
+        self.selector.register(events_fd, selectors.EVENT_READ, (self.read_events, active))
+        self.active[run.pk] = active
+
+    def pump(self, timeout: float = 0) -> None:
+        """Wait up to `timeout` seconds for output and events, then append and ingest them."""
+        if not self.active:
+            time.sleep(timeout)
+            return
+        for key, _ in self.selector.select(timeout):
+            read, active = key.data
+            read(active)
+        for active in self.active.values():
+            active.events.flush_if_due()
+
+    def read_output(self, active: ActiveRun) -> None:
+        while not active.eof:
+            try:
+                data = os.read(active.process.stdout.fileno(), PIPE_READ_BYTES)
+            except BlockingIOError:
+                return
+            if not data:
+                active.eof = True
+                self.selector.unregister(active.process.stdout)
+                return
+            active.log.write(data)
+
+    def read_events(self, active: ActiveRun) -> None:
+        while not active.events_eof:
+            try:
+                data = os.read(active.events_fd, PIPE_READ_BYTES)
+            except BlockingIOError:
+                return
+            if not data:
+                active.events_eof = True
+                self.selector.unregister(active.events_fd)
+                return
+            active.events.feed(data)
+
+    def mark_finished(self, run: Run, return_code) -> None:
+        """Drop the exit marker log tailers watch instead of polling the database."""
+        (run.workspace / SECRETS_FILENAME).unlink(missing_ok=True)
+        try:
+            run.exit_marker_path.write_text("" if return_code is None else str(return_code))
+        except OSError:
+            logger.warning("Could not write the exit marker of run %s", run.pk)
+
+    def reap(self) -> None:
+        for run_id, active in list(self.active.items()):
+            return_code = active.process.poll()
+            if return_code is None:
+                continue
+            # Background children (e.g. ssh ControlPersist) may keep the pipe
+            # open, so only collect what is already buffered.
+            self.read_output(active)
+            self.read_events(active)
+            if not active.eof:
+                self.selector.unregister(active.process.stdout)
+            if not active.events_eof:
+                self.selector.unregister(active.events_fd)
+            active.process.stdout.close()
+            os.close(active.events_fd)
+            active.log.close()
+            # Counters are complete before the run is shown as finished.
+            active.events.close()
+            del self.active[run_id]
+            status = Run.Status.SUCCEEDED if return_code == 0 else Run.Status.FAILED
+            Run.objects.filter(pk=run_id).update(status=status, return_code=return_code, finished_at=timezone.now())
+            record_status(active.run, Run.Status.RUNNING, status)
+            self.mark_finished(active.run, return_code)
@@ -0,0 +1,280 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+SEGMENT_SIZE = 1024 * 1024
+INDEX_STRIDE = 1000
+READ_CHUNK_BYTES = 64 * 1024
+
+_INDEX_ENTRY = struct.Struct("<Q")
+_INDEX_FILENAME = "lines.idx"
+_META_FILENAME = "meta.json"
+
+
+def _segment_path(directory: Path, number: int, sealed: bool) -> Path:
+    return directory / f"segment-{number:08d}.{'log.z' if sealed else 'log'}"
+
+
+class LogPage(NamedTuple):
+    start: int
+    lines: list
+    end_offset: int
+    total: int
+
+
+class LogWriter:
+    """
+        Append-only writer for a run's output.
+
+        Output is split into fixed-size segments of `SEGMENT_SIZE` bytes, so the
+        segment holding any byte offset is `offset // SEGMENT_SIZE`. Full
+        segments are zlib-compressed; the open one stays raw so live readers
+        can follow it. Alongside, `lines.idx` stores the byte offset of every
+        `INDEX_STRIDE`-th line as fixed-width integers, which lets readers jump
+        near any line number by reading a single index entry.
+
+        Args:
+            directory (Path): Directory the log is written to (created if missing).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment = 0
+        self.segment_size = 0
+        self.size = 0
+        self.newlines = 0
+        self.ends_with_newline = True
+        self.index = open(self.directory / _INDEX_FILENAME, "wb")
+        self.index.write(_INDEX_ENTRY.pack(0))
+        self.index.flush()
+        self.raw = open(_segment_path(self.directory, 0, sealed=False), "wb")
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+
+        while data:
+            piece = data[:SEGMENT_SIZE - self.segment_size]
+            data = data[len(piece):]
+
+            self.raw.write(piece)
+            self._index_lines(piece)
+            self.segment_size += len(piece)
+            self.size += len(piece)
+
+            if self.segment_size == SEGMENT_SIZE:
+                self._seal()
+
+        self.ends_with_newline = piece.endswith(b"\n")
+        self.raw.flush()
+        self.index.flush()
+
+    def _index_lines(self, piece: bytes) -> None:
+        newlines = piece.count(b"\n")
+        if newlines < INDEX_STRIDE - self.newlines % INDEX_STRIDE:
+            self.newlines += newlines
+            return
+
+        position = -1
+        for _ in range(newlines):
+            position = piece.index(b"\n", position + 1)
+            self.newlines += 1
+            if self.newlines % INDEX_STRIDE == 0:
+                self.index.write(_INDEX_ENTRY.pack(self.size + position + 1))
+
+    def _seal(self) -> None:
+        self.raw.close()
+        raw_path = _segment_path(self.directory, self.segment, sealed=False)
+        sealed_path = _segment_path(self.directory, self.segment, sealed=True)
+        tmp_path = sealed_path.with_suffix(".tmp")
+        tmp_path.write_bytes(zlib.compress(raw_path.read_bytes()))
+        os.replace(tmp_path, sealed_path)
+
+        # Readers fall back to the sealed file as soon as the raw one is gone.
+        self.segment += 1
+        self.segment_size = 0
+        self.raw = open(_segment_path(self.directory, self.segment, sealed=False), "wb")
+        raw_path.unlink()
+
+    def close(self) -> None:
+        if self.segment_size:
+            self._seal()
+        self.raw.close()
+        _segment_path(self.directory, self.segment, sealed=False).unlink(missing_ok=True)
+        self.index.close()
+
+        meta = {"size": self.size, "lines": self.newlines + (0 if self.ends_with_newline else 1)}
+        (self.directory / _META_FILENAME).write_text(json.dumps(meta))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LogReader:
+    """
+        Random-access reader for logs written by `LogWriter`.
+
+        Works on finished logs as well as on logs that are still being written.
+        Byte ranges map straight to segments, and line ranges are resolved
+        through the sparse line index, so reading a page costs at most one
+        segment decompression plus `INDEX_STRIDE` lines of scanning no matter
+        how large the log is.
+
+        Args:
+            directory (Path): Directory the log was written to.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._meta = None
+        self._sealed = 0
+        self._cached_segment = (None, b"")
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            try:
+                self._meta = json.loads((self.directory / _META_FILENAME).read_text())
+            except FileNotFoundError:
+                return None
+        return self._meta
+
+    @property
+    def is_closed(self) -> bool:
+        return self.meta is not None
+
+    def size(self) -> int:
+        if self.meta:
+            return self.meta["size"]
+
+        while _segment_path(self.directory, self._sealed, sealed=True).exists():
+            self._sealed += 1
+        try:
+            raw_size = _segment_path(self.directory, self._sealed, sealed=False).stat().st_size
+        except FileNotFoundError:
+            # Either nothing was written yet or the segment was sealed meanwhile.
+            if _segment_path(self.directory, self._sealed, sealed=True).exists():
+                return self.size()
+            raw_size = 0
+        return self._sealed * SEGMENT_SIZE + raw_size
+
+    def _read_segment(self, number: int, start: int, end: int) -> bytes:
+        cached_number, cached = self._cached_segment
+        if cached_number == number:
+            return cached[start:end]
+
+        sealed_path = _segment_path(self.directory, number, sealed=True)
+        try:
+            with open(_segment_path(self.directory, number, sealed=False), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[start:end]
+        except FileNotFoundError:
+            pass
+
+        try:
+            data = zlib.decompress(sealed_path.read_bytes())
+        except FileNotFoundError:
+            return b""
+        self._cached_segment = (number, data)
+        return data[start:end]
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+            Read up to `length` bytes starting at byte `offset`.
+
+            Args:
+                offset (int): Byte offset in the whole log.
+                length (int): Maximum number of bytes to return.
+
+            Returns:
+                bytes: The data (shorter than `length` at the end of the log).
+        """
+        chunks = []
+        while length > 0:
+            number, start = divmod(offset, SEGMENT_SIZE)
+            chunk = self._read_segment(number, start, min(SEGMENT_SIZE, start + length))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+            length -= len(chunk)
+        return b"".join(chunks)
+
+    def _index_entry(self, entry: int) -> tuple[int, int]:
+        """Return `(line, offset)` of the closest indexed line at or before `entry`."""
+        try:
+            f = open(self.directory / _INDEX_FILENAME, "rb")
+        except FileNotFoundError:
+            return 0, 0
+        with f:
+            entries = os.fstat(f.fileno()).st_size // _INDEX_ENTRY.size
+            if entries == 0:
+                return 0, 0
+            entry = min(entry, entries - 1)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                (offset,) = _INDEX_ENTRY.unpack_from(mapped, entry * _INDEX_ENTRY.size)
+        return entry * INDEX_STRIDE, offset
+
+    def _scan_lines(self, offset: int, end: int):
+        """Yield `(line_bytes, next_offset)` for every line in `[offset, end)`."""
+        pending = b""
+        pending_start = offset
+        while offset < end:
+            chunk = self.read(offset, min(READ_CHUNK_BYTES, end - offset))
+            if not chunk:
+                break
+            offset += len(chunk)
+            buffer = pending + chunk
+            position = 0
+            while (newline := buffer.find(b"\n", position)) >= 0:
+                yield buffer[position:newline], pending_start + newline + 1
+                position = newline + 1
+            pending = buffer[position:]
+            pending_start += position
+        # A trailing line without newline is only final once the log is closed.
+        if pending and self.is_closed:
+            yield pending, offset
+
+    def line_count(self) -> int:
+        if self.meta:
+            return self.meta["lines"]
+        line, offset = self._index_entry(2 ** 62)
+        return line + sum(1 for _ in self._scan_lines(offset, self.size()))
+
+    def read_lines(self, start: int, count: int) -> LogPage:
+        """
+            Read `count` lines starting at line number `start` (0-based).
+
+            Args:
+                start (int): First line to return.
+                count (int): Maximum number of lines to return.
+
+            Returns:
+                LogPage: The lines (decoded as UTF-8) and the byte offset right after them.
+        """
+        start = max(0, start)
+        line, offset = self._index_entry(start // INDEX_STRIDE)
+        size = self.size()
+        lines = []
+        for raw_line, next_offset in self._scan_lines(offset, size):
+            if line >= start + count:
+                break
+            if line >= start:
+                lines.append(raw_line.decode("utf-8", errors="replace"))
+            offset = next_offset
+            line += 1
+        return LogPage(start=start, lines=lines, end_offset=offset, total=self.line_count())
+
+    def tail(self, count: int) -> LogPage:
+        """Read the last `count` lines of the log."""
+        return self.read_lines(max(0, self.line_count() - count), count)
@@ -0,0 +1,33 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from modules.runs.executor import RunExecutor
+
+
+class Command(BaseCommand):
+    help = "Execute queued playbook runs with a bounded pool of ansible-playbook processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=None,
+                            help="Maximum number of parallel runs (default: RUNS_CONCURRENCY).")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to wait between queue checks.")
+        parser.add_argument("--drain", action="store_true",
+                            help="Exit once the queue is empty instead of waiting for new runs.")
+
+    def handle(self, *args, **options):
+        executor = RunExecutor(concurrency=options["concurrency"], poll_interval=options["poll_interval"])
+
+        def shutdown(signum, frame):
+            self.stdout.write("Shutting down: waiting for active runs to finish...")
+            executor.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(f"Worker {executor.worker_name} started (concurrency={executor.concurrency}).")
+        if options["drain"]:
+            executor.drain()
+        else:
+            executor.run_forever()
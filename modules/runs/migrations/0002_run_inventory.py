@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventories', '0001_initial'),
+        ('runs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='run',
+            name='inventory',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='inventories.inventory'),
+        ),
+    ]
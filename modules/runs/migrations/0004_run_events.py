@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runs', '0003_run_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='run',
+            name='changed_host_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='run',
+            name='failed_host_count',
+            field=models.PositiveIntegerField(default=0, help_text='Hosts with a failed or unreachable task.'),
+        ),
+        migrations.AddField(
+            model_name='run',
+            name='host_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='RunEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('host', models.CharField(max_length=255)),
+                ('task_uuid', models.CharField(max_length=64)),
+                ('task', models.CharField(max_length=255)),
+                ('module', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('changed', 'Changed'), ('failed', 'Failed'), ('ignored', 'Failed (ignored)'), ('unreachable', 'Unreachable'), ('skipped', 'Skipped')], max_length=20)),
+                ('changed', models.BooleanField(default=False)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='runs.run')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'host', 'seq'], name='runevent_run_host_idx')],
+                'constraints': [models.UniqueConstraint(fields=('run', 'seq'), name='runevent_run_seq_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RunHostSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ok', models.PositiveIntegerField(default=0)),
+                ('changed', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('ignored', models.PositiveIntegerField(default=0)),
+                ('unreachable', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('host', models.CharField(max_length=255)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='host_summaries', to='runs.run')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'host'), name='runhostsummary_run_host_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RunTaskSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ok', models.PositiveIntegerField(default=0)),
+                ('changed', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('ignored', models.PositiveIntegerField(default=0)),
+                ('unreachable', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('task_uuid', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('module', models.CharField(blank=True, default='', max_length=255)),
+                ('position', models.PositiveIntegerField(help_text='Order in which the task started.')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_summaries', to='runs.run')),
+            ],
+            options={
+                'ordering': ['run', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('run', 'task_uuid'), name='runtasksummary_run_task_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,5 @@
+from .run import Run
+from .result_counts import ResultCounts, ResultStatus
+from .run_event import RunEvent
+from .host_summary import RunHostSummary
+from .task_summary import RunTaskSummary
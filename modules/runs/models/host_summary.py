@@ -0,0 +1,18 @@
+from django.db import models
+
+from .result_counts import ResultCounts
+from .run import Run
+
+
+class RunHostSummary(ResultCounts):
+    """Result counters of one host in one run (the PLAY RECAP line of that host)."""
+    run = models.ForeignKey(Run, on_delete=models.CASCADE, related_name="host_summaries")
+    host = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "host"], name="runhostsummary_run_host_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.host} (run #{self.run_id})"
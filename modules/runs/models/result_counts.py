@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class ResultStatus(models.TextChoices):
+    """Outcome of one task on one host; the values double as `ResultCounts` field names."""
+    OK = "ok", "OK"
+    CHANGED = "changed", "Changed"
+    FAILED = "failed", "Failed"
+    IGNORED = "ignored", "Failed (ignored)"
+    UNREACHABLE = "unreachable", "Unreachable"
+    SKIPPED = "skipped", "Skipped"
+
+
+class ResultCounts(models.Model):
+    """Per-status result counters, bumped by `modules.runs.events.EventIngester` as events arrive."""
+    COUNT_FIELDS = tuple(ResultStatus.values)
+
+    ok = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    ignored = models.PositiveIntegerField(default=0)
+    unreachable = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def add(self, counts) -> None:
+        """Add a `{status: count}` mapping (e.g. a `Counter`) to the counters."""
+        for field in self.COUNT_FIELDS:
+            setattr(self, field, getattr(self, field) + counts.get(field, 0))
+
+    @property
+    def has_failures(self) -> bool:
+        return bool(self.failed or self.unreachable)
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from modules.core.models import AuditFieldsMixin
+from modules.inventories.models import Inventory
+from modules.playbooks.models import Playbook
+from modules.runs.logstore import LogReader
+
+
+class Run(AuditFieldsMixin):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    FINISHED_STATUSES = (Status.SUCCEEDED, Status.FAILED)
+
+    playbook = models.ForeignKey(Playbook, on_delete=models.CASCADE, related_name="runs")
+    inventory = models.ForeignKey(Inventory, on_delete=models.SET_NULL, null=True, blank=True, related_name="runs")
+    schedule = models.ForeignKey("schedules.Schedule", on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name="runs")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    worker = models.CharField(max_length=255, blank=True, default="")
+    pid = models.PositiveIntegerField(null=True, blank=True)
+    return_code = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    queued_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Maintained incrementally from the callback plugin's events (see `modules.runs.events`).
+    host_count = models.PositiveIntegerField(default=0)
+    changed_host_count = models.PositiveIntegerField(default=0)
+    failed_host_count = models.PositiveIntegerField(default=0, help_text="Hosts with a failed or unreachable task.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "queued_at"], name="run_status_queued_idx"),
+        ]
+
+    @property
+    def workspace(self) -> Path:
+        return Path(settings.RUNS_WORKSPACE_ROOT) / str(self.pk)
+
+    @property
+    def log_dir(self) -> Path:
+        return self.workspace / "log"
+
+    def open_log(self) -> LogReader:
+        return LogReader(self.log_dir)
+
+    @property
+    def exit_marker_path(self) -> Path:
+        return self.workspace / "exit_code"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @property
+    def queue_wait(self):
+        """Time spent queued before a worker claimed the run."""
+        if self.claimed_at:
+            return self.claimed_at - self.queued_at
+        return None
+
+    @property
+    def start_latency(self):
+        """Time between being claimed and `ansible-playbook` being spawned."""
+        if self.claimed_at and self.started_at:
+            return self.started_at - self.claimed_at
+        return None
+
+    @property
+    def duration(self):
+        """Wall-clock time of the `ansible-playbook` process."""
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+    def __str__(self):
+        return f"{self.playbook} #{self.pk}"
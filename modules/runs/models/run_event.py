@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+from .result_counts import ResultStatus
+from .run import Run
+
+
+class RunEvent(models.Model):
+    """
+        One task result on one host, as reported by the `maestro_events` callback plugin.
+
+        Events are append-only and written in batches; `seq` is their arrival
+        order within the run.
+    """
+    Status = ResultStatus
+
+    run = models.ForeignKey(Run, on_delete=models.CASCADE, related_name="events")
+    seq = models.PositiveIntegerField()
+    host = models.CharField(max_length=255)
+    task_uuid = models.CharField(max_length=64)
+    task = models.CharField(max_length=255)
+    module = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=ResultStatus.choices)
+    changed = models.BooleanField(default=False)
+    duration = models.FloatField(null=True, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "seq"], name="runevent_run_seq_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["run", "host", "seq"], name="runevent_run_host_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.host} {self.task}: {self.status}"
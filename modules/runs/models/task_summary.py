@@ -0,0 +1,22 @@
+from django.db import models
+
+from .result_counts import ResultCounts
+from .run import Run
+
+
+class RunTaskSummary(ResultCounts):
+    """Result counters of one task in one run, across all its hosts."""
+    run = models.ForeignKey(Run, on_delete=models.CASCADE, related_name="task_summaries")
+    task_uuid = models.CharField(max_length=64)
+    name = models.CharField(max_length=255)
+    module = models.CharField(max_length=255, blank=True, default="")
+    position = models.PositiveIntegerField(help_text="Order in which the task started.")
+
+    class Meta:
+        ordering = ["run", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["run", "task_uuid"], name="runtasksummary_run_task_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} (run #{self.run_id})"
@@ -0,0 +1,14 @@
+import shutil
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from modules.runs.models import Run
+
+
+@receiver(post_delete, sender=Run)
+def delete_run_workspace(sender, instance, **kwargs):
+    # The workspace holds the run's output log; it goes once the row is really gone.
+    workspace = instance.workspace
+    transaction.on_commit(lambda: shutil.rmtree(workspace, ignore_errors=True))
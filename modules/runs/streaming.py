@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+
+from modules.runs.logstore import LogReader
+
+BATCH_INTERVAL = 0.25
+MAX_CHUNK_BYTES = 64 * 1024
+HEARTBEAT_INTERVAL = 15.0
+
+
+def format_event(data: str = None, event: str = None, event_id: int = None) -> bytes:
+    """
+        Encode a single Server-Sent Event.
+
+        Args:
+            data (str, optional): Payload; every line (`\n`, `\r\n` or `\r` terminated)
+                becomes its own `data:` field.
+            event (str, optional): Event name (defaults to "message" on the client).
+            event_id (int, optional): Sent as `id:` so the browser resumes from it.
+
+        Returns:
+            bytes: The encoded event, terminated by a blank line.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    if data is not None:
+        # A bare CR would end the field early on the client and leave the rest unprefixed.
+        lines.extend(f"data: {line}" for line in data.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def parse_offset(value) -> int:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _read_batch(log: LogReader, offset: int, finished: bool) -> bytes:
+    size = log.size()
+    if size <= offset:
+        return b""
+
+    chunk = log.read(offset, min(size - offset, MAX_CHUNK_BYTES))
+    if finished or len(chunk) == MAX_CHUNK_BYTES:
+        return chunk
+    # Hold back a trailing partial line until the rest of it is written.
+    return chunk[:chunk.rfind(b"\n") + 1]
+
+
+def _poll(log: LogReader, exit_marker_path, offset: int, finished: bool) -> tuple[bool, bytes]:
+    finished = finished or os.path.exists(exit_marker_path)
+    return finished, _read_batch(log, offset, finished)
+
+
+async def tail_output(log: LogReader, exit_marker_path, offset: int = 0, finished: bool = False):
+    """
+        Stream a run's log as Server-Sent Events.
+
+        Every event carries whatever was appended since the previous batch
+        (whole lines only, up to `MAX_CHUNK_BYTES`) and uses the byte offset
+        right after it as its id, so `Last-Event-ID` resumes exactly there.
+        Completion is detected from the exit marker written by the worker,
+        which keeps the database out of the polling loop. File reads and
+        decompression run in a worker thread so a large batch never stalls the
+        event loop that serves the other streams.
+
+        Args:
+            log (LogReader): The run's log store.
+            exit_marker_path (Path): File the worker creates once the run ends.
+            offset (int, optional): Byte offset to resume from.
+            finished (bool, optional): True if the run is already known to be over.
+
+        Yields:
+            bytes: Encoded SSE events, ending with an `end` event.
+    """
+    last_sent = time.monotonic()
+    while True:
+        finished, chunk = await asyncio.to_thread(_poll, log, exit_marker_path, offset, finished)
+        if chunk:
+            offset += len(chunk)
+            last_sent = time.monotonic()
+            text = chunk.decode("utf-8", errors="replace").removesuffix("\n").removesuffix("\r")
+            yield format_event(text, event="output", event_id=offset)
+            continue
+
+        if finished:
+            yield format_event("", event="end", event_id=offset)
+            return
+
+        if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+            last_sent = time.monotonic()
+            yield b": keepalive\n\n"
+
+        await asyncio.sleep(BATCH_INTERVAL)
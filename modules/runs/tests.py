@@ -0,0 +1,373 @@
+import base64
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from modules.audit.buffer import audit_buffer
+from modules.audit.models import AuditEvent
+from modules.inventories.models import Host, Inventory
+from modules.playbooks.models import Playbook
+from modules.runs import logstore, streaming
+from modules.runs.events import EventIngester
+from modules.runs.executor import RunExecutor
+from modules.runs.logstore import LogReader, LogWriter
+from modules.runs.models import Run, RunEvent, RunHostSummary, RunTaskSummary
+from modules.secrets.store import GLOBAL_SCOPE, key_cache, set_secret
+from modules.users.models import CustomUser
+
+STUB_ANSIBLE_PLAYBOOK = """#!/bin/sh
+echo "PLAY [stub] args: $*"
+cat "$3"
+[ "$(head -n 1 "$3")" = "fail" ] && exit 2
+exit 0
+"""
+
+
+class RunExecutorTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        stub = Path(self.tmp.name) / "ansible-playbook"
+        stub.write_text(STUB_ANSIBLE_PLAYBOOK)
+        stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+
+        settings_override = override_settings(
+            ANSIBLE_PLAYBOOK_BIN=str(stub),
+            RUNS_WORKSPACE_ROOT=Path(self.tmp.name) / "runs",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_runs_are_executed_and_timed(self):
+        ok = Run.objects.create(playbook=Playbook.objects.create(name="ok", content="- hosts: all"))
+        bad = Run.objects.create(playbook=Playbook.objects.create(name="bad", content="fail"))
+
+        RunExecutor(concurrency=1, poll_interval=0.01).drain(timeout=30)
+
+        ok.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(ok.status, Run.Status.SUCCEEDED)
+        self.assertEqual(bad.status, Run.Status.FAILED)
+        self.assertEqual(bad.return_code, 2)
+        self.assertIn("- hosts: all", ok.open_log().tail(10).lines)
+        self.assertIsNotNone(ok.queue_wait)
+        self.assertIsNotNone(ok.start_latency)
+        self.assertIsNotNone(ok.duration)
+
+    def test_worker_writes_audit_events_without_requests(self):
+        audit_buffer.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            run = Run.objects.create(playbook=Playbook.objects.create(name="ok", content="- hosts: all"))
+        self.assertFalse(AuditEvent.objects.for_object(run).exists())
+        executor = RunExecutor(concurrency=1, poll_interval=0.01)
+        with mock.patch.object(audit_buffer, "max_age", 0), self.captureOnCommitCallbacks(execute=True):
+            executor.tick()
+
+        self.assertEqual(len(audit_buffer), 0)
+        self.assertTrue(AuditEvent.objects.for_object(run).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            executor.drain(timeout=30)
+        audit_buffer.flush()
+        statuses = [event.changes["status"] for event in AuditEvent.objects.for_object(run)
+                    .filter(action=AuditEvent.Action.UPDATE).order_by("pk")]
+        self.assertEqual(statuses, [["queued", "running"], ["running", "succeeded"]])
+
+    def test_concurrency_bounds_active_processes(self):
+        playbook = Playbook.objects.create(name="ok", content="- hosts: all")
+        Run.objects.bulk_create([Run(playbook=playbook) for _ in range(5)])
+
+        executor = RunExecutor(concurrency=2, poll_interval=0.01)
+        executor.tick()
+        self.assertEqual(len(executor.active), 2)
+        self.assertEqual(Run.objects.filter(status=Run.Status.QUEUED).count(), 3)
+
+        executor.drain(timeout=30)
+        self.assertEqual(Run.objects.filter(status=Run.Status.SUCCEEDED).count(), 5)
+
+    def test_inventory_is_rendered_into_the_workspace(self):
+        inventory = Inventory.objects.create(name="lab")
+        host = Host.objects.create(inventory=inventory, name="lab01.example.com")
+        run = Run.objects.create(playbook=Playbook.objects.create(name="ok"), inventory=inventory)
+
+        executor = RunExecutor(concurrency=1)
+        executor.prepare_workspace(run)
+        self.assertEqual(executor.build_command(run)[1:3], ["-i", "inventory.yml"])
+        self.assertIn(host.name, (run.workspace / "inventory.yml").read_text())
+
+    def test_secrets_are_passed_as_extra_vars_and_removed_afterwards(self):
+        set_secret(GLOBAL_SCOPE, "api_token", "s3cr3t")
+        run = Run.objects.create(playbook=Playbook.objects.create(name="ok"))
+
+        executor = RunExecutor(concurrency=1)
+        executor.prepare_workspace(run)
+        self.assertEqual(executor.build_command(run)[-2:], ["-e", "@secrets.json"])
+        self.assertEqual(oct((run.workspace / "secrets.json").stat().st_mode & 0o777), "0o600")
+
+        executor.mark_finished(run, 0)
+        self.assertFalse((run.workspace / "secrets.json").exists())
+
+    def test_undecryptable_secrets_fail_the_run_not_the_worker(self):
+        set_secret(GLOBAL_SCOPE, "api_token", "s3cr3t")
+        broken = Run.objects.create(playbook=Playbook.objects.create(name="broken"))
+        key_cache.clear()
+        with override_settings(SECRETS_MASTER_KEY=base64.urlsafe_b64encode(b"k" * 32).decode()), \
+                self.assertLogs("modules.runs.executor", level="ERROR"):
+            RunExecutor(concurrency=1, poll_interval=0.01).drain(timeout=30)
+
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, Run.Status.FAILED)
+        self.assertIn("another master key", broken.error)
+        self.assertEqual(broken.exit_marker_path.read_text(), "")
+        self.assertFalse((broken.workspace / "secrets.json").exists())
+
+    def test_missing_executable_fails_the_run(self):
+        run = Run.objects.create(playbook=Playbook.objects.create(name="ok"))
+        with override_settings(ANSIBLE_PLAYBOOK_BIN=os.path.join(self.tmp.name, "missing")), \
+                self.assertLogs("modules.runs.executor", level="ERROR"):
+            RunExecutor(concurrency=1).drain(timeout=30)
+        run.refresh_from_db()
+        self.assertEqual(run.status, Run.Status.FAILED)
+        self.assertTrue(run.error)
+
+
+STUB_ANSIBLE_PLAYBOOK_WITH_EVENTS = """#!/bin/sh
+exec 3>/dev/fd/$MAESTRO_EVENTS_FD
+echo '{"event":"task","task_id":"t1","task":"ping","module":"ansible.builtin.ping"}' >&3
+i=0
+while [ $i -lt 1200 ]; do
+    status=ok; [ $((i % 100)) -eq 7 ] && status=unreachable
+    printf '{"event":"result","host":"web%04d","task_id":"t1","status":"%s","duration":0.01,"result":{}}\\n' $i $status >&3
+    i=$((i + 1))
+done
+echo "PLAY RECAP"
+"""
+
+EVENTS_PLAYBOOK = """- hosts: localhost
+  connection: local
+  gather_facts: false
+  tasks:
+    - name: Say hello
+      ansible.builtin.command: echo hello
+    - name: Fail quietly
+      ansible.builtin.command: /bin/false
+      ignore_errors: true
+"""
+
+
+class RunEventTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.run = Run.objects.create(playbook=Playbook.objects.create(name="ok"))
+
+    def line(self, host, status, task="t1", **extra):
+        return json.dumps({"event": "result", "host": host, "task_id": task, "task": task, "module": "ping",
+                           "status": status, "changed": status == "changed", "duration": 0.5, **extra}) + "\n"
+
+    def test_lines_are_batched_across_partial_reads(self):
+        ingester = EventIngester(self.run.pk, batch_size=3, flush_interval=60)
+        with self.assertLogs("modules.runs.events", level="WARNING"):
+            ingester.feed(b"not json\n")
+        data = "".join(self.line(f"web{i}", "ok") for i in range(4)).encode()
+        ingester.feed(data[:50])
+        ingester.feed(data[50:-5])
+        self.assertEqual(RunEvent.objects.count(), 3)
+
+        ingester.feed(data[-5:-1])
+        ingester.close()
+        self.assertEqual(list(RunEvent.objects.order_by("seq").values_list("seq", "host")),
+                         [(0, "web0"), (1, "web1"), (2, "web2"), (3, "web3")])
+
+    def test_summaries_are_updated_incrementally(self):
+        ingester = EventIngester(self.run.pk, batch_size=100, flush_interval=60)
+        ingester.feed(json.dumps({"event": "task", "task_id": "t0", "task": "gather", "module": "setup"}).encode()
+                      + b"\n" + (self.line("a", "ok") + self.line("b", "changed")).encode())
+        ingester.flush()
+        ingester.feed((self.line("a", "failed", task="t2") + self.line("b", "changed", task="t2")
+                       + self.line("c", "unreachable", task="t2")).encode())
+        ingester.close()
+
+        self.run.refresh_from_db()
+        self.assertEqual((self.run.host_count, self.run.changed_host_count, self.run.failed_host_count), (3, 1, 2))
+        host_a = RunHostSummary.objects.get(run=self.run, host="a")
+        self.assertEqual((host_a.ok, host_a.failed), (1, 1))
+        self.assertEqual([(task.name, task.position, task.ok + task.changed + task.failed + task.unreachable)
+                          for task in RunTaskSummary.objects.filter(run=self.run)],
+                         [("gather", 0, 0), ("t1", 1, 2), ("t2", 2, 3)])
+
+    def test_flush_cost_does_not_grow_with_the_run(self):
+        def flush_queries(hosts):
+            run = Run.objects.create(playbook=self.run.playbook)
+            ingester = EventIngester(run.pk, batch_size=10_000, flush_interval=60)
+            ingester.feed("".join(self.line(f"host{i}", "ok") for i in range(hosts)).encode())
+            ingester.flush()
+            # The same batch of 20 events, three of them on new hosts.
+            ingester.feed("".join(self.line(f"host{i}", "failed", task="t2") for i in range(3, 20)).encode())
+            ingester.feed("".join(self.line(f"new{i}", "ok", task="t2") for i in range(3)).encode())
+            with CaptureQueriesContext(connection) as ctx:
+                ingester.flush()
+            return len(ctx.captured_queries)
+
+        self.assertEqual(flush_queries(20), flush_queries(2000))
+
+    def test_worker_ingests_events_from_the_callback_pipe(self):
+        stub = Path(self.tmp.name) / "ansible-playbook"
+        stub.write_text(STUB_ANSIBLE_PLAYBOOK_WITH_EVENTS)
+        stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+        with override_settings(ANSIBLE_PLAYBOOK_BIN=str(stub), RUNS_WORKSPACE_ROOT=Path(self.tmp.name) / "runs",
+                               RUNS_EVENT_BATCH_SIZE=500):
+            RunExecutor(concurrency=1, poll_interval=0.01).drain(timeout=30)
+
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.status, Run.Status.SUCCEEDED)
+        self.assertEqual((self.run.host_count, self.run.failed_host_count), (1200, 12))
+        self.assertEqual(RunEvent.objects.filter(run=self.run).count(), 1200)
+        task = RunTaskSummary.objects.get(run=self.run)
+        self.assertEqual((task.name, task.ok, task.unreachable), ("ping", 1188, 12))
+
+        user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(user)
+        response = self.client.get(reverse("run_detail", args=[self.run.pk]))
+        self.assertContains(response, "web0007")
+        self.assertNotContains(response, "web0008")
+
+    @unittest.skipUnless(shutil.which("ansible-playbook"), "ansible-playbook is not installed")
+    def test_callback_plugin_reports_task_results(self):
+        self.run.playbook.content = EVENTS_PLAYBOOK
+        self.run.playbook.save()
+        with override_settings(ANSIBLE_PLAYBOOK_BIN=shutil.which("ansible-playbook"),
+                               RUNS_WORKSPACE_ROOT=Path(self.tmp.name) / "runs",
+                               RUNS_DEFAULT_INVENTORY="localhost,"):
+            RunExecutor(concurrency=1, poll_interval=0.01).drain(timeout=120)
+
+        self.assertEqual(list(RunEvent.objects.filter(run=self.run).order_by("seq").values_list("task", "status")),
+                         [("Say hello", "changed"), ("Fail quietly", "ignored")])
+        self.assertEqual(RunEvent.objects.get(run=self.run, seq=0).result["stdout"], "hello")
+
+
+class RunCreateViewTests(TestCase):
+    def test_launch_only_queues_the_run(self):
+        user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        playbook = Playbook.objects.create(name="ok")
+        self.client.force_login(user)
+
+        response = self.client.post(reverse("run_create", args=[playbook.pk]))
+
+        run = Run.objects.get()
+        self.assertRedirects(response, reverse("run_detail", args=[run.pk]))
+        self.assertEqual(run.status, Run.Status.QUEUED)
+        self.assertEqual(run.created_by, user)
+
+
+class RunStreamTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = override_settings(RUNS_WORKSPACE_ROOT=Path(self.tmp.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = CustomUser.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.run = Run.objects.create(playbook=Playbook.objects.create(name="ok"), status=Run.Status.SUCCEEDED)
+        self.run.workspace.mkdir(parents=True)
+        with LogWriter(self.run.log_dir) as log:
+            log.write(b"line 1\nline 2\nline 3\n")
+        self.run.exit_marker_path.write_text("0")
+
+    async def stream(self, **headers):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("run_stream", args=[self.run.pk]), headers=headers)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    async def test_stream_batches_output_and_ends(self):
+        body = await self.stream()
+        self.assertEqual(body, (
+            "id: 21\nevent: output\ndata: line 1\ndata: line 2\ndata: line 3\n\n"
+            "id: 21\nevent: end\ndata: \n\n"
+        ))
+
+    def test_detail_page_shows_log_tail(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("run_detail", args=[self.run.pk]))
+        self.assertContains(response, "line 3")
+        self.assertContains(response, "Lines 1&ndash;3 of 3")
+
+    async def test_stream_resumes_from_last_event_id(self):
+        body = await self.stream(**{"Last-Event-ID": "7"})
+        self.assertTrue(body.startswith("id: 21\nevent: output\ndata: line 2\ndata: line 3\n\n"))
+
+
+    async def test_stream_splits_crlf_and_cr_lines_off_the_event_loop(self):
+        with LogWriter(self.run.log_dir) as log:
+            log.write(b"line 4\r\nprogress 50%\rprogress 100%\r\n")
+        loop_thread, read_batch = threading.current_thread(), streaming._read_batch
+        read_in = []
+
+        def record_thread(*args):
+            read_in.append(threading.current_thread())
+            return read_batch(*args)
+
+        with mock.patch.object(streaming, "_read_batch", side_effect=record_thread):
+            body = await self.stream()
+        self.assertEqual(body.split("\n\n")[0], (
+            "id: 36\nevent: output\ndata: line 4\ndata: progress 50%\ndata: progress 100%"))
+        self.assertTrue(read_in)
+        self.assertNotIn(loop_thread, read_in)
+
+class LogStoreTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, value in {"SEGMENT_SIZE": 256, "INDEX_STRIDE": 8}.items():
+            original = getattr(logstore, name)
+            setattr(logstore, name, value)
+            self.addCleanup(setattr, logstore, name, original)
+
+        self.lines = [f"host-{i}: ok={i % 3}" for i in range(500)]
+        self.data = "\n".join(self.lines).encode()
+
+    def write_log(self, close=True):
+        writer = LogWriter(self.tmp.name)
+        for start in range(0, len(self.data), 100):
+            writer.write(self.data[start:start + 100])
+        if close:
+            writer.close()
+        return writer
+
+    def test_segments_are_compressed_and_indexed(self):
+        self.write_log()
+        names = os.listdir(self.tmp.name)
+        self.assertFalse([name for name in names if name.endswith(".log")])
+        self.assertEqual(len([name for name in names if name.endswith(".log.z")]), -(-len(self.data) // 256))
+
+        reader = LogReader(self.tmp.name)
+        self.assertEqual(reader.size(), len(self.data))
+        self.assertEqual(reader.read(0, len(self.data)), self.data)
+        self.assertEqual(reader.line_count(), 500)
+
+    def test_line_ranges(self):
+        self.write_log()
+        reader = LogReader(self.tmp.name)
+        for start in (0, 7, 8, 9, 123, 495):
+            self.assertEqual(reader.read_lines(start, 10).lines, self.lines[start:start + 10])
+        self.assertEqual(reader.tail(3).lines, self.lines[-3:])
+
+    def test_live_log_excludes_partial_last_line(self):
+        writer = self.write_log(close=False)
+        reader = LogReader(self.tmp.name)
+        self.assertEqual(reader.size(), len(self.data))
+        self.assertEqual(reader.line_count(), 499)
+        self.assertEqual(reader.tail(2).lines, self.lines[-3:-1])
+        writer.close()
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from modules.runs.views import run_list_view, run_detail_view, run_create_view, run_stream_view, run_log_lines_view
+
+urlpatterns = [
+    path("", run_list_view, name="run_list"),
+    path("<int:run_id>", run_detail_view, name="run_detail"),
+    path("<int:run_id>/lines", run_log_lines_view, name="run_log_lines"),
+    path("<int:run_id>/stream", run_stream_view, name="run_stream"),
+    path("launch/<int:playbook_id>", run_create_view, name="run_create"),
+]
@@ -0,0 +1,129 @@
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views import View
+from django.views.generic import DetailView, ListView
+from django.views.generic.detail import BaseDetailView
+
+from modules.playbooks.models import Playbook
+from modules.runs.models import Run
+from modules.runs.streaming import parse_offset, tail_output
+
+PAGINATE_BY = 20
+LOG_PAGE_LINES = 500
+SUMMARY_ROWS = 100
+
+
+class VisibleRunsMixin:
+    def get_queryset(self):
+        return (Run.objects
+                .filter(playbook__in=Playbook.objects.visible_to(self.request.user).values("pk"))
+                .select_related("playbook")
+                .defer("playbook__content"))
+
+
+class RunListView(LoginRequiredMixin, VisibleRunsMixin, ListView):
+    template_name = "runs/run_list.html"
+    context_object_name = "runs"
+    paginate_by = PAGINATE_BY
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def get_queryset(self):
+        return super().get_queryset().order_by("-queued_at", "-pk")
+
+run_list_view = RunListView.as_view()
+
+class RunDetailView(LoginRequiredMixin, VisibleRunsMixin, DetailView):
+    template_name = "runs/run_detail.html"
+    context_object_name = "run"
+    pk_url_kwarg = "run_id"
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["log_page"] = log_page = self.get_log_page()
+        context["last_line"] = log_page.start + len(log_page.lines)
+        context["previous_start"] = max(0, log_page.start - LOG_PAGE_LINES)
+        context["following"] = "start" not in self.request.GET and not self.object.is_finished
+        # Counters are kept up to date by the event ingester: no scan over the run's events or hosts.
+        context["task_summaries"] = self.object.task_summaries.all()[:SUMMARY_ROWS]
+        context["failed_hosts"] = (
+            self.object.host_summaries.filter(Q(failed__gt=0) | Q(unreachable__gt=0)).order_by("host")[:SUMMARY_ROWS]
+            if self.object.failed_host_count else []
+        )
+        return context
+
+    def get_log_page(self):
+        log = self.object.open_log()
+        start = self.request.GET.get("start")
+        if start is None:
+            return log.tail(LOG_PAGE_LINES)
+        return log.read_lines(parse_offset(start), LOG_PAGE_LINES)
+
+run_detail_view = RunDetailView.as_view()
+
+class RunLogLinesView(LoginRequiredMixin, VisibleRunsMixin, BaseDetailView):
+    """JSON line ranges for virtual scrolling: `?start=<line>&count=<lines>`."""
+    pk_url_kwarg = "run_id"
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def render_to_response(self, context):
+        count = min(parse_offset(self.request.GET.get("count", LOG_PAGE_LINES)), LOG_PAGE_LINES)
+        page = self.object.open_log().read_lines(parse_offset(self.request.GET.get("start")), count)
+        return JsonResponse(page._asdict())
+
+run_log_lines_view = RunLogLinesView.as_view()
+
+class RunCreateView(LoginRequiredMixin, View):
+    """Queue a run; execution happens in `manage.py run_worker`, never here."""
+    http_method_names = ["post"]
+
+    login_url = "login"
+    redirect_field_name = "next"
+
+    def post(self, request, playbook_id):
+        playbook = get_object_or_404(Playbook.objects.visible_to(request.user).only("pk", "name"), pk=playbook_id)
+        run = Run.objects.create(playbook=playbook, created_by=request.user)
+        messages.success(request, f'Run of "{playbook.name}" was queued.')
+        return redirect("run_detail", run_id=run.pk)
+
+run_create_view = RunCreateView.as_view()
+
+@sync_to_async
+def get_visible_run(user, run_id):
+    return get_object_or_404(
+        Run.objects.filter(playbook__in=Playbook.objects.visible_to(user).values("pk")).only("pk", "status"),
+        pk=run_id,
+    )
+
+@login_required(login_url="login")
+async def run_stream_view(request, run_id):
+    """
+        Tail a run's output as Server-Sent Events.
+
+        Runs on the event loop when served through `maestro.asgi`, so an open
+        log viewer costs a coroutine rather than a worker thread. The database
+        is only hit once, for the ACL check; resuming uses `Last-Event-ID`
+        (or `?offset=` for the first connection) as a byte offset.
+    """
+    user = await request.auser()
+    run = await get_visible_run(user, run_id)
+    offset = parse_offset(request.headers.get("Last-Event-ID", request.GET.get("offset")))
+
+    response = StreamingHttpResponse(
+        tail_output(run.open_log(), run.exit_marker_path, offset=offset, finished=run.is_finished),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
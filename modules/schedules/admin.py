@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Schedule
+
+
+@admin.register(Schedule)
+class ScheduleAdmin(admin.ModelAdmin):
+    list_display = ("name", "playbook", "cron", "enabled", "next_run_at", "last_run_at")
+    list_filter = ("enabled",)
+    list_select_related = ("playbook",)
+    search_fields = ("name", "playbook__name")
+    readonly_fields = ("next_run_at", "last_run_at")
+
+    exclude = ("created_by", "updated_by", "deleted_by", "deleted_at")
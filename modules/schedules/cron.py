@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+DAY_NAMES = {name: number for number, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# Far enough to cover Feb 29 on a given weekday; anything beyond means the expression never fires.
+MAX_YEARS_AHEAD = 28
+
+
+class CronError(ValueError):
+    pass
+
+
+def _parse_value(value: str, names: dict, low: int, high: int) -> int:
+    value = value.lower()
+    number = names[value] if value in names else None
+    if number is None:
+        if not value.isdigit():
+            raise CronError(f"Invalid value {value!r}.")
+        number = int(value)
+    if not low <= number <= high:
+        raise CronError(f"{number} is outside {low}-{high}.")
+    return number
+
+
+def _parse_field(field: str, low: int, high: int, names: dict = None) -> frozenset:
+    names = names or {}
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise CronError(f"Invalid step in {field!r}.")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (_parse_value(value, names, low, high) for value in part.split("-", 1))
+        else:
+            start = _parse_value(part, names, low, high)
+            end = high if step > 1 else start
+        if start > end:
+            raise CronError(f"Invalid range in {field!r}.")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+        A compiled five-field cron expression (minute hour day-of-month month day-of-week).
+
+        Fields are parsed once into sets, so computing the next fire time only
+        does set lookups while skipping whole months, days and hours that
+        cannot match. As in Vixie cron, when both day fields are restricted a
+        day matches if either of them does. Sunday is 0 (or 7).
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Expected 5 fields, got {len(fields)} in {expression!r}.")
+
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES)
+        self.weekdays = frozenset(value % 7 for value in _parse_field(weekday, 0, 7, DAY_NAMES))
+        self.any_day = day.startswith("*")
+        self.any_weekday = weekday.startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime, tz: ZoneInfo = None) -> datetime:
+        """
+            Return the first matching minute strictly after `moment`.
+
+            Args:
+                moment (datetime): An aware datetime.
+                tz (ZoneInfo, optional): Time zone the expression is evaluated in (default: `moment`'s).
+
+            Returns:
+                datetime: The next fire time, in `tz`.
+        """
+        local = moment.astimezone(tz) if tz else moment
+        candidate = (local.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1))
+        limit = candidate.year + MAX_YEARS_AHEAD
+
+        while candidate.year <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+
+            aware = candidate.replace(tzinfo=local.tzinfo)
+            # Wall-clock times skipped by a DST jump do not exist; move on.
+            if aware.astimezone(ZoneInfo("UTC")).astimezone(local.tzinfo).replace(tzinfo=None) != candidate:
+                candidate += timedelta(minutes=1)
+                continue
+            return aware
+        raise CronError(f"{self.expression!r} never fires.")
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
+
+
+@lru_cache(maxsize=4096)
+def compile_cron(expression: str) -> CronExpression:
+    """Parse `expression` once; schedules sharing an expression share the compiled object."""
+    return CronExpression(expression)
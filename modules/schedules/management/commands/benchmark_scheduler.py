@@ -0,0 +1,85 @@
+import json
+import resource
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from modules.playbooks.models import Playbook
+from modules.runs.models import Run
+from modules.schedules.models import Schedule
+from modules.schedules.scheduler import Scheduler
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Command(BaseCommand):
+    help = "Measure scheduler firing accuracy and idle CPU with many schedules."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schedules", type=int, default=10_000)
+        parser.add_argument("--spread", type=float, default=5.0,
+                            help="Seconds over which the first occurrences are spread.")
+        parser.add_argument("--idle", type=float, default=5.0, help="Seconds of idle time to measure CPU over.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        count, spread = options["schedules"], options["spread"]
+        playbook = Playbook.objects.create(name="scheduler-benchmark")
+        start = timezone.now() + timedelta(seconds=2)
+        Schedule.objects.bulk_create(
+            [Schedule(name=f"benchmark-{i}", playbook=playbook, cron="0 0 1 1 *",
+                      next_run_at=start + timedelta(seconds=spread * i / count)) for i in range(count)],
+            batch_size=1000,
+        )
+
+        scheduler = Scheduler(refresh_interval=3600)
+        load_started = time.perf_counter()
+        scheduler.refresh()
+        load_seconds = time.perf_counter() - load_started
+
+        def run():
+            try:
+                scheduler.run_forever()
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        deadline = time.time() + 2 + spread + 10
+        while scheduler.fired < count and time.time() < deadline:
+            time.sleep(0.1)
+
+        cpu_before = _cpu_seconds()
+        time.sleep(options["idle"])
+        idle_cpu = _cpu_seconds() - cpu_before
+
+        scheduler.stop()
+        thread.join()
+
+        lateness = sorted(scheduler.lateness) or [0.0]
+        results = {
+            "schedules": count,
+            "fired": scheduler.fired,
+            "initial_load_seconds": round(load_seconds, 3),
+            "lateness_p50_ms": round(statistics.median(lateness) * 1000, 2),
+            "lateness_p99_ms": round(lateness[int(len(lateness) * 0.99) - 1 if len(lateness) > 1 else 0] * 1000, 2),
+            "lateness_max_ms": round(lateness[-1] * 1000, 2),
+            "idle_cpu_seconds": round(idle_cpu, 4),
+            "idle_seconds": options["idle"],
+        }
+        Run.objects.filter(playbook=playbook).delete()
+        playbook.delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for key, value in results.items():
+            self.stdout.write(f"{key:>22}: {value}")
@@ -0,0 +1,26 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from modules.schedules.scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = "Queue runs of recurring schedules when they come due."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refresh-interval", type=float, default=None,
+                            help="Seconds between checks for edited schedules (default: SCHEDULER_REFRESH_INTERVAL).")
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(refresh_interval=options["refresh_interval"])
+
+        def shutdown(signum, frame):
+            self.stdout.write("Shutting down scheduler...")
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(f"Scheduler started (refresh every {scheduler.refresh_interval:g}s).")
+        scheduler.run_forever()
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventories', '0002_group_closure'),
+        ('playbooks', '0004_playbook_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Schedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('name', models.CharField(max_length=100)),
+                ('cron', models.CharField(help_text='Five-field cron expression, e.g. `*/15 * * * *`.', max_length=100)),
+                ('timezone', models.CharField(default='UTC', max_length=64)),
+                ('enabled', models.BooleanField(default=True)),
+                ('coalesce', models.BooleanField(default=True, help_text='Fire missed runs only once after downtime.')),
+                ('jitter_seconds', models.PositiveIntegerField(default=0, help_text='Random delay added to every start.')),
+                ('next_run_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('inventory', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='inventories.inventory')),
+                ('playbook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='playbooks.playbook')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('enabled', True)), fields=['next_run_at'], name='schedule_due_idx'), models.Index(fields=['updated_at'], name='schedule_updated_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from modules.core.models import AuditFieldsMixin
+from modules.inventories.models import Inventory
+from modules.playbooks.models import Playbook
+from modules.schedules.cron import CronError, compile_cron
+
+
+class Schedule(AuditFieldsMixin):
+    name = models.CharField(max_length=100)
+    playbook = models.ForeignKey(Playbook, on_delete=models.CASCADE, related_name="schedules")
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name="schedules")
+    cron = models.CharField(max_length=100, help_text="Five-field cron expression, e.g. `*/15 * * * *`.")
+    timezone = models.CharField(max_length=64, default=settings.TIME_ZONE)
+    enabled = models.BooleanField(default=True)
+    coalesce = models.BooleanField(default=True, help_text="Fire missed runs only once after downtime.")
+    jitter_seconds = models.PositiveIntegerField(default=0, help_text="Random delay added to every start.")
+
+    next_run_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_run_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["next_run_at"], condition=Q(enabled=True), name="schedule_due_idx"),
+            models.Index(fields=["updated_at"], name="schedule_updated_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_timing = instance.timing
+        return instance
+
+    @property
+    def timing(self):
+        return (self.__dict__.get("cron"), self.__dict__.get("timezone"), self.__dict__.get("enabled"))
+
+    @property
+    def zone(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
+    def clean(self):
+        try:
+            compile_cron(self.cron)
+        except CronError as exc:
+            raise ValidationError({"cron": str(exc)})
+        try:
+            self.zone
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValidationError({"timezone": f"Unknown time zone {self.timezone!r}."})
+
+    def compute_next_run(self, after=None):
+        return compile_cron(self.cron).next_after(after or timezone.now(), self.zone)
+
+    def save(self, *args, **kwargs):
+        # (Re)plan when created, re-enabled or when the expression changed.
+        if self.timing != getattr(self, "_loaded_timing", None):
+            self.next_run_at = self.compute_next_run() if self.enabled else None
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "next_run_at"}
+        super().save(*args, **kwargs)
+        self._loaded_timing = self.timing
+
+    def __str__(self):
+        return self.name
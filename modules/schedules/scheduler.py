@@ -0,0 +1,198 @@
+import heapq
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.utils import timezone
+
+from modules.audit.buffer import audit_buffer
+from modules.audit.models import AuditEvent
+from modules.audit.signals import diff, record
+from modules.runs.models import Run
+from modules.schedules.cron import CronError, compile_cron
+from modules.schedules.models import Schedule
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of runs created for one schedule when missed runs are not coalesced.
+MAX_CATCH_UP_RUNS = 100
+
+
+class Scheduler:
+    """
+        Fires recurring playbook runs from an in-memory min-heap of deadlines.
+
+        Enabled schedules are loaded once through the partial index on
+        `next_run_at`; afterwards the process sleeps until the earliest
+        deadline (or the next refresh) instead of polling. A refresh only
+        reads schedules whose `updated_at` moved since the previous one,
+        which keeps idle cost at one indexed query per `refresh_interval`.
+
+        Heap entries are `(fire_at, schedule_id, planned)`. Replaced entries
+        are not removed from the heap; they are skipped when popped because
+        `planned` no longer matches `self.planned[schedule_id]`.
+
+        Firing claims each occurrence with a conditional UPDATE on
+        `next_run_at` and creates its runs in the same short transaction, so
+        several scheduler processes never start the same occurrence twice.
+
+        Args:
+            refresh_interval (float, optional): Seconds between change checks.
+    """
+
+    def __init__(self, refresh_interval: float = None):
+        self.refresh_interval = refresh_interval or getattr(settings, "SCHEDULER_REFRESH_INTERVAL", 30)
+        self.heap = []
+        self.planned = {}
+        self.synced_at = None
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.lateness = deque(maxlen=100_000)
+        self.fired = 0
+
+    def _push(self, schedule_id, planned: datetime, jitter_seconds: int) -> None:
+        self.planned[schedule_id] = planned
+        fire_at = planned.timestamp() + (random.uniform(0, jitter_seconds) if jitter_seconds else 0)
+        heapq.heappush(self.heap, (fire_at, schedule_id, planned))
+
+    def _forget(self, schedule_id) -> None:
+        self.planned.pop(schedule_id, None)
+
+    def refresh(self) -> int:
+        """Load new, changed and deleted schedules. Returns the number of rows read."""
+        started = timezone.now()
+        schedules = Schedule.objects.all()
+        if self.synced_at is None:
+            schedules = schedules.filter(enabled=True, next_run_at__isnull=False)
+        else:
+            schedules = schedules.filter(updated_at__gte=self.synced_at)
+
+        rows = 0
+        for pk, enabled, next_run_at, jitter in schedules.values_list("pk", "enabled", "next_run_at",
+                                                                     "jitter_seconds").iterator():
+            rows += 1
+            if not enabled or next_run_at is None:
+                self._forget(pk)
+            elif self.planned.get(pk) != next_run_at:
+                self._push(pk, next_run_at, jitter)
+
+        # Deleted schedules leave no row to notice; `fire()` drops them when they come due.
+        # Compensate for clock skew between processes writing `updated_at`.
+        self.synced_at = started - timedelta(seconds=1)
+        return rows
+
+    def pop_due(self, now: float) -> list:
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, pk, planned = heapq.heappop(self.heap)
+            if self.planned.get(pk) == planned:
+                due.append((fire_at, pk, planned))
+        return due
+
+    def fire(self, due) -> int:
+        """Create the runs of due schedules and plan their next occurrence."""
+        if not due:
+            return 0
+        now = timezone.now()
+        fired = 0
+        # Schedules of soft-deleted playbooks are left out and dropped like deleted ones.
+        schedules = (Schedule.objects
+                     .filter(playbook__deleted_at__isnull=True)
+                     .only("pk", "name", "playbook_id", "inventory_id", "created_by_id", "cron", "timezone",
+                           "enabled", "coalesce", "jitter_seconds", "next_run_at", "last_run_at")
+                     .in_bulk([pk for _, pk, _ in due]))
+        for fire_at, pk, planned in due:
+            schedule = schedules.get(pk)
+            self._forget(pk)
+            if schedule is None or not schedule.enabled:
+                continue
+            if schedule.next_run_at != planned:
+                # Edited meanwhile: follow the stored plan.
+                if schedule.next_run_at:
+                    self._push(pk, schedule.next_run_at, schedule.jitter_seconds)
+                continue
+            try:
+                cron, zone = compile_cron(schedule.cron), ZoneInfo(schedule.timezone)
+            except (CronError, ValueError) as exc:
+                logger.error("Schedule %s is invalid and was skipped: %s", pk, exc)
+                continue
+
+            occurrences = [planned]
+            if schedule.coalesce:
+                # However many occurrences were missed, start once and plan from now.
+                next_run_at = cron.next_after(now, zone)
+            else:
+                next_run_at = cron.next_after(planned, zone)
+                while next_run_at <= now:
+                    if len(occurrences) < MAX_CATCH_UP_RUNS:
+                        occurrences.append(next_run_at)
+                    next_run_at = cron.next_after(next_run_at, zone)
+
+            try:
+                with transaction.atomic():
+                    # The claim is the transaction's first statement, so SQLite takes the write
+                    # lock right away; whoever comes second waits and then matches no row.
+                    claimed = (Schedule.objects
+                               .filter(pk=pk, next_run_at=planned)
+                               .update(next_run_at=next_run_at, last_run_at=now))
+                    if claimed:
+                        runs = Run.objects.bulk_create(
+                            [Run(playbook_id=schedule.playbook_id, inventory_id=schedule.inventory_id,
+                                 schedule_id=pk, created_by_id=schedule.created_by_id, queued_at=now)
+                             for _ in occurrences],
+                            batch_size=500,
+                        )
+                        # Neither write sends signals; audit them like saves, once committed.
+                        record(schedule, AuditEvent.Action.UPDATE, {"next_run_at": [planned, next_run_at],
+                                                                    "last_run_at": [schedule.last_run_at, now]})
+                        for run in runs:
+                            record(run, AuditEvent.Action.CREATE, diff(run, created=True))
+            except OperationalError as exc:
+                logger.warning("Schedule %s could not be claimed and will be retried: %s", pk, exc)
+                self._push(pk, planned, 0)
+                continue
+
+            if not claimed:
+                # Fired by another scheduler or edited meanwhile: follow the stored plan.
+                stored = Schedule.objects.filter(pk=pk, enabled=True).values_list("next_run_at", flat=True).first()
+                if stored:
+                    self._push(pk, stored, schedule.jitter_seconds)
+                continue
+            self._push(pk, next_run_at, schedule.jitter_seconds)
+            self.lateness.append(time.time() - fire_at)
+            fired += len(occurrences)
+
+        self.fired += fired
+        return fired
+
+    def seconds_until_next(self, now: float, next_refresh: float) -> float:
+        deadline = next_refresh
+        while self.heap and self.planned.get(self.heap[0][1]) != self.heap[0][2]:
+            heapq.heappop(self.heap)
+        if self.heap:
+            deadline = min(deadline, self.heap[0][0])
+        return max(0.0, deadline - now)
+
+    def run_forever(self) -> None:
+        self.refresh()
+        next_refresh = time.time() + self.refresh_interval
+        while not self.stopping:
+            now = time.time()
+            if now >= next_refresh:
+                self.refresh()
+                next_refresh = now + self.refresh_interval
+            self.fire(self.pop_due(now))
+            # The wait below can outlast AUDIT_FLUSH_INTERVAL; write the firing's audit events first.
+            audit_buffer.flush()
+            self.wakeup.wait(self.seconds_until_next(time.time(), next_refresh))
+            self.wakeup.clear()
+
+    def stop(self) -> None:
+        self.stopping = True
+        self.wakeup.set()
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from modules.audit.buffer import audit_buffer
+from modules.audit.models import AuditEvent
+from modules.playbooks.models import Playbook
+from modules.runs.models import Run
+from modules.schedules.cron import CronError, compile_cron
+from modules.schedules.models import Schedule
+from modules.schedules.scheduler import Scheduler
+
+UTC = dt_timezone.utc
+
+
+class CronExpressionTests(TestCase):
+    def next(self, expression, moment, tz=UTC):
+        return compile_cron(expression).next_after(moment, tz)
+
+    def test_next_after(self):
+        moment = datetime(2024, 1, 31, 10, 7, 30, tzinfo=UTC)
+        self.assertEqual(self.next("*/15 * * * *", moment), datetime(2024, 1, 31, 10, 15, tzinfo=UTC))
+        self.assertEqual(self.next("0 9-17/4 * * mon-fri", moment), datetime(2024, 1, 31, 13, 0, tzinfo=UTC))
+        self.assertEqual(self.next("@monthly", moment), datetime(2024, 2, 1, tzinfo=UTC))
+        self.assertEqual(self.next("0 0 29 feb *", moment), datetime(2024, 2, 29, tzinfo=UTC))
+        # Both day fields restricted: either one matching is enough (the 1st, or a Sunday).
+        self.assertEqual(self.next("0 0 1 * sun", moment), datetime(2024, 2, 1, tzinfo=UTC))
+        self.assertEqual(self.next("0 0 1 * 7", datetime(2024, 2, 1, 1, tzinfo=UTC)),
+                         datetime(2024, 2, 4, tzinfo=UTC))
+
+    def test_time_zones_and_dst(self):
+        paris = ZoneInfo("Europe/Paris")
+        # 02:30 does not exist on 2024-03-31 in Paris.
+        fired = self.next("30 2 * * *", datetime(2024, 3, 30, 3, tzinfo=paris), paris)
+        self.assertEqual(fired, datetime(2024, 4, 1, 2, 30, tzinfo=paris))
+
+    def test_invalid_expressions(self):
+        for expression in ("* * * *", "61 * * * *", "*/0 * * * *", "5-1 * * * *", "0 0 31 feb *"):
+            with self.assertRaises(CronError, msg=expression):
+                compile_cron(expression).next_after(timezone.now())
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.playbook = Playbook.objects.create(name="nightly")
+
+    def create(self, **kwargs):
+        return Schedule.objects.create(name="nightly", playbook=self.playbook, **{"cron": "0 3 * * *", **kwargs})
+
+    def test_next_run_is_planned_on_save(self):
+        schedule = self.create()
+        self.assertEqual(schedule.next_run_at, schedule.compute_next_run())
+        self.assertEqual(schedule.next_run_at.astimezone(UTC).hour, 3)
+
+        schedule.enabled = False
+        schedule.save(update_fields=["enabled"])
+        self.assertIsNone(Schedule.objects.get(pk=schedule.pk).next_run_at)
+
+        with self.assertRaises(ValidationError):
+            Schedule(name="bad", playbook=self.playbook, cron="every day").full_clean()
+
+    def move_into_the_past(self, schedule, days):
+        planned = schedule.next_run_at - timedelta(days=days)
+        Schedule.objects.filter(pk=schedule.pk).update(next_run_at=planned)
+        return planned
+
+    def test_missed_runs_are_coalesced(self):
+        schedule = self.create()
+        self.move_into_the_past(schedule, days=3)
+
+        scheduler = Scheduler()
+        scheduler.refresh()
+        self.assertEqual(scheduler.fire(scheduler.pop_due(timezone.now().timestamp())), 1)
+
+        schedule.refresh_from_db()
+        self.assertGreater(schedule.next_run_at, timezone.now())
+        self.assertEqual(Run.objects.get().schedule, schedule)
+        self.assertEqual(scheduler.pop_due(timezone.now().timestamp()), [])
+
+    def test_missed_runs_can_be_caught_up(self):
+        schedule = self.create(coalesce=False)
+        self.move_into_the_past(schedule, days=3)
+
+        scheduler = Scheduler()
+        scheduler.refresh()
+        self.assertEqual(scheduler.fire(scheduler.pop_due(timezone.now().timestamp())), 3)
+
+    def test_firing_is_audited(self):
+        schedule = self.create()
+        planned = self.move_into_the_past(schedule, days=1)
+        audit_buffer.clear()
+
+        scheduler = Scheduler()
+        scheduler.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduler.fire(scheduler.pop_due(timezone.now().timestamp()))
+        audit_buffer.flush()
+
+        update = AuditEvent.objects.for_object(schedule).get(action=AuditEvent.Action.UPDATE)
+        self.assertEqual(datetime.fromisoformat(update.changes["next_run_at"][0]), planned)
+        created = AuditEvent.objects.for_object(Run.objects.get()).get()
+        self.assertEqual((created.action, created.changes["schedule"]), (AuditEvent.Action.CREATE, [None, schedule.pk]))
+
+    def test_an_occurrence_is_only_fired_once(self):
+        self.move_into_the_past(self.create(), days=1)
+        first, second = Scheduler(), Scheduler()
+        first.refresh()
+        second.refresh()
+        now = timezone.now().timestamp()
+        due = second.pop_due(now)
+        first.fire(first.pop_due(now))
+        self.assertEqual(second.fire(due), 0)
+        self.assertEqual(Run.objects.count(), 1)
+
+    def test_a_stale_read_does_not_fire_twice(self):
+        schedule = self.create()
+        self.move_into_the_past(schedule, days=1)
+        first, second = Scheduler(), Scheduler()
+        first.refresh()
+        second.refresh()
+        now = timezone.now().timestamp()
+        first_due = first.pop_due(now)
+
+        def first_fires_meanwhile(expression):
+            # `second` has read the schedule already; `first` claims the occurrence before it does.
+            if first_due:
+                first.fire([first_due.pop()])
+            return compile_cron(expression)
+
+        with mock.patch("modules.schedules.scheduler.compile_cron", side_effect=first_fires_meanwhile):
+            self.assertEqual(second.fire(second.pop_due(now)), 0)
+        self.assertEqual(Run.objects.count(), 1)
+        schedule.refresh_from_db()
+        self.assertEqual(second.planned[schedule.pk], schedule.next_run_at)
+
+    def test_sleeps_until_the_next_deadline(self):
+        schedule = self.create(jitter_seconds=30)
+        scheduler = Scheduler(refresh_interval=10 ** 9)
+        scheduler.refresh()
+        now = timezone.now().timestamp()
+        wait = scheduler.seconds_until_next(now, now + 10 ** 9)
+        planned = schedule.next_run_at.timestamp() - now
+        self.assertGreaterEqual(wait, planned)
+        self.assertLessEqual(wait, planned + 30)
+
+        # Edits are picked up by the next refresh and replace the old heap entry.
+        schedule.cron = "0 4 * * *"
+        schedule.save()
+        scheduler.refresh()
+        self.assertEqual(scheduler.planned[schedule.pk], schedule.next_run_at)
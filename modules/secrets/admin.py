@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from .models import DataKey, Secret
+
+
+@admin.register(Secret)
+class SecretAdmin(admin.ModelAdmin):
+    list_display = ("name", "scope", "updated_at")
+    list_filter = ("scope",)
+    search_fields = ("name",)
+    fields = ("scope", "name", "updated_at")
+    readonly_fields = ("scope", "name", "updated_at")
+
+    def has_add_permission(self, request):
+        # Values can only be set through `modules.secrets.store`, which encrypts them.
+        return False
+
+
+@admin.register(DataKey)
+class DataKeyAdmin(admin.ModelAdmin):
+    list_display = ("scope", "master_key_id", "created_at")
+    fields = ("scope", "master_key_id", "created_at")
+    readonly_fields = ("scope", "master_key_id", "created_at")
+
+    def has_add_permission(self, request):
+        return False
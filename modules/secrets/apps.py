@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SecretsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    label = 'secrets'
+    name = 'modules.secrets'
+
+    def ready(self):
+        from modules.secrets import checks, signals  # noqa: F401
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.security, deploy=True)
+def check_master_key(app_configs, **kwargs):
+    """`manage.py check --deploy` fails while the master key is derived from `SECRET_KEY`."""
+    if getattr(settings, "SECRETS_MASTER_KEY", None):
+        return []
+    return [Error(
+        "SECRETS_MASTER_KEY is not set, so the secrets master key is derived from SECRET_KEY.",
+        hint="Rotating SECRET_KEY would make every stored secret undecryptable. Generate a key with "
+             "`python -c \"import base64, os; print(base64.urlsafe_b64encode(os.urandom(32)).decode())\"` "
+             "and keep it, like the database, out of SECRET_KEY rotations.",
+        id="secrets.E001",
+    )]
@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from modules.secrets.models import DataKey, Secret
+from modules.secrets.store import decrypt_secrets, get_secret, key_cache, set_secret
+
+
+class Command(BaseCommand):
+    help = "Measure launch-time decryption of many secrets, with a cold and a warm data key cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--secrets", type=int, default=1000)
+        parser.add_argument("--scopes", type=int, default=2, help="Number of scopes the secrets are spread over.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def timed(self, func):
+        started = time.perf_counter()
+        result = func()
+        return round(time.perf_counter() - started, 4), result
+
+    def handle(self, *args, **options):
+        count, scopes = options["secrets"], [f"benchmark:{i}" for i in range(max(1, options["scopes"]))]
+        Secret.objects.filter(scope__in=scopes).delete()
+        DataKey.objects.filter(scope__in=scopes).delete()
+
+        store_seconds, _ = self.timed(lambda: [
+            set_secret(scopes[i % len(scopes)], f"secret_{i:05d}", f"value-{i}") for i in range(count)
+        ])
+
+        key_cache.clear()
+        cold_seconds, values = self.timed(lambda: decrypt_secrets(scopes))
+        warm_seconds, _ = self.timed(lambda: decrypt_secrets(scopes))
+        sample = min(count, 50)
+        one_by_one_seconds, _ = self.timed(lambda: [
+            get_secret(scopes[i % len(scopes)], f"secret_{i:05d}") for i in range(sample)
+        ])
+
+        results = {
+            "secrets": count,
+            "scopes": len(scopes),
+            "decrypted": len(values),
+            "store_seconds": store_seconds,
+            "bulk_decrypt_cold_seconds": cold_seconds,
+            "bulk_decrypt_warm_seconds": warm_seconds,
+            "one_query_per_secret_seconds_estimate": round(one_by_one_seconds * count / sample, 4),
+        }
+        Secret.objects.filter(scope__in=scopes).delete()
+        DataKey.objects.filter(scope__in=scopes).delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for key, value in results.items():
+            self.stdout.write(f"{key:>38}: {value}")
@@ -0,0 +1,2 @@
+from .data_key import DataKey
+from .secret import Secret
@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class DataKey(models.Model):
+    """A per-scope AES key, stored only wrapped (encrypted) by the master key."""
+    scope = models.CharField(max_length=100, unique=True)
+    master_key_id = models.CharField(max_length=16)
+    wrapped_key = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.scope
@@ -0,0 +1,23 @@
+from django.db import models
+
+from modules.core.models import AuditFieldsMixin
+
+from .data_key import DataKey
+
+
+class Secret(AuditFieldsMixin):
+    """A value encrypted with its scope's data key; the plaintext is never stored."""
+    scope = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)
+    data_key = models.ForeignKey(DataKey, on_delete=models.PROTECT, related_name="secrets")
+    ciphertext = models.BinaryField()
+
+    audit_redact = ("ciphertext",)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "name"], name="unique_secret_scope_name")
+        ]
+
+    def __str__(self):
+        return f"{self.scope}/{self.name}"
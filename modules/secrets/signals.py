@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from modules.inventories.models import Inventory
+from modules.secrets.models import DataKey, Secret
+from modules.secrets.store import inventory_scope
+
+
+@receiver(post_delete, sender=Inventory)
+def delete_inventory_secrets(sender, instance, **kwargs):
+    scope = inventory_scope(instance.pk)
+    Secret.objects.filter(scope=scope).delete()
+    DataKey.objects.filter(scope=scope).delete()
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+
+from modules.secrets.models import DataKey, Secret
+
+GLOBAL_SCOPE = "global"
+NONCE_SIZE = 12
+
+
+class SecretDecryptionError(Exception):
+    pass
+
+
+def inventory_scope(inventory_id) -> str:
+    return f"inventory:{inventory_id}"
+
+
+@lru_cache(maxsize=4)
+def _master_key(configured: str, secret_key: str) -> tuple[str, bytes]:
+    if configured:
+        try:
+            key = base64.urlsafe_b64decode(configured)
+        except ValueError as exc:
+            raise ImproperlyConfigured("SECRETS_MASTER_KEY must be urlsafe base64.") from exc
+        if len(key) != 32:
+            raise ImproperlyConfigured("SECRETS_MASTER_KEY must decode to 32 bytes.")
+    else:
+        # Derived once per process; data keys make any further KDF call unnecessary.
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+                   info=b"maestro secrets master key").derive(secret_key.encode("utf-8"))
+    return hashlib.sha256(key).hexdigest()[:16], key
+
+
+def get_master_key() -> tuple[str, bytes]:
+    """Return `(key id, key)` of the master key from `SECRETS_MASTER_KEY` (or derived from `SECRET_KEY`)."""
+    return _master_key(getattr(settings, "SECRETS_MASTER_KEY", None) or "", settings.SECRET_KEY)
+
+
+def _encrypt(key: bytes, plaintext: bytes, associated_data: bytes) -> bytes:
+    nonce = os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, plaintext, associated_data)
+
+
+def _decrypt(key: bytes, blob: bytes, associated_data: bytes) -> bytes:
+    blob = bytes(blob)
+    try:
+        return AESGCM(key).decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], associated_data)
+    except InvalidTag as exc:
+        raise SecretDecryptionError("Ciphertext does not match its key or was tampered with.") from exc
+
+
+class DataKeyCache:
+    """
+        Bounded, time-limited in-process cache of unwrapped data keys.
+
+        Args:
+            maxsize (int): Maximum number of keys held at once (least recently used go first).
+            ttl (float): Seconds a key stays usable after it was unwrapped.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, data_key_id):
+        with self.lock:
+            entry = self.entries.get(data_key_id)
+            if entry is None:
+                return None
+            expires, key = entry
+            if expires < time.monotonic():
+                del self.entries[data_key_id]
+                return None
+            self.entries.move_to_end(data_key_id)
+            return key
+
+    def set(self, data_key_id, key: bytes) -> None:
+        with self.lock:
+            self.entries[data_key_id] = (time.monotonic() + self.ttl, key)
+            self.entries.move_to_end(data_key_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+key_cache = DataKeyCache(
+    maxsize=getattr(settings, "SECRETS_KEY_CACHE_SIZE", 256),
+    ttl=getattr(settings, "SECRETS_KEY_CACHE_TTL", 300),
+)
+
+
+def unwrap_data_key(data_key: DataKey) -> bytes:
+    key = key_cache.get(data_key.pk)
+    if key is not None:
+        return key
+
+    master_key_id, master_key = get_master_key()
+    if data_key.master_key_id != master_key_id:
+        raise SecretDecryptionError(f"Data key of {data_key.scope!r} was wrapped by another master key.")
+    key = _decrypt(master_key, data_key.wrapped_key, data_key.scope.encode("utf-8"))
+    key_cache.set(data_key.pk, key)
+    return key
+
+
+def get_data_key(scope: str) -> DataKey:
+    """Return the data key of `scope`, creating (and wrapping) a fresh one on first use."""
+    data_key = DataKey.objects.filter(scope=scope).first()
+    if data_key:
+        return data_key
+
+    master_key_id, master_key = get_master_key()
+    data_key = DataKey(scope=scope, master_key_id=master_key_id,
+                       wrapped_key=_encrypt(master_key, AESGCM.generate_key(256), scope.encode("utf-8")))
+    try:
+        with transaction.atomic():
+            data_key.save(force_insert=True)
+    except IntegrityError:
+        # Another process created the scope's key meanwhile.
+        return DataKey.objects.get(scope=scope)
+    return data_key
+
+
+def _associated_data(scope: str, name: str) -> bytes:
+    # Binds every ciphertext to its row, so values cannot be swapped between secrets.
+    return f"{scope}\0{name}".encode("utf-8")
+
+
+def set_secret(scope: str, name: str, value: str, user=None) -> Secret:
+    """
+        Encrypt and store a secret, replacing any previous value.
+
+        Args:
+            scope (str): `GLOBAL_SCOPE` or `inventory_scope(...)`.
+            name (str): Variable name the secret is exposed as.
+            value (str): The plaintext.
+            user (CustomUser, optional): Recorded as creator / last editor.
+
+        Returns:
+            Secret: The stored secret.
+    """
+    data_key = get_data_key(scope)
+    ciphertext = _encrypt(unwrap_data_key(data_key), value.encode("utf-8"), _associated_data(scope, name))
+    secret, created = Secret.objects.update_or_create(
+        scope=scope, name=name,
+        defaults={"data_key": data_key, "ciphertext": ciphertext, "updated_by": user},
+        create_defaults={"data_key": data_key, "ciphertext": ciphertext, "created_by": user},
+    )
+    return secret
+
+
+def decrypt_secrets(scopes, names=None) -> dict:
+    """
+        Decrypt all secrets of the given scopes in one pass.
+
+        Secrets are loaded with a single query; each data key is unwrapped at
+        most once (and not at all while it sits in `key_cache`), so the cost
+        is one AES-GCM operation per secret. When several scopes define the
+        same name, the later scope wins.
+
+        Args:
+            scopes (list[str]): Scopes to read, lowest precedence first.
+            names (Iterable[str], optional): Only decrypt these names.
+
+        Returns:
+            dict: Secret name -> plaintext.
+    """
+    scopes = list(scopes)
+    secrets = (Secret.objects
+               .filter(scope__in=scopes)
+               .select_related("data_key")
+               .only("scope", "name", "ciphertext", "data_key__scope", "data_key__master_key_id",
+                     "data_key__wrapped_key"))
+    if names is not None:
+        secrets = secrets.filter(name__in=list(names))
+
+    precedence = {scope: position for position, scope in enumerate(scopes)}
+    values = {}
+    for secret in sorted(secrets, key=lambda secret: precedence[secret.scope]):
+        key = unwrap_data_key(secret.data_key)
+        values[secret.name] = _decrypt(key, secret.ciphertext,
+                                       _associated_data(secret.scope, secret.name)).decode("utf-8")
+    return values
+
+
+def get_secret(scope: str, name: str) -> str:
+    values = decrypt_secrets([scope], [name])
+    if name not in values:
+        raise Secret.DoesNotExist(f"No secret {name!r} in scope {scope!r}.")
+    return values[name]
+
+
+def decrypt_run_secrets(run) -> dict:
+    """Secrets a run needs: global ones, overridden by those of its inventory."""
+    scopes = [GLOBAL_SCOPE]
+    if run.inventory_id:
+        scopes.append(inventory_scope(run.inventory_id))
+    return decrypt_secrets(scopes)
@@ -0,0 +1,64 @@
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+
+from modules.inventories.models import Inventory
+from modules.runs.models import Run
+from modules.secrets import store
+from modules.secrets.models import DataKey, Secret
+
+
+class SecretStoreTests(TestCase):
+    def setUp(self):
+        store.key_cache.clear()
+        self.inventory = Inventory.objects.create(name="datacenter")
+        self.scope = store.inventory_scope(self.inventory.pk)
+
+    def test_values_are_encrypted_at_rest(self):
+        store.set_secret(store.GLOBAL_SCOPE, "db_password", "hunter2")
+        secret = Secret.objects.get(name="db_password")
+        self.assertNotIn(b"hunter2", bytes(secret.ciphertext))
+        self.assertEqual(store.get_secret(store.GLOBAL_SCOPE, "db_password"), "hunter2")
+
+        store.set_secret(store.GLOBAL_SCOPE, "db_password", "correct horse")
+        self.assertEqual(store.get_secret(store.GLOBAL_SCOPE, "db_password"), "correct horse")
+        self.assertEqual(Secret.objects.count(), 1)
+
+    def test_bulk_decrypt_unwraps_each_data_key_once(self):
+        for i in range(20):
+            store.set_secret(store.GLOBAL_SCOPE, f"global_{i}", str(i))
+            store.set_secret(self.scope, f"local_{i}", str(i))
+        store.set_secret(self.scope, "global_0", "overridden")
+        store.key_cache.clear()
+
+        with self.assertNumQueries(1):
+            values = store.decrypt_run_secrets(Run(inventory=self.inventory))
+        self.assertEqual(len(values), 40)
+        self.assertEqual(values["global_0"], "overridden")
+        self.assertEqual(len(store.key_cache.entries), 2)
+
+    def test_ciphertexts_are_bound_to_their_secret(self):
+        store.set_secret(self.scope, "a", "alpha")
+        store.set_secret(self.scope, "b", "beta")
+        a = Secret.objects.get(name="a")
+        Secret.objects.filter(name="b").update(ciphertext=a.ciphertext)
+        with self.assertRaises(store.SecretDecryptionError):
+            store.get_secret(self.scope, "b")
+
+    def test_expired_data_keys_are_unwrapped_again(self):
+        store.set_secret(self.scope, "a", "alpha")
+        data_key = DataKey.objects.get(scope=self.scope)
+        cache = store.DataKeyCache(maxsize=1, ttl=-1)
+        cache.set(data_key.pk, b"key")
+        self.assertIsNone(cache.get(data_key.pk))
+
+    def test_inventory_deletion_removes_its_secrets(self):
+        store.set_secret(self.scope, "a", "alpha")
+        self.inventory.delete()
+        self.assertFalse(Secret.objects.exists())
+        self.assertFalse(DataKey.objects.exists())
+
+    def test_deploy_check_requires_an_explicit_master_key(self):
+        with override_settings(SECRETS_MASTER_KEY=None):
+            self.assertIn("secrets.E001", [error.id for error in run_checks(include_deployment_checks=True)])
+        with override_settings(SECRETS_MASTER_KEY="a" * 43 + "="):
+            self.assertNotIn("secrets.E001", [error.id for error in run_checks(include_deployment_checks=True)])
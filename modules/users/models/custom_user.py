@@ -1,10 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from modules.core.acl import get_user_group_ids
 from modules.core.models.audit_fields_mixin import AuditFieldsMixin
 
 class CustomUser(AbstractUser, AuditFieldsMixin):
     email = models.EmailField(unique=True)
 
+    audit_exclude = ("last_login",)
+    audit_redact = ("password",)
+
     address = models.CharField(
         max_length=50,
         null=True,
@@ -29,7 +33,7 @@ class CustomUser(AbstractUser, AuditFieldsMixin):
     timezone = models.CharField(max_length=50, blank=True, null=True)
 
     def get_user_group_ids(self):
-        return self.maestro_groups.values_list('id', flat=True)
+        return get_user_group_ids(self)
 
     def __str__(self):
         return self.email